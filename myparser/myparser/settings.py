@@ -46,12 +46,14 @@ def _load_env(env_path: Path):
     return True
 
 
-# Пробуем загрузить .env из нескольких типичных мест (используем прямой путь)
-_env_loaded = _load_env(PROJECT_DIR / ".env")
-if not _env_loaded:
-    _env_loaded = _load_env(BASE_DIR / ".env")
-if not _env_loaded:
-    _env_loaded = _load_env(BASE_DIR.parent / ".env")
+# Пробуем загрузить .env из нескольких типичных мест (используем прямой путь).
+# Каждый файл читается один раз; следующий — только если SECRET_KEY всё ещё не задан.
+ENV_PATHS = (PROJECT_DIR / ".env", BASE_DIR / ".env", BASE_DIR.parent / ".env")
+_env_loaded = False
+for _env_path in ENV_PATHS:
+    _env_loaded = _load_env(_env_path) or _env_loaded
+    if _env_loaded and os.getenv('SECRET_KEY'):
+        break
 
 
 # Quick-start development settings - unsuitable for production
@@ -60,58 +62,11 @@ if not _env_loaded:
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = os.getenv('SECRET_KEY')
 if not SECRET_KEY:
-    # дополнительная попытка достать SECRET_KEY прямо из файла .env (используем прямой путь)
-    for candidate in (PROJECT_DIR / ".env", BASE_DIR / ".env", BASE_DIR.parent / ".env"):
-        if candidate.exists():
-            try:
-                content = candidate.read_text(encoding="utf-8", errors="ignore")
-            except Exception:
-                try:
-                    content = candidate.read_text(encoding="utf-16", errors="ignore")
-                except Exception:
-                    continue
-            # Отладка: выводим первые несколько строк файла
-            lines_preview = '\n'.join(content.splitlines()[:5])
-            print(f"DEBUG: Reading .env from {candidate}")
-            print(f"DEBUG: First 5 lines:\n{lines_preview}")
-            for line in content.splitlines():
-                line_orig = line
-                line = line.strip()
-                # Убираем BOM если есть
-                if line.startswith('\ufeff'):
-                    line = line[1:]
-                if line.startswith("SECRET_KEY") or line.startswith("SECRET_KEY="):
-                    try:
-                        if "=" in line:
-                            _, value = line.split("=", 1)
-                        else:
-                            continue
-                        value = value.strip().strip('"').strip("'")
-                        print(f"DEBUG: Found SECRET_KEY value (length={len(value)})")
-                        if value:
-                            SECRET_KEY = value
-                            os.environ['SECRET_KEY'] = value
-                            print(f"DEBUG: SECRET_KEY loaded successfully")
-                            break
-                    except Exception as e:
-                        print(f"DEBUG: Error parsing SECRET_KEY line: {e}, line={line_orig}")
-                        continue
-        if SECRET_KEY:
-            break
-if not SECRET_KEY:
-    # Отладочная информация
-    env_paths = [PROJECT_DIR / ".env", BASE_DIR / ".env", BASE_DIR.parent / ".env"]
-    existing = [str(p) for p in env_paths if p.exists()]
-    # Попробуем прочитать содержимое существующих файлов
-    file_contents = {}
-    for path in existing:
-        try:
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                file_contents[str(path)] = f.read()[:200]  # Первые 200 символов
-        except Exception as e:
-            file_contents[str(path)] = f"Error reading: {e}"
-    msg = f"SECRET_KEY is not set. Define it in .env\nChecked paths: {env_paths}\nExisting files: {existing}\nFile contents preview:\n{file_contents}"
-    raise ImproperlyConfigured(msg)
+    existing = [str(p) for p in ENV_PATHS if p.exists()]
+    raise ImproperlyConfigured(
+        f"SECRET_KEY is not set. Define it in .env or in the environment\n"
+        f"Checked paths: {[str(p) for p in ENV_PATHS]}\nExisting files: {existing}"
+    )
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv('DEBUG', 'True').lower() in ('1', 'true', 'yes', 'on')
@@ -132,6 +87,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'parserapp.middleware.RequestMetricsMiddleware',  # Время запросов и этапов для /metrics, лог медленных запросов
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -172,6 +128,42 @@ DATABASES = {
     }
 }
 
+# Профиль SQLite: 'production' — WAL, настроенные PRAGMA для каждого соединения, постоянные соединения
+# и транзакции BEGIN IMMEDIATE; 'default' — настройки SQLite и Django как есть.
+# По умолчанию 'production' только при выключенном DEBUG: в разработке и тестах база ведёт себя как обычно.
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'default' if DEBUG else 'production').lower()
+
+if SQLITE_PROFILE == 'production':
+    SQLITE_PRAGMAS = {
+        # Читатели не блокируют писателя и наоборот
+        'journal_mode': 'WAL',
+        # В режиме WAL NORMAL не теряет целостность, fsync только при checkpoint
+        'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        # Отрицательное значение — размер в КиБ (по умолчанию 64 МиБ на соединение)
+        'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', '65536')),
+        'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),
+        # Сколько миллисекунд ждать освобождения блокировки, прежде чем вернуть «database is locked»
+        'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+        'temp_store': 'MEMORY',
+    }
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            # Блокировка записи берётся в начале транзакции: SELECT + INSERT в одной транзакции
+            # не упирается в «database is locked» при повышении блокировки, а ждёт busy_timeout
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+# Поток записи с групповыми коммитами (parserapp/services/db_writer.py)
+HH_DB_WRITER = {
+    'ENABLED': os.getenv('HH_DB_WRITER', 'True').lower() in ('1', 'true', 'yes', 'on'),
+    'MAX_GROUP': int(os.getenv('HH_DB_WRITER_MAX_GROUP', '32')),
+    'MAX_DELAY': float(os.getenv('HH_DB_WRITER_MAX_DELAY', '0.02')),
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -209,6 +201,147 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# HTTP-клиент HH.ru: общий на процесс пул keep-alive соединений
+# (см. parserapp/services/http_client.py)
+
+HH_HTTP_POOL = {
+    'POOL_CONNECTIONS': int(os.getenv('HH_POOL_CONNECTIONS', '4')),
+    'POOL_MAXSIZE': int(os.getenv('HH_POOL_MAXSIZE', '32')),
+    'POOL_BLOCK': os.getenv('HH_POOL_BLOCK', 'False').lower() in ('1', 'true', 'yes', 'on'),
+    'KEEP_ALIVE': os.getenv('HH_KEEP_ALIVE', 'True').lower() in ('1', 'true', 'yes', 'on'),
+    'KEEP_ALIVE_IDLE': int(os.getenv('HH_KEEP_ALIVE_IDLE', '60')),
+    'TIMEOUT': float(os.getenv('HH_TIMEOUT', '10')),
+    'ASYNC_MAX_CONNECTIONS': int(os.getenv('HH_ASYNC_MAX_CONNECTIONS', '200')),
+}
+
+# Сколько страниц выдачи HH.ru загружать параллельно при полном обходе (parserapp/services/crawler.py)
+HH_CRAWL_MAX_WORKERS = int(os.getenv('HH_CRAWL_MAX_WORKERS', '4'))
+
+# Кэш результатов поиска HH.ru (parserapp/services/cache.py)
+# По умолчанию — LocMemCache: работает без внешних сервисов, размер ограничен MAX_ENTRIES,
+# при переполнении вытесняется 1/CULL_FREQUENCY наименее давно использованных записей (LRU).
+# HH_CACHE_BACKEND=file переключает на файловый кэш (общий для нескольких процессов).
+
+HH_CACHE_BACKEND = os.getenv('HH_CACHE_BACKEND', 'locmem').lower()
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'hh': {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache'
+            if HH_CACHE_BACKEND == 'file'
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': (
+            str(BASE_DIR / '.cache' / 'hh')
+            if HH_CACHE_BACKEND == 'file'
+            else 'hh-search'
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('HH_CACHE_MAX_ENTRIES', '1000')),
+            'CULL_FREQUENCY': int(os.getenv('HH_CACHE_CULL_FREQUENCY', '10')),
+        },
+    },
+}
+
+HH_CACHE = {
+    'ALIAS': 'hh',
+    'TTL': int(os.getenv('HH_CACHE_TTL', '60')),
+    'STALE_TTL': int(os.getenv('HH_CACHE_STALE_TTL', '300')),
+    'STALE_IF_ERROR': int(os.getenv('HH_CACHE_STALE_IF_ERROR', '3600')),
+}
+
+# Ограничение скорости, повторы и circuit breaker для запросов к HH.ru (parserapp/services/resilience.py)
+HH_RESILIENCE = {
+    'RATE': float(os.getenv('HH_RATE', '10')),
+    'MAX_RATE': float(os.getenv('HH_MAX_RATE', '20')),
+    'MAX_CONCURRENCY': int(os.getenv('HH_MAX_CONCURRENCY', '16')),
+    'RETRIES': int(os.getenv('HH_RETRIES', '3')),
+    'FAILURE_THRESHOLD': int(os.getenv('HH_BREAKER_FAILURES', '5')),
+    'RESET_TIMEOUT': float(os.getenv('HH_BREAKER_RESET', '30')),
+}
+
+# Загрузка полных описаний вакансий (parserapp/services/details.py)
+HH_DETAILS = {
+    'TTL': int(os.getenv('HH_DETAILS_TTL', str(24 * 3600))),
+    'WORKERS': int(os.getenv('HH_DETAILS_WORKERS', '8')),
+    'BATCH_SIZE': int(os.getenv('HH_DETAILS_BATCH_SIZE', '200')),
+}
+
+# Воркер заданий по расписанию (parserapp/services/jobs.py, python manage.py run_worker)
+HH_JOBS = {
+    'WORKERS': int(os.getenv('HH_JOBS_WORKERS', '4')),
+    'POLL_INTERVAL': float(os.getenv('HH_JOBS_POLL_INTERVAL', '5')),
+    'LEASE': int(os.getenv('HH_JOBS_LEASE', '300')),
+    'HEARTBEAT': int(os.getenv('HH_JOBS_HEARTBEAT', '60')),
+}
+
+# Логирование (parserapp/utilis/logger.py): запись в очередь, вывод в фоновом потоке.
+# HH_LOG_FORMAT=text|json, HH_LOG_FILE — писать в файл вместо stderr,
+# HH_LOG_SAMPLE_RATE — доля пропускаемых записей уровня INFO и ниже (предупреждения и ошибки — все),
+# HH_LOG_PAYLOAD_SAMPLE_RATE — доля запросов, для которых тело ответа HH.ru пишется в лог (нужен HH_LOG_LEVEL=DEBUG).
+HH_LOGGING = {
+    'PAYLOAD_SAMPLE_RATE': float(os.getenv('HH_LOG_PAYLOAD_SAMPLE_RATE', '0')),
+    'PAYLOAD_MAX_BYTES': int(os.getenv('HH_LOG_PAYLOAD_MAX_BYTES', '4096')),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'text': {'()': 'parserapp.utilis.logger.KeyValueFormatter'},
+        'json': {'()': 'parserapp.utilis.logger.JsonFormatter'},
+    },
+    'filters': {
+        'sample': {
+            '()': 'parserapp.utilis.logger.SamplingFilter',
+            'rate': float(os.getenv('HH_LOG_SAMPLE_RATE', '1')),
+            'max_level': 'INFO',
+        },
+    },
+    'handlers': {
+        'queue': {
+            '()': 'parserapp.utilis.logger.AsyncQueueHandler',
+            'filename': os.getenv('HH_LOG_FILE') or None,
+            'formatter': os.getenv('HH_LOG_FORMAT', 'text'),
+            'filters': ['sample'],
+        },
+    },
+    'loggers': {
+        'parserapp': {
+            'handlers': ['queue'],
+            'level': os.getenv('HH_LOG_LEVEL', 'INFO').upper(),
+            'propagate': False,
+        },
+    },
+}
+
+# Метрики и профилирование (parserapp/services/metrics.py, GET /metrics)
+HH_METRICS = {
+    'SLOW_REQUEST_MS': float(os.getenv('HH_SLOW_REQUEST_MS', '1000')),
+    'PROFILE': os.getenv('HH_PROFILE', 'False').lower() in ('1', 'true', 'yes', 'on'),
+    'PROFILE_HEADER': os.getenv('HH_PROFILE_HEADER', 'False').lower() in ('1', 'true', 'yes', 'on'),
+    'PROFILE_DIR': os.getenv('HH_PROFILE_DIR', str(BASE_DIR / 'profiles')),
+}
+
+# Источники вакансий для /api/search/ и search_vacancies (parserapp/services/sources.py):
+# опрашиваются параллельно, каждый со своим таймаутом. Новая площадка — подкласс SourceAdapter:
+# 'Имя': {'ADAPTER': 'путь.к.Адаптеру', 'TIMEOUT': 5, 'OPTIONS': {...}}
+HH_SOURCES = {
+    'HH.ru': {
+        'ENABLED': os.getenv('HH_SOURCE_ENABLED', 'True').lower() in ('1', 'true', 'yes', 'on'),
+        'TIMEOUT': float(os.getenv('HH_SOURCE_TIMEOUT', '10')),
+    },
+}
+
+# Сохранять результаты /api/search/ в таблицу Vacancy (parserapp/services/ingest.py)
+HH_STORE_SEARCH_RESULTS = os.getenv('HH_STORE_SEARCH_RESULTS', 'False').lower() in ('1', 'true', 'yes', 'on')
+
+# Глубина первой синхронизации отслеживаемого запроса, дней (parserapp/services/sync.py)
+HH_SYNC_INITIAL_DAYS = int(os.getenv('HH_SYNC_INITIAL_DAYS', '30'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/6.0/ref/settings/#default-auto-field
 
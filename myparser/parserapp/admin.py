@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Vacancy
+from .models import ExchangeRate, ScheduledJob, SearchSync, Vacancy, VacancyDetail
+from .services import fulltext
 
 
 @admin.register(Vacancy)
@@ -8,3 +9,40 @@ class VacancyAdmin(admin.ModelAdmin):
     list_filter = ('source', 'work_mode', 'currency', 'created_at')
     search_fields = ('title', 'company_name', 'location', 'description')
     readonly_fields = ('created_at', 'updated_at')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Вместо LIKE '%…%' по четырём полям — полнотекстовый индекс FTS5
+        if search_term and fulltext.is_available():
+            return fulltext.filter_queryset(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+@admin.register(SearchSync)
+class SearchSyncAdmin(admin.ModelAdmin):
+    list_display = ('query', 'watermark', 'last_synced_at', 'last_fetched')
+    search_fields = ('query',)
+    readonly_fields = ('watermark', 'last_synced_at', 'last_fetched', 'created_at')
+
+
+@admin.register(ExchangeRate)
+class ExchangeRateAdmin(admin.ModelAdmin):
+    list_display = ('code', 'name', 'rate', 'updated_at')
+    search_fields = ('code', 'name')
+
+
+@admin.register(VacancyDetail)
+class VacancyDetailAdmin(admin.ModelAdmin):
+    list_display = ('vacancy', 'experience', 'employment', 'archived', 'fetched_at')
+    list_filter = ('archived', 'experience', 'employment')
+    search_fields = ('vacancy__title', 'vacancy__external_id')
+    raw_id_fields = ('vacancy',)
+    readonly_fields = ('etag', 'last_modified', 'fetched_at', 'updated_at')
+
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'query', 'interval', 'enabled', 'next_run_at', 'locked_by', 'attempts', 'last_finished_at')
+    list_filter = ('kind', 'enabled')
+    search_fields = ('query',)
+    readonly_fields = ('locked_by', 'locked_until', 'heartbeat_at', 'attempts', 'last_started_at', 'last_finished_at',
+                       'last_result', 'last_error', 'created_at')
@@ -0,0 +1,187 @@
+"""
+Локальная замена api.hh.ru для бенчмарков: отдаёт записанные ответы /vacancies из fixtures/
+и /vacancies/{id} (с ETag и ответом 304 на If-None-Match).
+
+Запуск отдельно (например, чтобы направить на него runserver через HH_API_URL):
+    python -m parserapp.benchmarks.fake_hh --port 8765 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import copy
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+
+FIXTURE_PATH = Path(__file__).resolve().parent / "fixtures" / "vacancies.json"
+HH_MAX_DEPTH = 2000
+
+
+def load_fixture(path=FIXTURE_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeHHServer:
+    """
+    HTTP-сервер с ответами в формате /vacancies.
+
+    Вакансии берутся из фикстуры по кругу, id делаются уникальными для каждой позиции выдачи.
+    latency — задержка ответа в секундах, error_rate — доля ответов 503, found — размер выдачи
+    (страниц — found / per_page, но не глубже 2000 вакансий, как у HH.ru).
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, found=2000, fixture=None, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.found = found
+        self.items = (fixture or load_fixture())["items"]
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/vacancies"
+
+    def page_payload(self, page, per_page):
+        depth = min(self.found, HH_MAX_DEPTH)
+        start = page * per_page
+        items = []
+        for position in range(start, min(start + per_page, depth)):
+            item = copy.copy(self.items[position % len(self.items)])
+            item["id"] = str(100000000 + position)
+            item["alternate_url"] = f"https://hh.ru/vacancy/{item['id']}"
+            items.append(item)
+        return {
+            "items": items,
+            "found": self.found,
+            "pages": -(-depth // per_page),
+            "page": page,
+            "per_page": per_page,
+        }
+
+    def detail_payload(self, vacancy_id):
+        """Ответ /vacancies/{id} для вакансии из page_payload: описание собирается из сниппета фикстуры."""
+        try:
+            position = int(vacancy_id) - 100000000
+        except ValueError:
+            return None
+        if not 0 <= position < min(self.found, HH_MAX_DEPTH):
+            return None
+        item = copy.copy(self.items[position % len(self.items)])
+        snippet = item.get("snippet") or {}
+        item["id"] = vacancy_id
+        item["description"] = f"<p>{snippet.get('responsibility') or ''}</p><p><strong>Требования:</strong> {snippet.get('requirement') or ''}</p>"
+        item["key_skills"] = [{"name": "Python"}, {"name": "SQL"}, {"name": "Git"}]
+        return item
+
+    def _should_fail(self):
+        with self._lock:
+            self.requests += 1
+            failed = self.error_rate and self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return failed
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.startswith("/vacancies/"):
+                    return self._detail(url.path.rsplit("/", 1)[1])
+                if url.path != "/vacancies":
+                    return self._send(404, {"errors": [{"type": "not_found"}]})
+                query = parse_qs(url.query)
+                page = int(query.get("page", ["0"])[0])
+                per_page = int(query.get("per_page", ["20"])[0])
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._should_fail():
+                    return self._send(503, {"errors": [{"type": "service_unavailable"}]})
+                if (page + 1) * per_page > HH_MAX_DEPTH:
+                    return self._send(400, {"errors": [{"type": "bad_argument", "value": "page"}]})
+                return self._send(200, server.page_payload(page, per_page))
+
+            def _detail(self, vacancy_id):
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._should_fail():
+                    return self._send(503, {"errors": [{"type": "service_unavailable"}]})
+                payload = server.detail_payload(vacancy_id)
+                if payload is None:
+                    return self._send(404, {"errors": [{"type": "not_found"}]})
+                etag = '"' + hashlib.md5(json.dumps(payload, sort_keys=True).encode()).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                return self._send(200, payload, {"ETag": etag})
+
+            def _send(self, status, payload, headers=None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="fake-hh", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальная замена api.hh.ru")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--found", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = FakeHHServer(args.host, args.port, args.latency, args.error_rate, args.found)
+    print(f"Fake HH: {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
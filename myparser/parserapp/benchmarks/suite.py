@@ -0,0 +1,258 @@
+"""
+Бенчмарки горячих путей без обращения к api.hh.ru.
+
+Каждый бенчмарк возвращает dict метрик; run_suite собирает их в один JSON-отчёт,
+compare_reports сравнивает отчёт с предыдущим и возвращает список регрессий.
+"""
+import contextlib
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from parserapp.benchmarks.fake_hh import FIXTURE_PATH, FakeHHServer, load_fixture
+from parserapp.serializers import vacancy_from_hh
+from parserapp.services import fastjson
+from parserapp.services.cache import get_cache_settings
+from parserapp.services.crawler import crawl_vacancies
+from parserapp.services.hh_async import AsyncHHParser
+from parserapp.services.hh_parser import HHParser
+from parserapp.services.ingest import ingest_vacancies
+from parserapp.services.resilience import reset_resilience
+
+
+# Ограничитель скорости на бенчмарке не нужен: меряем свой код, а не квоту HH.ru
+BENCHMARK_RESILIENCE = {
+    "RATE": 1e6,
+    "MAX_RATE": 1e6,
+    "BURST": 1e6,
+    "MAX_CONCURRENCY": 1000,
+    "BACKOFF_BASE": 0.01,
+    "BACKOFF_CAP": 0.05,
+    "FAILURE_THRESHOLD": 10 ** 6,
+}
+
+# Метрика, по которой ищется регрессия, и её направление
+REGRESSION_METRICS = {
+    "serializer": ("items_per_sec", "higher"),
+    "json_pipeline": ("items_per_sec", "higher"),
+    "search_view_cold": ("p99_ms", "lower"),
+    "search_view_warm": ("p99_ms", "lower"),
+    "multipage_fetch": ("seconds", "lower"),
+    "ingest_insert": ("rows_per_sec", "higher"),
+    "ingest_unchanged": ("rows_per_sec", "higher"),
+}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_summary(latencies):
+    values = sorted(latencies)
+    return {
+        "mean_ms": round(1000 * sum(values) / len(values), 3) if values else 0.0,
+        "p50_ms": round(1000 * percentile(values, 0.50), 3),
+        "p90_ms": round(1000 * percentile(values, 0.90), 3),
+        "p99_ms": round(1000 * percentile(values, 0.99), 3),
+        "max_ms": round(1000 * values[-1], 3) if values else 0.0,
+    }
+
+
+@contextlib.contextmanager
+def hh_stand_in(server):
+    """Направляет HHParser/AsyncHHParser на fake_hh и отключает ограничение скорости на время бенчмарка."""
+    sync_url, async_url = HHParser.BASE_URL, AsyncHHParser.BASE_URL
+    HHParser.BASE_URL = AsyncHHParser.BASE_URL = server.url
+    try:
+        with override_settings(HH_RESILIENCE=BENCHMARK_RESILIENCE, HH_STORE_SEARCH_RESULTS=False):
+            reset_resilience()
+            caches[get_cache_settings()["ALIAS"]].clear()
+            yield server
+    finally:
+        HHParser.BASE_URL, AsyncHHParser.BASE_URL = sync_url, async_url
+        reset_resilience()
+
+
+def bench_serializer(iterations=200):
+    """Пропускная способность vacancy_from_hh на записанных вакансиях."""
+    items = load_fixture()["items"]
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for item in items:
+            vacancy_from_hh(item)
+    elapsed = time.perf_counter() - started
+    total = iterations * len(items)
+    return {"items": total, "seconds": round(elapsed, 4), "items_per_sec": round(total / elapsed, 1)}
+
+
+def bench_json_pipeline(iterations=200):
+    """Полный путь страницы: bytes ответа HH.ru → VacancyRecord → bytes ответа API."""
+    raw = FIXTURE_PATH.read_bytes()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        vacancies = [vacancy_from_hh(item) for item in fastjson.loads(raw)["items"]]
+        fastjson.dumps({"vacancies": vacancies})
+    elapsed = time.perf_counter() - started
+    total = iterations * len(vacancies)
+    return {
+        "backend": fastjson.BACKEND,
+        "items": total,
+        "seconds": round(elapsed, 4),
+        "items_per_sec": round(total / elapsed, 1),
+    }
+
+
+def bench_search_view(requests=200, concurrency=8, warm=False, per_page=20):
+    """
+    RPS и задержки VacancySearchView (через RequestFactory, без HTTP-сервера Django).
+    warm=False — каждый запрос с новой фразой (промах кэша, запрос к fake_hh), warm=True — одна фраза.
+    """
+    from parserapp.views import VacancySearchView
+
+    factory = RequestFactory()
+    view = VacancySearchView.as_view()
+
+    def one(i):
+        phrase = "python" if warm else f"python-{i}"
+        request = factory.get("/api/search/", {"search_phrase": phrase, "per_page": per_page})
+        started = time.perf_counter()
+        response = view(request)
+        return time.perf_counter() - started, response.status_code
+
+    if warm:
+        one(-1)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(1 for _, status in results if status != 200),
+        "seconds": round(elapsed, 4),
+        "rps": round(requests / elapsed, 1),
+        **latency_summary([latency for latency, _ in results]),
+    }
+
+
+def bench_multipage(pages=20, per_page=100, workers=None):
+    """Время обхода нескольких страниц выдачи через crawl_vacancies."""
+    started = time.perf_counter()
+    count = sum(1 for _ in crawl_vacancies("python", per_page=per_page, max_workers=workers,
+                                           max_pages=pages, parser=HHParser()))
+    elapsed = time.perf_counter() - started
+    return {
+        "pages": pages,
+        "per_page": per_page,
+        "workers": workers,
+        "vacancies": count,
+        "seconds": round(elapsed, 4),
+        "pages_per_sec": round(pages / elapsed, 1),
+    }
+
+
+def _benchmark_vacancies(rows):
+    items = load_fixture()["items"]
+    vacancies = []
+    for position in range(rows):
+        vacancy = vacancy_from_hh(items[position % len(items)])
+        vacancy["external_id"] = f"bench-{position}"
+        vacancy["url"] = f"https://hh.ru/vacancy/bench-{position}"
+        vacancies.append(vacancy)
+    return vacancies
+
+
+def bench_ingest(rows=5000, batch_size=1000):
+    """
+    Скорость ingest_vacancies: первая запись (INSERT) и повторная запись тех же данных (без изменений).
+    Всё выполняется в транзакции, которая откатывается, — рабочая база не меняется.
+    """
+    vacancies = _benchmark_vacancies(rows)
+    results = {}
+    with transaction.atomic():
+        for name in ("ingest_insert", "ingest_unchanged"):
+            started = time.perf_counter()
+            report = ingest_vacancies(vacancies, batch_size=batch_size)
+            elapsed = time.perf_counter() - started
+            results[name] = {
+                "rows": rows,
+                "batch_size": batch_size,
+                "seconds": round(elapsed, 4),
+                "rows_per_sec": round(rows / elapsed, 1),
+                **report.as_dict(),
+            }
+        transaction.set_rollback(True)
+    return results
+
+
+def run_suite(latency=0.02, error_rate=0.0, found=2000, requests=200, concurrency=8,
+              pages=20, workers=None, rows=5000, iterations=200, only=None):
+    """Запускает бенчмарки (все или перечисленные в only) и возвращает отчёт для сохранения в JSON."""
+    selected = set(only or ("serializer", "search_view", "multipage", "ingest"))
+    benchmarks = {}
+
+    if "serializer" in selected:
+        benchmarks["serializer"] = bench_serializer(iterations)
+        benchmarks["json_pipeline"] = bench_json_pipeline(iterations)
+
+    with FakeHHServer(latency=latency, error_rate=error_rate, found=found, seed=0) as server, hh_stand_in(server):
+        if "search_view" in selected:
+            benchmarks["search_view_cold"] = bench_search_view(requests, concurrency, warm=False)
+            benchmarks["search_view_warm"] = bench_search_view(requests, concurrency, warm=True)
+        if "multipage" in selected:
+            benchmarks["multipage_fetch"] = bench_multipage(pages, workers=workers)
+        upstream = {"requests": server.requests, "errors": server.errors}
+
+    if "ingest" in selected:
+        benchmarks.update(bench_ingest(rows))
+
+    return {
+        "created_at": timezone.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "platform": platform.platform(),
+            "db_vendor": connection.vendor,
+        },
+        "config": {
+            "latency": latency,
+            "error_rate": error_rate,
+            "found": found,
+            "requests": requests,
+            "concurrency": concurrency,
+            "pages": pages,
+            "workers": workers,
+            "rows": rows,
+            "iterations": iterations,
+        },
+        "upstream": upstream,
+        "benchmarks": benchmarks,
+    }
+
+
+def compare_reports(current, baseline, tolerance=0.2):
+    """
+    Сравнивает основные метрики с прошлым отчётом.
+    Возвращает список (бенчмарк, метрика, было, стало) для ухудшений больше tolerance (доля).
+    """
+    regressions = []
+    for name, (metric, direction) in REGRESSION_METRICS.items():
+        before = baseline.get("benchmarks", {}).get(name, {}).get(metric)
+        after = current.get("benchmarks", {}).get(name, {}).get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        if (direction == "higher" and change < -tolerance) or (direction == "lower" and change > tolerance):
+            regressions.append((name, metric, before, after))
+    return regressions
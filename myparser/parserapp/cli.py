@@ -0,0 +1,162 @@
+"""
+Неинтерактивный поиск вакансий для cron и конвейеров shell.
+
+    python -m parserapp.cli --query python --work-mode remote --sort 1 --format jsonl | jq .title
+
+Все фильтры, сортировка и формат вывода задаются флагами, вопросов нет. Импортируется только слой сервисов
+(HHParser, сериализаторы, фильтры и сортировка): приложения Django не загружаются (django.setup не вызывается),
+пока не нужна база — с --save-db. Без базы курсы валют для сравнения зарплат берутся из фикстуры.
+Те же флаги принимает manage.py search_vacancies --no-input (со всем стеком Django).
+"""
+import time
+
+# Время запуска для --timing отсчитывается отсюда: импорты ниже (сервисы, Django) входят в startup_ms
+_STARTED = time.perf_counter()
+
+import argparse
+import logging
+import os
+import sys
+
+from parserapp.services.filters import SORT_OPTIONS, WORK_MODES, parse_filters
+
+
+FORMATS = ("text", "json", "jsonl")
+WORK_MODE_NAMES = {'office': 'В офисе', 'remote': 'Удалённо', 'hybrid': 'Гибрид'}
+
+
+def add_search_arguments(parser):
+    """Флаги поиска; общие для parserapp.cli и manage.py search_vacancies."""
+    parser.add_argument('--query', type=str, help='Поисковый запрос')
+    parser.add_argument('--page', type=int, help='Номер страницы (с 0)')
+    parser.add_argument(
+        '--per-page', type=int, help='Вакансий на странице (по умолчанию 20; в интерактивном просмотре — на экране, 10)',
+    )
+    parser.add_argument('--work-mode', choices=WORK_MODES, help='Режим работы')
+    parser.add_argument('--location', type=str, help='Город')
+    parser.add_argument('--salary-min', type=float, help='Минимальная зарплата (в валюте --currency, иначе в рублях)')
+    parser.add_argument('--currency', type=str, help='Валюта зарплаты (RUR/USD/EUR)')
+    parser.add_argument(
+        '--sort', choices=tuple(SORT_OPTIONS), help='; '.join(f'{k} — {v}' for k, v in SORT_OPTIONS.items()),
+    )
+    parser.add_argument('--format', choices=FORMATS, default='text', help='Формат вывода (по умолчанию text)')
+    parser.add_argument('--save-db', action='store_true', help='Сохранить найденные вакансии в базу данных')
+    return parser
+
+
+def options_to_filters(options):
+    """dict опций argparse/call_command в (filters, sort_option) через общий parse_filters."""
+    return parse_filters({
+        'work_mode': options.get('work_mode'),
+        'location': options.get('location'),
+        'salary_min': options.get('salary_min'),
+        'currency': options.get('currency'),
+        'sort': options.get('sort'),
+    })
+
+
+def run_search(options):
+    """Поиск во всех источниках по опциям; возвращает MultiSearchResult."""
+    from parserapp.services.sources import search_sources
+
+    filters, sort_option = options_to_filters(options)
+    return search_sources(
+        options['query'], page=options.get('page') or 0, per_page=options.get('per_page') or 20,
+        filters=filters, sort_option=sort_option,
+    )
+
+
+def format_salary(vacancy):
+    salary_from = vacancy.get('salary_from')
+    salary_to = vacancy.get('salary_to')
+    currency = vacancy.get('currency') or ''
+    if salary_from and salary_to:
+        return f'{int(salary_from):,} - {int(salary_to):,} {currency}'
+    if salary_from:
+        return f'от {int(salary_from):,} {currency}'
+    if salary_to:
+        return f'до {int(salary_to):,} {currency}'
+    return 'не указана'
+
+
+def format_vacancy(idx, vacancy):
+    """Карточка вакансии в текстовом выводе (как в интерактивной команде)."""
+    lines = [
+        f'{idx}. {vacancy.get("title") or "Без названия"}',
+        f'   Компания: {vacancy.get("company_name") or "Не указана"}',
+        f'   💰 Зарплата: {format_salary(vacancy)}',
+    ]
+    work_mode = vacancy.get('work_mode')
+    if work_mode:
+        lines.append(f'   💼 Режим: {WORK_MODE_NAMES.get(work_mode, work_mode)}')
+    if vacancy.get('location'):
+        lines.append(f'   📍 Локация: {vacancy["location"]}')
+    description = vacancy.get('description') or ''
+    if description:
+        lines.append(f'   📝 Описание: {description[:100] + "..." if len(description) > 100 else description}')
+    if vacancy.get('url'):
+        lines.append(f'   🔗 Ссылка: {vacancy["url"]}')
+    return '\n'.join(lines)
+
+
+def write_results(vacancies, fmt, stream):
+    """Пишет вакансии в stream: text — карточки, json — один массив, jsonl — по объекту на строку."""
+    from parserapp.services import fastjson
+
+    if fmt == 'json':
+        stream.write(fastjson.dumps([dict(v) for v in vacancies]).decode('utf-8') + '\n')
+    elif fmt == 'jsonl':
+        for vacancy in vacancies:
+            stream.write(fastjson.dumps(dict(vacancy)).decode('utf-8') + '\n')
+    else:
+        for idx, vacancy in enumerate(vacancies, 1):
+            stream.write(format_vacancy(idx, vacancy) + '\n' + '-' * 80 + '\n')
+
+
+def source_warnings(result):
+    """Строки о не ответивших источниках."""
+    return [
+        f'{source.name}: {"не ответил вовремя" if source.status == "timeout" else source.error}'
+        for source in result.sources if source.status != 'ok'
+    ]
+
+
+def main(argv=None):
+    parser = add_search_arguments(argparse.ArgumentParser(prog='python -m parserapp.cli', description=__doc__.strip()))
+    parser.add_argument('--timing', action='store_true', help='Время запуска и поиска в stderr')
+    args = parser.parse_args(argv)
+    if not args.query:
+        parser.error('--query обязателен')
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myparser.settings')
+    # Без django.setup() LOGGING из настроек не применяется: предупреждения — в stderr
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr, format='%(levelname)s %(name)s %(message)s')
+    if args.save_db:
+        import django
+
+        django.setup()
+    startup = time.perf_counter() - _STARTED
+
+    result = run_search(vars(args))
+    searched = time.perf_counter() - _STARTED - startup
+    for warning in source_warnings(result):
+        sys.stderr.write(f'warning: {warning}\n')
+
+    if args.save_db:
+        from parserapp.services.ingest import ingest_vacancies
+
+        report = ingest_vacancies(result.vacancies)
+        sys.stderr.write(
+            f'saved: inserted={report.inserted} updated={report.updated} unchanged={report.unchanged}\n'
+        )
+
+    write_results(result.vacancies, args.format, sys.stdout)
+    if args.timing:
+        sys.stderr.write(f'timing: startup_ms={startup * 1000:.1f} search_ms={searched * 1000:.1f} '
+                         f'vacancies={len(result.vacancies)}\n')
+    # Код 2 — ни один источник не ответил
+    return 2 if result.sources and all(s.status != 'ok' for s in result.sources) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
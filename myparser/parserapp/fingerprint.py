@@ -0,0 +1,46 @@
+"""
+Отпечаток (content_hash) полей вакансии из HH.ru: по нему пакетная запись пропускает неизменившиеся вакансии.
+Нужен и модели Vacancy (save), и слою сервисов (parserapp/services/ingest.py), поэтому лежит отдельно от обоих.
+"""
+import hashlib
+from datetime import datetime, timezone
+from decimal import Decimal
+
+
+# Поля Vacancy, которые заполняет vacancy_from_hh; по ним считается отпечаток
+HH_FIELDS = (
+    "title",
+    "company_name",
+    "description",
+    "salary_from",
+    "salary_to",
+    "currency",
+    "work_mode",
+    "location",
+    "url",
+    "source",
+    "posted_at",
+)
+
+
+def _canonical(value):
+    if value is None:
+        return "\x00"
+    if isinstance(value, Decimal):
+        return f"{value:.2f}"
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.isoformat()
+    return str(value)
+
+
+def content_hash(row):
+    """
+    Отпечаток полей HH_FIELDS (dict после ingest._normalize или экземпляр Vacancy).
+    Значения приводятся к единому виду (Decimal — 2 знака, даты — в UTC), чтобы
+    данные из HH.ru и из базы давали одинаковый отпечаток.
+    """
+    get = row.get if isinstance(row, dict) else lambda field: getattr(row, field)
+    payload = "\x1f".join(_canonical(get(field)) for field in HH_FIELDS)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from parserapp.services import fastjson
+from parserapp.services.crawler import HH_MAX_PER_PAGE, crawl_pages
+from parserapp.services.ingest import VacancyIngestor
+
+
+class Command(BaseCommand):
+    help = 'Обход всей выдачи HH.ru по запросу с параллельной загрузкой страниц'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', type=str, required=True, help='Поисковый запрос')
+        parser.add_argument('--per-page', type=int, default=HH_MAX_PER_PAGE, help='Вакансий на странице (максимум 100)')
+        parser.add_argument('--workers', type=int, default=None, help='Сколько страниц загружать одновременно')
+        parser.add_argument('--max-pages', type=int, default=None, help='Ограничить число страниц')
+        parser.add_argument('--output', type=str, default=None, help='Файл для сохранения в формате JSON Lines')
+        parser.add_argument('--ingest', action='store_true', help='Сохранить вакансии в базу данных (модель Vacancy)')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        output = open(options['output'], 'wb') if options['output'] else None
+        ingestor = VacancyIngestor() if options['ingest'] else None
+        total = 0
+        try:
+            for page, vacancies in crawl_pages(
+                options['query'],
+                per_page=options['per_page'],
+                max_workers=options['workers'],
+                max_pages=options['max_pages'],
+            ):
+                total += len(vacancies)
+                self.stderr.write(f'📄 Страница {page}: {len(vacancies)} вакансий')
+                if output:
+                    for vacancy in vacancies:
+                        output.write(fastjson.dumps(vacancy) + b'\n')
+                if ingestor:
+                    ingestor.add(vacancies)
+        finally:
+            if output:
+                output.close()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Загружено вакансий: {total} за {elapsed:.1f} с'))
+        if ingestor:
+            report = ingestor.flush()
+            self.stdout.write(self.style.SUCCESS(
+                f'💾 В базе: новых {report.inserted}, обновлено {report.updated}, без изменений {report.unchanged}'
+            ))
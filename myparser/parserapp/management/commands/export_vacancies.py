@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from parserapp.services.export import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    PARQUET_COMPRESSION,
+    TEXT_COMPRESSION,
+    export_vacancies,
+)
+from parserapp.services.filters import parse_filters
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка сохранённых вакансий в CSV, JSON Lines или Parquet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, required=True, help='Файл для выгрузки ("-" — stdout для csv/jsonl)')
+        parser.add_argument('--format', type=str, choices=FORMATS, default='csv', help='Формат файла')
+        parser.add_argument(
+            '--compression',
+            type=str,
+            default=None,
+            help=f'Сжатие: {"/".join(TEXT_COMPRESSION)} для csv/jsonl, {"/".join(PARQUET_COMPRESSION)}/none для parquet',
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Строк за одно чтение из БД')
+        # Те же фильтры, что у поиска
+        parser.add_argument('--work-mode', type=str, help='office/remote/hybrid')
+        parser.add_argument('--location', type=str, help='Город')
+        parser.add_argument('--salary-min', type=str, help='Минимальная зарплата')
+        parser.add_argument('--currency', type=str, help='Валюта (RUR/USD/EUR)')
+        parser.add_argument('--q', type=str, help='Полнотекстовый запрос')
+
+    def handle(self, *args, **options):
+        fmt = options['format']
+        compression = options['compression']
+        if compression and fmt != 'parquet' and compression not in TEXT_COMPRESSION:
+            raise CommandError(f'Для {fmt} доступно сжатие: {", ".join(TEXT_COMPRESSION)}')
+        if compression and fmt == 'parquet' and compression not in (*PARQUET_COMPRESSION, 'none'):
+            raise CommandError(f'Для parquet доступно сжатие: {", ".join(PARQUET_COMPRESSION)}, none')
+        if fmt == 'parquet' and options['output'] == '-':
+            raise CommandError('Parquet нельзя выводить в stdout, укажите файл')
+
+        filters, _ = parse_filters(options)
+        started = time.monotonic()
+        try:
+            count = export_vacancies(
+                options['output'],
+                fmt,
+                compression=compression,
+                filters=filters,
+                text=options['q'],
+                chunk_size=options['chunk_size'],
+            )
+        except (RuntimeError, ValueError) as e:
+            raise CommandError(str(e))
+
+        elapsed = time.monotonic() - started
+        self.stderr.write(self.style.SUCCESS(f'✅ Выгружено вакансий: {count} за {elapsed:.1f} с → {options["output"]}'))
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from parserapp.models import Vacancy
+from parserapp.services.details import fetch_details
+
+
+class Command(BaseCommand):
+    help = 'Загружает полные описания, ключевые навыки, опыт и тип занятости сохранённых вакансий (/vacancies/{id})'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', type=str, nargs='+', help='ID вакансий HH.ru (по умолчанию — все сохранённые)')
+        parser.add_argument('--workers', type=int, default=None, help='Одновременных запросов к HH.ru')
+        parser.add_argument('--batch-size', type=int, default=None, help='Вакансий в одной пачке')
+        parser.add_argument('--ttl', type=int, default=None, help='Не перепроверять описания моложе стольких секунд')
+        parser.add_argument('--force', action='store_true', help='Перепроверить все описания (запросы всё равно условные)')
+        parser.add_argument('--limit', type=int, default=None, help='Обработать не больше стольких вакансий')
+
+    def handle(self, *args, **options):
+        queryset = Vacancy.objects.all()
+        if options['ids']:
+            queryset = queryset.filter(external_id__in=options['ids'])
+
+        started = time.monotonic()
+        report = fetch_details(
+            queryset,
+            ttl=options['ttl'],
+            max_workers=options['workers'],
+            batch_size=options['batch_size'],
+            force=options['force'],
+            limit=options['limit'],
+            on_batch=lambda report: self.stderr.write(
+                f'📄 Загружено {report.fetched}, без изменений {report.not_modified}, ошибок {report.failed}'
+            ),
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ За {elapsed:.1f} с: новых/изменившихся {report.fetched}, без изменений (304) {report.not_modified}, '
+            f'свежих (пропущено) {report.fresh}, удалённых {report.missing}, ошибок {report.failed}'
+        ))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from parserapp.services.currency import invalidate_rates, recompute_salaries
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает зарплаты вакансий в рублях (salary_min_rub/salary_max_rub) по текущим курсам ExchangeRate'
+
+    def handle(self, *args, **options):
+        invalidate_rates()
+        started = time.monotonic()
+        updated = recompute_salaries()
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f'✅ Пересчитано вакансий: {updated} за {elapsed:.1f} с'))
@@ -0,0 +1,66 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from parserapp.benchmarks.suite import compare_reports, run_suite
+
+
+BENCHMARKS = ('serializer', 'search_view', 'multipage', 'ingest')
+
+
+class Command(BaseCommand):
+    help = 'Бенчмарки парсинга, поиска, обхода страниц и записи в БД на локальной замене HH.ru (без сети)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', type=str, default='benchmark.json', help='Куда записать отчёт (JSON)')
+        parser.add_argument('--baseline', type=str, default=None, help='Прошлый отчёт для сравнения')
+        parser.add_argument('--tolerance', type=float, default=0.2, help='Допустимое ухудшение метрики (доля)')
+        parser.add_argument('--only', type=str, nargs='+', choices=BENCHMARKS, help='Запустить только эти бенчмарки')
+        parser.add_argument('--latency', type=float, default=0.02, help='Задержка ответа fake HH, секунд')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 503 от fake HH')
+        parser.add_argument('--found', type=int, default=2000, help='Размер выдачи fake HH')
+        parser.add_argument('--requests', type=int, default=200, help='Запросов к VacancySearchView')
+        parser.add_argument('--concurrency', type=int, default=8, help='Одновременных запросов к VacancySearchView')
+        parser.add_argument('--pages', type=int, default=20, help='Страниц для обхода')
+        parser.add_argument('--workers', type=int, default=None, help='Потоков для обхода страниц')
+        parser.add_argument('--rows', type=int, default=5000, help='Вакансий для записи в БД')
+        parser.add_argument('--iterations', type=int, default=200, help='Проходов по фикстуре для vacancy_from_hh')
+
+    def handle(self, *args, **options):
+        # Журнал запросов parserapp на бенчмарке — только шум (и лишняя работа очереди логов)
+        logger = logging.getLogger('parserapp')
+        level = logger.level
+        logger.setLevel(logging.WARNING)
+        try:
+            report = run_suite(
+                latency=options['latency'],
+                error_rate=options['error_rate'],
+                found=options['found'],
+                requests=options['requests'],
+                concurrency=options['concurrency'],
+                pages=options['pages'],
+                workers=options['workers'],
+                rows=options['rows'],
+                iterations=options['iterations'],
+                only=options['only'],
+            )
+        finally:
+            logger.setLevel(level)
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        for name, metrics in report['benchmarks'].items():
+            summary = ', '.join(f'{key}={value}' for key, value in metrics.items())
+            self.stdout.write(f'{name}: {summary}')
+        self.stdout.write(self.style.SUCCESS(f'✅ Отчёт сохранён в {options["output"]}'))
+
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                baseline = json.load(f)
+            regressions = compare_reports(report, baseline, options['tolerance'])
+            for name, metric, before, after in regressions:
+                self.stderr.write(self.style.ERROR(f'❌ {name}.{metric}: {before} → {after}'))
+            if regressions:
+                raise CommandError(f'Регрессий производительности: {len(regressions)}')
+            self.stdout.write(self.style.SUCCESS('✅ Регрессий относительно базового отчёта нет'))
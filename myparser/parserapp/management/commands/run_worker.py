@@ -0,0 +1,64 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+from parserapp.models import ScheduledJob
+from parserapp.services.jobs import JOB_HANDLERS, JobWorker, add_job
+
+
+class Command(BaseCommand):
+    help = 'Воркер заданий по расписанию (синхронизация, обход выдачи, описания) с очередью в базе данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--add', type=str, metavar='QUERY', help='Добавить задание для поискового запроса')
+        parser.add_argument('--kind', type=str, default='sync', choices=sorted(JOB_HANDLERS), help='Тип задания для --add')
+        parser.add_argument('--interval', type=int, default=3600, help='Период запуска задания для --add, секунд')
+        parser.add_argument('--max-pages', type=int, default=None, help='Ограничить число страниц (для --kind crawl)')
+        parser.add_argument('--run-now', action='store_true', help='Первый запуск задания из --add — сразу')
+        parser.add_argument('--remove', type=int, metavar='ID', help='Удалить задание')
+        parser.add_argument('--list', action='store_true', help='Показать задания')
+        parser.add_argument('--workers', type=int, default=None, help='Заданий, выполняемых одновременно')
+        parser.add_argument('--worker-id', type=str, default=None, help='Имя воркера (по умолчанию host:pid)')
+        parser.add_argument('--once', action='store_true', help='Выполнить готовые задания и выйти')
+
+    def handle(self, *args, **options):
+        if options['add'] is not None:
+            params = {'max_pages': options['max_pages']} if options['max_pages'] else {}
+            try:
+                job, created = add_job(options['kind'], options['add'], options['interval'], params, options['run_now'])
+            except ValueError as e:
+                raise CommandError(str(e))
+            message = 'добавлено' if created else 'обновлено'
+            self.stdout.write(self.style.SUCCESS(
+                f'➕ Задание #{job.pk} "{job}" {message}, первый запуск {job.next_run_at:%Y-%m-%d %H:%M:%S}'
+            ))
+            return
+
+        if options['remove']:
+            deleted, _ = ScheduledJob.objects.filter(pk=options['remove']).delete()
+            if deleted:
+                self.stdout.write(self.style.SUCCESS(f'➖ Задание #{options["remove"]} удалено'))
+            else:
+                self.stdout.write(self.style.WARNING(f'Задание #{options["remove"]} не найдено'))
+            return
+
+        if options['list']:
+            for job in ScheduledJob.objects.all():
+                state = f'выполняет {job.locked_by}' if job.locked_by else ('включено' if job.enabled else 'выключено')
+                self.stdout.write(
+                    f'#{job.pk} {job} каждые {job.interval} с, следующий запуск {job.next_run_at:%Y-%m-%d %H:%M:%S}, '
+                    f'{state}' + (f', ошибок подряд {job.attempts}' if job.attempts else '')
+                )
+            return
+
+        worker = JobWorker(workers=options['workers'], worker_id=options['worker_id'], log=self.stdout.write)
+
+        def shutdown(signum, frame):
+            self.stdout.write(self.style.WARNING('⏹ Остановка: дожидаемся выполняемых заданий...'))
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, shutdown)
+        signal.signal(signal.SIGINT, shutdown)
+
+        self.stdout.write(f'🚀 Воркер {worker.worker_id}: {worker.workers} потоков')
+        worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Выполнено заданий: {worker.completed}, с ошибкой: {worker.failed}'))
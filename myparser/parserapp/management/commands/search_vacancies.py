@@ -1,20 +1,30 @@
 from django.core.management.base import BaseCommand
-from parserapp.services.hh_parser import HHParser
+from parserapp.cli import (
+    add_search_arguments, format_vacancy, options_to_filters, run_search, source_warnings, write_results,
+)
+from parserapp.services.details import get_vacancy_detail
+from parserapp.services.filters import SORT_OPTIONS, parse_filters
+from parserapp.services.ingest import ingest_vacancies
+from parserapp.services.pager import DEFAULT_SCREEN_SIZE, SearchPager
+
+FILTER_OPTIONS = ('work_mode', 'location', 'salary_min', 'currency')
 
 
 class Command(BaseCommand):
-    help = 'Интерактивный поиск вакансий с фильтрацией и сортировкой'
+    help = 'Интерактивный поиск вакансий с фильтрацией и сортировкой (--no-input — без вопросов, для скриптов)'
 
     def add_arguments(self, parser):
+        add_search_arguments(parser)
         parser.add_argument(
-            '--query',
-            type=str,
-            help='Поисковый запрос (если не указан, будет запрошен интерактивно)',
+            '--no-input',
+            action='store_true',
+            help='Не задавать вопросов: всё берётся из флагов, результат выводится в --format',
         )
 
     def handle(self, *args, **options):
-        parser = HHParser()
-        
+        if options.get('no_input'):
+            return self._handle_no_input(options)
+
         # 1. Запрос поисковой фразы
         search_query = options.get('query')
         if not search_query:
@@ -23,249 +33,141 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR('Поисковый запрос не может быть пустым!'))
                 return
         
-        # 2. Запрос количества результатов
-        try:
-            per_page = int(input("📊 Сколько вакансий показать? (по умолчанию 20): ") or "20")
-        except ValueError:
-            per_page = 20
-        
-        # 3. Поиск вакансий
+        # 2. Выбор фильтров и сортировки — до запроса: каждый источник сам передаёт свои фильтры площадке.
+        # Заданные флагами не спрашиваются.
+        if any(options.get(name) not in (None, '') for name in FILTER_OPTIONS):
+            filters, _ = options_to_filters(options)
+        else:
+            filters = self._ask_filters()
+        sort_option = options.get('sort') or self._ask_sort_option()
+
+        # 3. Постраничный просмотр: первый экран — после одного запроса, следующие догружаются в фоне
         self.stdout.write(self.style.SUCCESS(f'\n🔎 Ищу вакансии по запросу "{search_query}"...'))
-        vacancies = parser.get_vacancies(search_query, page=0, per_page=per_page)
-        
-        if not vacancies:
-            self.stdout.write(self.style.WARNING('Вакансии не найдены.'))
+        with SearchPager(
+            search_query, filters, sort_option, screen_size=options.get('per_page') or DEFAULT_SCREEN_SIZE,
+            page=options.get('page') or 0,
+        ) as pager:
+            self._browse(pager, save_db=options.get('save_db'))
+
+    def _handle_no_input(self, options):
+        """Поиск без вопросов: результат — в stdout в формате --format, предупреждения — в stderr."""
+        if not options.get('query'):
+            self.stderr.write(self.style.ERROR('--query обязателен вместе с --no-input'))
             return
-        
-        self.stdout.write(self.style.SUCCESS(f'\n✅ Найдено вакансий: {len(vacancies)}\n'))
-        
-        # 4. Выбор фильтров
-        filters = self._ask_filters()
-        
-        # 5. Применение фильтров
-        filtered_vacancies = self._apply_filters(vacancies, filters)
-        
-        if not filtered_vacancies:
-            self.stdout.write(self.style.WARNING('Нет вакансий, соответствующих выбранным фильтрам.'))
-            return
-        
-        # 6. Выбор сортировки
-        sort_option = self._ask_sort_option()
-        
-        # 7. Сортировка
-        sorted_vacancies = self._sort_vacancies(filtered_vacancies, sort_option)
-        
-        # 8. Вывод результатов
-        self._display_vacancies(sorted_vacancies)
-        
-        # 9. Дополнительные действия
-        self._ask_additional_actions(sorted_vacancies)
+        result = run_search(options)
+        for warning in source_warnings(result):
+            self.stderr.write(self.style.WARNING(warning))
+        if options.get('save_db'):
+            self._save_db(result.vacancies, stream=self.stderr)
+        write_results(result.vacancies, options['format'], self.stdout)
+
+    def _save_db(self, vacancies, stream=None):
+        report = ingest_vacancies(vacancies)
+        (stream or self.stdout).write(self.style.SUCCESS(
+            f'💾 Сохранено в базу: новых {report.inserted}, обновлено {report.updated}, без изменений {report.unchanged}\n'
+        ))
 
     def _ask_filters(self):
         """Запрашивает фильтры у пользователя"""
-        filters = {}
-        
         self.stdout.write(self.style.WARNING('\n📋 Фильтры (нажмите Enter, чтобы пропустить):'))
         
-        # Фильтр по режиму работы
-        work_mode = input("💼 Режим работы (office/remote/hybrid/любой): ").strip().lower()
-        if work_mode in ['office', 'remote', 'hybrid']:
-            filters['work_mode'] = work_mode
-        
-        # Фильтр по городу
-        location = input("📍 Город (например: Москва): ").strip()
-        if location:
-            filters['location'] = location
-        
-        # Фильтр по минимальной зарплате
-        salary_min = input("💰 Минимальная зарплата (число): ").strip()
-        if salary_min:
-            try:
-                filters['salary_min'] = float(salary_min)
-            except ValueError:
-                pass
-        
-        # Фильтр по валюте
-        currency = input("💵 Валюта (RUR/USD/EUR/любая): ").strip().upper()
-        if currency:
-            filters['currency'] = currency
-        
+        raw = {
+            'work_mode': input("💼 Режим работы (office/remote/hybrid/любой): "),
+            'location': input("📍 Город (например: Москва): "),
+            'salary_min': input("💰 Минимальная зарплата (число): ").strip(),
+            'currency': input("💵 Валюта (RUR/USD/EUR/любая): "),
+        }
+        filters, _ = parse_filters(raw)
         return filters
 
-    def _apply_filters(self, vacancies, filters):
-        """Применяет фильтры к списку вакансий"""
-        filtered = vacancies
-        
-        if 'work_mode' in filters:
-            filtered = [v for v in filtered if v.get('work_mode') == filters['work_mode']]
-        
-        if 'location' in filters:
-            location_lower = filters['location'].lower()
-            filtered = [v for v in filtered if location_lower in v.get('location', '').lower()]
-        
-        if 'salary_min' in filters:
-            filtered = [v for v in filtered if self._check_salary(v, filters['salary_min'])]
-        
-        if 'currency' in filters:
-            filtered = [v for v in filtered if v.get('currency', '').upper() == filters['currency']]
-        
-        return filtered
-
-    def _check_salary(self, vacancy, min_salary):
-        """Проверяет, соответствует ли зарплата минимальному значению"""
-        salary_from = vacancy.get('salary_from')
-        salary_to = vacancy.get('salary_to')
-        
-        if salary_from and salary_from >= min_salary:
-            return True
-        if salary_to and salary_to >= min_salary:
-            return True
-        return False
-
     def _ask_sort_option(self):
         """Запрашивает опцию сортировки"""
         self.stdout.write(self.style.WARNING('\n🔄 Сортировка:'))
-        self.stdout.write('1. По зарплате (от большей к меньшей)')
-        self.stdout.write('2. По зарплате (от меньшей к большей)')
-        self.stdout.write('3. По названию компании (А-Я)')
-        self.stdout.write('4. По названию вакансии (А-Я)')
-        self.stdout.write('5. Без сортировки')
+        for key, label in SORT_OPTIONS.items():
+            self.stdout.write(f'{key}. {label}')
         
         choice = input("\nВыберите вариант (1-5, по умолчанию 5): ").strip() or "5"
         return choice
 
-    def _sort_vacancies(self, vacancies, sort_option):
-        """Сортирует вакансии по выбранному критерию"""
-        if sort_option == "1":
-            # По зарплате (от большей к меньшей)
-            return sorted(vacancies, key=lambda v: self._get_max_salary(v), reverse=True)
-        elif sort_option == "2":
-            # По зарплате (от меньшей к большей)
-            return sorted(vacancies, key=lambda v: self._get_min_salary(v))
-        elif sort_option == "3":
-            # По названию компании
-            return sorted(vacancies, key=lambda v: v.get('company_name', '').lower())
-        elif sort_option == "4":
-            # По названию вакансии
-            return sorted(vacancies, key=lambda v: v.get('title', '').lower())
-        else:
-            # Без сортировки
-            return vacancies
-
-    def _get_max_salary(self, vacancy):
-        """Возвращает максимальную зарплату для сортировки"""
-        salary_to = vacancy.get('salary_to')
-        salary_from = vacancy.get('salary_from')
-        if salary_to:
-            return float(salary_to)
-        if salary_from:
-            return float(salary_from)
-        return 0
-
-    def _get_min_salary(self, vacancy):
-        """Возвращает минимальную зарплату для сортировки"""
-        salary_from = vacancy.get('salary_from')
-        salary_to = vacancy.get('salary_to')
-        if salary_from:
-            return float(salary_from)
-        if salary_to:
-            return float(salary_to)
-        return float('inf')
+    def _browse(self, pager, save_db=False):
+        """Показывает вакансии по экрану; Enter — следующий экран, номер — детали, s — в файл, q — выход"""
+        warnings_shown = 0
+        screen = pager.next_screen()
+        while True:
+            for warning in pager.warnings[warnings_shown:]:
+                self.stdout.write(self.style.WARNING(f'⚠️ {warning}'))
+            warnings_shown = len(pager.warnings)
+
+            if not pager.shown:
+                self.stdout.write(self.style.WARNING('Вакансии, соответствующие выбранным фильтрам, не найдены.'))
+                return
+            if screen:
+                if save_db:
+                    self._save_db(screen)
+                self._display_screen(screen, start=len(pager.shown) - len(screen) + 1)
+            if pager.exhausted:
+                self.stdout.write(self.style.SUCCESS(f'\n📋 Это все вакансии: {len(pager.shown)}'))
+
+            prompt = 'номер — детали, s — сохранить в файл, q — выход'
+            if not pager.exhausted:
+                prompt = 'Enter — ещё вакансии, ' + prompt
+            choice = input(f"\n{prompt}: ").strip().lower()
+
+            screen = []
+            if choice in ('q', 'й'):
+                self.stdout.write(self.style.SUCCESS('\n👋 До свидания!'))
+                return
+            if choice in ('s', 'ы'):
+                self._save_to_file(pager.shown)
+            elif choice.isdigit():
+                idx = int(choice)
+                if 1 <= idx <= len(pager.shown):
+                    self._show_vacancy_details(pager.shown[idx - 1])
+                else:
+                    self.stdout.write(self.style.ERROR('Неверный номер вакансии!'))
+            elif choice:
+                self.stdout.write(self.style.ERROR('Неизвестная команда'))
+            elif not pager.exhausted:
+                screen = pager.next_screen()
+            else:
+                return
 
-    def _display_vacancies(self, vacancies):
-        """Выводит список вакансий"""
-        self.stdout.write(self.style.SUCCESS(f'\n📋 Найдено вакансий после фильтрации: {len(vacancies)}\n'))
+    def _display_screen(self, vacancies, start=1):
+        """Выводит экран вакансий с общей нумерацией"""
         self.stdout.write('=' * 80)
-        
-        for idx, vacancy in enumerate(vacancies, 1):
-            self.stdout.write(f'\n{idx}. {vacancy.get("title", "Без названия")}')
-            self.stdout.write(f'   Компания: {vacancy.get("company_name", "Не указана")}')
-            
-            # Зарплата
-            salary_from = vacancy.get('salary_from')
-            salary_to = vacancy.get('salary_to')
-            currency = vacancy.get('currency', '')
-            if salary_from or salary_to:
-                if salary_from and salary_to:
-                    salary_str = f'{int(salary_from):,} - {int(salary_to):,} {currency}'
-                elif salary_from:
-                    salary_str = f'от {int(salary_from):,} {currency}'
-                elif salary_to:
-                    salary_str = f'до {int(salary_to):,} {currency}'
-                self.stdout.write(f'   💰 Зарплата: {salary_str}')
-            else:
-                self.stdout.write('   💰 Зарплата: не указана')
-            
-            # Режим работы
-            work_mode = vacancy.get('work_mode')
-            if work_mode:
-                mode_names = {'office': 'В офисе', 'remote': 'Удалённо', 'hybrid': 'Гибрид'}
-                self.stdout.write(f'   💼 Режим: {mode_names.get(work_mode, work_mode)}')
-            
-            # Локация
-            location = vacancy.get('location')
-            if location:
-                self.stdout.write(f'   📍 Локация: {location}')
-            
-            # Описание
-            description = vacancy.get('description', '')
-            if description:
-                desc_short = description[:100] + '...' if len(description) > 100 else description
-                self.stdout.write(f'   📝 Описание: {desc_short}')
-            
-            # Ссылка
-            url = vacancy.get('url')
-            if url:
-                self.stdout.write(f'   🔗 Ссылка: {url}')
-            
+        for idx, vacancy in enumerate(vacancies, start):
+            self.stdout.write('\n' + format_vacancy(idx, vacancy))
             self.stdout.write('-' * 80)
 
-    def _ask_additional_actions(self, vacancies):
-        """Запрашивает дополнительные действия"""
-        if not vacancies:
-            return
-        
-        self.stdout.write(self.style.WARNING('\n🎯 Дополнительные действия:'))
-        self.stdout.write('1. Показать детали конкретной вакансии')
-        self.stdout.write('2. Сохранить результаты в файл')
-        self.stdout.write('3. Выход')
-        
-        choice = input("\nВыберите действие (1-3): ").strip()
-        
-        if choice == "1":
-            self._show_vacancy_details(vacancies)
-        elif choice == "2":
-            self._save_to_file(vacancies)
-        else:
-            self.stdout.write(self.style.SUCCESS('\n👋 До свидания!'))
-
-    def _show_vacancy_details(self, vacancies):
+    def _show_vacancy_details(self, vacancy):
         """Показывает детали выбранной вакансии"""
-        try:
-            idx = int(input(f"\nВведите номер вакансии (1-{len(vacancies)}): ").strip())
-            if 1 <= idx <= len(vacancies):
-                vacancy = vacancies[idx - 1]
-                self.stdout.write(self.style.SUCCESS('\n' + '=' * 80))
-                self.stdout.write(f'\n📌 {vacancy.get("title", "Без названия")}')
-                self.stdout.write(f'🏢 Компания: {vacancy.get("company_name", "Не указана")}')
-                self.stdout.write(f'🌐 Источник: {vacancy.get("source", "HH.ru")}')
-                self.stdout.write(f'🆔 ID: {vacancy.get("external_id", "Не указан")}')
-                
-                # Полное описание
-                description = vacancy.get("description", "")
-                if description:
-                    self.stdout.write(f'\n📝 Описание:\n{description}')
-                
-                # Ссылка
-                url = vacancy.get("url", "")
-                if url:
-                    self.stdout.write(f'\n🔗 Ссылка: {url}')
-                
-                self.stdout.write('=' * 80)
-            else:
-                self.stdout.write(self.style.ERROR('Неверный номер вакансии!'))
-        except ValueError:
-            self.stdout.write(self.style.ERROR('Введите корректный номер!'))
+        self.stdout.write(self.style.SUCCESS('\n' + '=' * 80))
+        self.stdout.write(f'\n📌 {vacancy.get("title", "Без названия")}')
+        self.stdout.write(f'🏢 Компания: {vacancy.get("company_name", "Не указана")}')
+        self.stdout.write(f'🌐 Источник: {vacancy.get("source", "HH.ru")}')
+        self.stdout.write(f'🆔 ID: {vacancy.get("external_id", "Не указан")}')
+        
+        # Полное описание, навыки, опыт и занятость — из /vacancies/{id} (в выдаче поиска только сниппет)
+        detail = None
+        if vacancy.get("external_id") and vacancy.get("source", "HH.ru") == "HH.ru":
+            detail = get_vacancy_detail(vacancy.get("external_id"))
+        if detail:
+            if detail["experience"]:
+                self.stdout.write(f'🎓 Опыт: {detail["experience"]}')
+            if detail["employment"]:
+                self.stdout.write(f'🕒 Занятость: {detail["employment"]}')
+            if detail["key_skills"]:
+                self.stdout.write(f'🛠 Навыки: {", ".join(detail["key_skills"])}')
+        description = detail["description"] if detail and detail["description"] else vacancy.get("description", "")
+        if description:
+            self.stdout.write(f'\n📝 Описание:\n{description}')
+        
+        # Ссылка
+        url = vacancy.get("url", "")
+        if url:
+            self.stdout.write(f'\n🔗 Ссылка: {url}')
+        
+        self.stdout.write('=' * 80)
 
     def _save_to_file(self, vacancies):
         """Сохраняет результаты в файл"""
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from parserapp.models import SearchSync
+from parserapp.services.sync import sync_search
+
+
+class Command(BaseCommand):
+    help = 'Инкрементальная синхронизация отслеживаемых запросов: загружает только новые вакансии'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--add', type=str, metavar='QUERY', help='Начать отслеживать поисковый запрос')
+        parser.add_argument('--remove', type=str, metavar='QUERY', help='Перестать отслеживать поисковый запрос')
+        parser.add_argument('--list', action='store_true', help='Показать отслеживаемые запросы')
+        parser.add_argument('--query', type=str, help='Синхронизировать только этот запрос')
+
+    def handle(self, *args, **options):
+        if options['add']:
+            _, created = SearchSync.objects.get_or_create(query=options['add'])
+            message = 'добавлен' if created else 'уже отслеживается'
+            self.stdout.write(self.style.SUCCESS(f'➕ Запрос "{options["add"]}" {message}'))
+            return
+
+        if options['remove']:
+            deleted, _ = SearchSync.objects.filter(query=options['remove']).delete()
+            if deleted:
+                self.stdout.write(self.style.SUCCESS(f'➖ Запрос "{options["remove"]}" удалён'))
+            else:
+                self.stdout.write(self.style.WARNING(f'Запрос "{options["remove"]}" не найден'))
+            return
+
+        syncs = SearchSync.objects.all()
+        if options['query']:
+            syncs = syncs.filter(query=options['query'])
+
+        if options['list']:
+            for sync in syncs:
+                self.stdout.write(f'{sync.query}: watermark={sync.watermark or "—"}, последняя синхронизация={sync.last_synced_at or "—"}')
+            return
+
+        if not syncs:
+            self.stdout.write(self.style.WARNING('Нет отслеживаемых запросов. Добавьте: sync_vacancies --add "python"'))
+            return
+
+        for sync in syncs:
+            self.stdout.write(f'\n🔄 Синхронизация "{sync.query}" (с {sync.watermark or "начала"})...')
+            result = sync_search(sync)
+            report = result.report
+            self.stdout.write(self.style.SUCCESS(
+                f'✅ Загружено: {result.fetched}, новых {report.inserted}, обновлено {report.updated}, '
+                f'без изменений {report.unchanged}'
+            ))
+            if not result.complete:
+                self.stdout.write(self.style.WARNING('⚠️ Часть страниц не загрузилась, watermark не сдвинут'))
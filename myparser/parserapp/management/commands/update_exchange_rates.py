@@ -0,0 +1,31 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from requests.exceptions import RequestException
+
+from parserapp.services.currency import FIXTURE_PATH, fetch_hh_rates, fixture_rates, save_rates
+
+
+class Command(BaseCommand):
+    help = 'Загружает курсы валют из справочника HH.ru (или из фикстуры) и пересчитывает зарплаты в рублях'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', action='store_true', help=f'Взять курсы из {FIXTURE_PATH.name}, а не из HH.ru')
+        parser.add_argument('--no-recompute', action='store_true', help='Не пересчитывать salary_min_rub/salary_max_rub')
+
+    def handle(self, *args, **options):
+        if options['fixture']:
+            rates = {code: (rate, '') for code, rate in fixture_rates().items()}
+        else:
+            try:
+                rates = fetch_hh_rates()
+            except (RequestException, ValueError) as e:
+                raise CommandError(f'Не удалось загрузить справочник HH.ru: {e}')
+        if not rates:
+            raise CommandError('Справочник не содержит курсов валют')
+
+        save_rates(rates)
+        self.stdout.write(self.style.SUCCESS(
+            '✅ Курсы обновлены: ' + ', '.join(f'{code}={rate}' for code, (rate, _) in sorted(rates.items()))
+        ))
+        if not options['no_recompute']:
+            call_command('recompute_salaries', stdout=self.stdout, stderr=self.stderr)
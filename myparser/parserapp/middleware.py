@@ -1,5 +1,17 @@
+import cProfile
+import logging
+import time
+import uuid
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.utils.deprecation import MiddlewareMixin
 
+from parserapp.services import metrics
+
+
+logger = logging.getLogger(__name__)
+
 
 class DisableCSRFForAPI(MiddlewareMixin):
     """
@@ -13,3 +25,114 @@ class DisableCSRFForAPI(MiddlewareMixin):
             setattr(request, '_dont_enforce_csrf_checks', True)
         return None
 
+
+
+class RequestMetricsMiddleware:
+    """
+    Время запроса и его этапов (parserapp/services/metrics.py): гистограммы для /metrics,
+    лог медленных запросов с разбивкой по этапам и профилирование cProfile по заголовку X-Profile: 1
+    (если разрешено HH_METRICS['PROFILE_HEADER']) или для всех запросов (HH_METRICS['PROFILE']).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, trace = metrics.start_trace()
+        profiler = self._start_profiler(request)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_trace(token)
+        return self._finish(request, response, started, trace, profiler)
+
+    async def __acall__(self, request):
+        token, trace = metrics.start_trace()
+        profiler = self._start_profiler(request)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_trace(token)
+        return self._finish(request, response, started, trace, profiler)
+
+    def _start_profiler(self, request):
+        config = metrics.get_metrics_settings()
+        wanted = config['PROFILE'] or (config['PROFILE_HEADER'] and request.headers.get('X-Profile') == '1')
+        if not wanted:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Уже идёт другое профилирование (одновременный запрос в этом же потоке)
+            return None
+        return profiler
+
+    def _finish(self, request, response, started, trace, profiler):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+
+        if profiler is not None:
+            # Профилируется только view: тело потокового ответа отдаётся уже после установки заголовков
+            profiler.disable()
+            path = self._dump_profile(profiler, view)
+            response['X-Profile'] = path.name
+            logger.info('Профиль запроса сохранён', extra={'path': request.path, 'view': view, 'file': str(path)})
+
+        if response.streaming:
+            # Время потокового ответа считается до конца отдачи тела (или до его закрытия при обрыве)
+            timed = self._timed_async_stream if response.is_async else self._timed_stream
+            response.streaming_content = timed(response.streaming_content, request, response, view, started, trace)
+        else:
+            self._record(request, response, view, time.perf_counter() - started, trace)
+        return response
+
+    def _timed_stream(self, content, request, response, view, started, trace):
+        try:
+            while True:
+                with metrics.use_trace(trace):
+                    chunk = next(content, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self._record(request, response, view, time.perf_counter() - started, trace)
+
+    async def _timed_async_stream(self, content, request, response, view, started, trace):
+        try:
+            while True:
+                with metrics.use_trace(trace):
+                    chunk = await anext(content, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            self._record(request, response, view, time.perf_counter() - started, trace)
+
+    def _record(self, request, response, view, elapsed, trace):
+        metrics.REQUEST_SECONDS.observe(elapsed, view, request.method, response.status_code)
+        if elapsed * 1000 >= metrics.get_metrics_settings()['SLOW_REQUEST_MS']:
+            metrics.SLOW_REQUESTS.inc(view)
+            logger.warning('Медленный запрос', extra={
+                'path': request.get_full_path(),
+                'view': view,
+                'status': response.status_code,
+                'total_ms': round(elapsed * 1000, 1),
+                **{f'{name}_ms': round(seconds * 1000, 1) for name, seconds in trace.items()},
+            })
+
+    def _dump_profile(self, profiler, view):
+        directory = Path(metrics.get_metrics_settings()['PROFILE_DIR'])
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{view.replace(':', '-')}-{uuid.uuid4().hex[:8]}.prof"
+        profiler.dump_stats(path)
+        return path
@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-16 12:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0002_vacancy_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True, verbose_name='Поисковый запрос')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Доп. параметры запроса к HH.ru')),
+                ('watermark', models.DateTimeField(blank=True, null=True, verbose_name='Последняя дата публикации')),
+                ('last_synced_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата последней синхронизации')),
+                ('last_fetched', models.PositiveIntegerField(default=0, verbose_name='Загружено за последнюю синхронизацию')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Синхронизация поиска',
+                'verbose_name_plural': 'Синхронизации поиска',
+                'ordering': ['query'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='vacancy',
+            name='posted_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата публикации'),
+        ),
+    ]
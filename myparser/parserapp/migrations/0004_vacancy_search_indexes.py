@@ -0,0 +1,48 @@
+# Generated by Django 6.0 on 2026-10-16 13:00
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0003_searchsync'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['work_mode', 'currency', '-id'], name='vacancy_mode_currency_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['location', 'work_mode', '-id'], name='vacancy_location_mode_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['currency', 'salary_from'], name='vacancy_currency_sal_from_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['currency', 'salary_to'], name='vacancy_currency_sal_to_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('salary_to', 'salary_from', django.db.models.expressions.RawSQL('0', ()), output_field=models.FloatField()), models.F('id'), name='vacancy_sort_max_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('salary_from', 'salary_to', django.db.models.expressions.RawSQL('99999999', ()), output_field=models.FloatField()), models.F('id'), name='vacancy_sort_min_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(django.db.models.functions.text.Lower('company_name'), models.F('id'), name='vacancy_sort_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(django.db.models.functions.text.Lower('title'), models.F('id'), name='vacancy_sort_title_idx'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 6.0 on 2026-10-16 13:30
+
+from django.db import migrations
+
+
+# Полнотекстовый индекс FTS5 по вакансиям (только SQLite).
+# Таблица с внешним содержимым: тексты не дублируются, индекс читает их из представления,
+# где «ё» уже заменена на «е» (токенайзер unicode61 не считает их одной буквой).
+# Синхронизация с parserapp_vacancy — триггерами, поэтому её не обходит ни ORM, ни bulk upsert.
+
+COLUMNS = ('title', 'company_name', 'location', 'description')
+
+
+def _normalized(prefix, column):
+    return f"replace(replace({prefix}{column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def _values(prefix):
+    return ', '.join(_normalized(prefix, column) for column in COLUMNS)
+
+
+FORWARD_SQL = [
+    "CREATE VIEW parserapp_vacancy_fts_source AS SELECT id, "
+    + ', '.join(f"{_normalized('', column)} AS {column}" for column in COLUMNS)
+    + " FROM parserapp_vacancy",
+
+    "CREATE VIRTUAL TABLE parserapp_vacancy_fts USING fts5("
+    + ', '.join(COLUMNS)
+    + ", content='parserapp_vacancy_fts_source', content_rowid='id',"
+    " tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+
+    "CREATE TRIGGER parserapp_vacancy_fts_ai AFTER INSERT ON parserapp_vacancy BEGIN "
+    f"INSERT INTO parserapp_vacancy_fts(rowid, {', '.join(COLUMNS)}) VALUES (new.id, {_values('new.')}); "
+    "END",
+
+    "CREATE TRIGGER parserapp_vacancy_fts_ad AFTER DELETE ON parserapp_vacancy BEGIN "
+    f"INSERT INTO parserapp_vacancy_fts(parserapp_vacancy_fts, rowid, {', '.join(COLUMNS)}) "
+    f"VALUES ('delete', old.id, {_values('old.')}); "
+    "END",
+
+    f"CREATE TRIGGER parserapp_vacancy_fts_au AFTER UPDATE OF {', '.join(COLUMNS)} ON parserapp_vacancy BEGIN "
+    f"INSERT INTO parserapp_vacancy_fts(parserapp_vacancy_fts, rowid, {', '.join(COLUMNS)}) "
+    f"VALUES ('delete', old.id, {_values('old.')}); "
+    f"INSERT INTO parserapp_vacancy_fts(rowid, {', '.join(COLUMNS)}) VALUES (new.id, {_values('new.')}); "
+    "END",
+
+    # Заполняем индекс уже сохранёнными вакансиями
+    "INSERT INTO parserapp_vacancy_fts(parserapp_vacancy_fts) VALUES ('rebuild')",
+]
+
+BACKWARD_SQL = [
+    "DROP TRIGGER IF EXISTS parserapp_vacancy_fts_au",
+    "DROP TRIGGER IF EXISTS parserapp_vacancy_fts_ad",
+    "DROP TRIGGER IF EXISTS parserapp_vacancy_fts_ai",
+    "DROP TABLE IF EXISTS parserapp_vacancy_fts",
+    "DROP VIEW IF EXISTS parserapp_vacancy_fts_source",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0004_vacancy_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(BACKWARD_SQL)),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 6.0 on 2026-10-16 23:54
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Round
+
+
+# Курсы из fixtures/exchange_rates.json на момент миграции (единиц валюты за 1 рубль)
+INITIAL_RATES = {
+    'RUR': 1.0,
+    'USD': 0.010972,
+    'EUR': 0.010156,
+    'KZT': 5.303,
+    'UAH': 0.4507,
+    'BYR': 0.03594,
+    'UZS': 139.7,
+    'AZN': 0.01866,
+    'GEL': 0.02966,
+    'KGS': 0.9682,
+}
+
+
+def seed_rates_and_backfill(apps, schema_editor):
+    """Курсы INITIAL_RATES (если таблица пуста) и зарплаты в рублях для существующих вакансий."""
+    ExchangeRate = apps.get_model('parserapp', 'ExchangeRate')
+    Vacancy = apps.get_model('parserapp', 'Vacancy')
+    if not ExchangeRate.objects.exists():
+        ExchangeRate.objects.bulk_create(
+            ExchangeRate(code=code, rate=rate) for code, rate in INITIAL_RATES.items()
+        )
+    low = Coalesce('salary_from', 'salary_to', output_field=models.FloatField())
+    high = Coalesce('salary_to', 'salary_from', output_field=models.FloatField())
+    for code, rate in ExchangeRate.objects.values_list('code', 'rate'):
+        Vacancy.objects.filter(currency=code).update(
+            salary_min_rub=Round(low / rate, 2),
+            salary_max_rub=Round(high / rate, 2),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0005_vacancy_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExchangeRate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=10, unique=True, verbose_name='Код валюты')),
+                ('name', models.CharField(blank=True, default='', max_length=100, verbose_name='Название')),
+                ('rate', models.FloatField(verbose_name='Курс к рублю')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Курс валюты',
+                'verbose_name_plural': 'Курсы валют',
+                'ordering': ['code'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='vacancy',
+            name='vacancy_currency_sal_from_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vacancy',
+            name='vacancy_currency_sal_to_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vacancy',
+            name='vacancy_sort_max_salary_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vacancy',
+            name='vacancy_sort_min_salary_idx',
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='salary_max_rub',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Зарплата до, ₽'),
+        ),
+        migrations.AddField(
+            model_name='vacancy',
+            name='salary_min_rub',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Зарплата от, ₽'),
+        ),
+        migrations.RunPython(seed_rates_and_backfill, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('salary_max_rub', django.db.models.expressions.RawSQL('0', ()), output_field=models.FloatField()), models.F('id'), name='vacancy_sort_max_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(django.db.models.functions.comparison.Coalesce('salary_min_rub', django.db.models.expressions.RawSQL('99999999999', ()), output_field=models.FloatField()), models.F('id'), name='vacancy_sort_min_salary_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 6.0 on 2026-10-16 23:55
+
+import hashlib
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+# Копия content_hash (parserapp.fingerprint, прежде — services.ingest) на момент миграции: миграция не должна меняться вместе с кодом приложения
+INGEST_FIELDS = (
+    'title',
+    'company_name',
+    'description',
+    'salary_from',
+    'salary_to',
+    'currency',
+    'work_mode',
+    'location',
+    'url',
+    'source',
+    'posted_at',
+)
+
+
+def _canonical(value):
+    if value is None:
+        return '\x00'
+    if isinstance(value, Decimal):
+        return f'{value:.2f}'
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value.isoformat()
+    return str(value)
+
+
+def content_hash(vacancy):
+    payload = '\x1f'.join(_canonical(getattr(vacancy, field)) for field in INGEST_FIELDS)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    """Отпечатки для уже сохранённых вакансий — иначе первая повторная загрузка перезапишет их все."""
+    Vacancy = apps.get_model('parserapp', 'Vacancy')
+    batch = []
+    for vacancy in Vacancy.objects.only('id', *INGEST_FIELDS).iterator(chunk_size=2000):
+        vacancy.content_hash = content_hash(vacancy)
+        batch.append(vacancy)
+        if len(batch) >= 1000:
+            Vacancy.objects.bulk_update(batch, ['content_hash'])
+            batch = []
+    if batch:
+        Vacancy.objects.bulk_update(batch, ['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0006_vacancy_salary_rub'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vacancy',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, verbose_name='Отпечаток'),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-16 23:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0007_vacancy_content_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VacancyDetail',
+            fields=[
+                ('vacancy', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='detail', serialize=False, to='parserapp.vacancy', verbose_name='Вакансия')),
+                ('description', models.TextField(blank=True, default='', verbose_name='Полное описание')),
+                ('key_skills', models.JSONField(blank=True, default=list, verbose_name='Ключевые навыки')),
+                ('experience', models.CharField(blank=True, default='', max_length=100, verbose_name='Опыт работы')),
+                ('employment', models.CharField(blank=True, default='', max_length=100, verbose_name='Тип занятости')),
+                ('archived', models.BooleanField(default=False, verbose_name='В архиве или удалена')),
+                ('etag', models.CharField(blank=True, default='', max_length=255, verbose_name='ETag')),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64, verbose_name='Last-Modified')),
+                ('fetched_at', models.DateTimeField(db_index=True, verbose_name='Дата последней проверки')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Описание вакансии',
+                'verbose_name_plural': 'Описания вакансий',
+            },
+        ),
+    ]
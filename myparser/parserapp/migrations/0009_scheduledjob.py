@@ -0,0 +1,42 @@
+# Generated by Django 6.0 on 2026-10-16 23:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0008_vacancydetail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduledJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sync', 'Синхронизация запроса'), ('crawl', 'Полный обход выдачи'), ('details', 'Полные описания')], default='sync', max_length=20, verbose_name='Тип задания')),
+                ('query', models.CharField(blank=True, default='', max_length=255, verbose_name='Поисковый запрос')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='Параметры задания')),
+                ('interval', models.PositiveIntegerField(default=3600, verbose_name='Период запуска, с')),
+                ('enabled', models.BooleanField(default=True, verbose_name='Включено')),
+                ('next_run_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Следующий запуск')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100, verbose_name='Воркер')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Аренда до')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='Последний heartbeat')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Неудачных запусков подряд')),
+                ('last_started_at', models.DateTimeField(blank=True, null=True, verbose_name='Последний запуск')),
+                ('last_finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Последнее завершение')),
+                ('last_result', models.JSONField(blank=True, default=dict, verbose_name='Результат последнего запуска')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='Последняя ошибка')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+            ],
+            options={
+                'verbose_name': 'Задание по расписанию',
+                'verbose_name_plural': 'Задания по расписанию',
+                'ordering': ['next_run_at'],
+                'indexes': [models.Index(fields=['enabled', 'next_run_at'], name='scheduled_job_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'query'), name='scheduled_job_kind_query_uniq')],
+            },
+        ),
+    ]
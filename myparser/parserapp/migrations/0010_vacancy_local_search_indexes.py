@@ -0,0 +1,44 @@
+# Generated by Django 6.0 on 2026-10-17 00:35
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parserapp', '0009_scheduledjob'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='vacancy',
+            name='vacancy_mode_currency_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='vacancy',
+            name='vacancy_location_mode_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(fields=['work_mode', '-id'], name='vacancy_mode_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(models.F('work_mode'), django.db.models.functions.comparison.Coalesce('salary_max_rub', django.db.models.expressions.RawSQL('0', ()), output_field=models.FloatField()), models.F('id'), name='vacancy_mode_max_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(models.F('work_mode'), django.db.models.functions.comparison.Coalesce('salary_min_rub', django.db.models.expressions.RawSQL('99999999999', ()), output_field=models.FloatField()), models.F('id'), name='vacancy_mode_min_salary_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(models.F('work_mode'), django.db.models.functions.text.Lower('company_name'), models.F('id'), name='vacancy_mode_company_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vacancy',
+            index=models.Index(models.F('work_mode'), django.db.models.functions.text.Lower('title'), models.F('id'), name='vacancy_mode_title_idx'),
+        ),
+    ]
@@ -1,5 +1,18 @@
-from django.db import models
 from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce, Lower
+from django.utils import timezone
+
+from parserapp.fingerprint import content_hash
+
+
+# Ключи сортировки по зарплате (общие для индексов и parserapp/services/local_search.py).
+# Сортируем по зарплате, приведённой к рублям (salary_min_rub/salary_max_rub), — иначе USD и RUR несравнимы.
+# Вакансии без зарплаты уходят в конец: при убывании — как 0, при возрастании — как 99999999999.
+# Константа задаётся через RawSQL, а не Value: параметр запроса (?) не совпал бы с выражением индекса.
+MAX_SALARY_SORT_KEY = Coalesce('salary_max_rub', RawSQL('0', ()), output_field=models.FloatField())
+MIN_SALARY_SORT_KEY = Coalesce('salary_min_rub', RawSQL('99999999999', ()), output_field=models.FloatField())
 
 
 class Vacancy(models.Model):
@@ -15,7 +28,12 @@ class Vacancy(models.Model):
     location = models.CharField(max_length=255, verbose_name='Местоположение')
     salary_from = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Зарплата от')
     salary_to = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name='Зарплата до')
-    posted_at = models.DateTimeField(auto_now_add=True, verbose_name='Дата публикации')
+    # Вилка в рублях по курсам ExchangeRate: заполняется при сохранении, пересчитывается командой recompute_salaries
+    salary_min_rub = models.FloatField(null=True, blank=True, editable=False, verbose_name='Зарплата от, ₽')
+    salary_max_rub = models.FloatField(null=True, blank=True, editable=False, verbose_name='Зарплата до, ₽')
+    # Отпечаток полей из HH.ru (parserapp.fingerprint.content_hash): неизменившиеся вакансии не перезаписываются
+    content_hash = models.CharField(max_length=32, null=True, blank=True, editable=False, verbose_name='Отпечаток')
+    posted_at = models.DateTimeField(default=timezone.now, verbose_name='Дата публикации')
     currency = models.CharField(max_length=10, null=True, blank=True, verbose_name="Валюта")
     work_mode = models.CharField(max_length=20, choices=WORK_MODE_CHOICES, null=True, blank=True, verbose_name="Режим работы")
     url = models.URLField(max_length=500, unique=True, verbose_name="Ссылка на вакансию")
@@ -31,6 +49,19 @@ class Vacancy(models.Model):
             models.Index(fields=['title']),
             models.Index(fields=['company_name']),
             models.Index(fields=['location']),
+            # Индексы для локального поиска (parserapp/services/local_search.py): ключ сортировки + id
+            # (совпадают с SORT_KEYS) — порядок выдачи и keyset-пагинация без сортировки во временном B-дереве.
+            # Фильтр salary_min — диапазон по тому же выражению, что и сортировка «по зарплате».
+            models.Index(MAX_SALARY_SORT_KEY, 'id', name='vacancy_sort_max_salary_idx'),
+            models.Index(MIN_SALARY_SORT_KEY, 'id', name='vacancy_sort_min_salary_idx'),
+            models.Index(Lower('company_name'), 'id', name='vacancy_sort_company_idx'),
+            models.Index(Lower('title'), 'id', name='vacancy_sort_title_idx'),
+            # То же с равенством по work_mode впереди — для каждой сортировки
+            models.Index(fields=['work_mode', '-id'], name='vacancy_mode_id_idx'),
+            models.Index('work_mode', MAX_SALARY_SORT_KEY, 'id', name='vacancy_mode_max_salary_idx'),
+            models.Index('work_mode', MIN_SALARY_SORT_KEY, 'id', name='vacancy_mode_min_salary_idx'),
+            models.Index('work_mode', Lower('company_name'), 'id', name='vacancy_mode_company_idx'),
+            models.Index('work_mode', Lower('title'), 'id', name='vacancy_mode_title_idx'),
         ]
         ordering = ['-posted_at']
 
@@ -42,3 +73,119 @@ class Vacancy(models.Model):
         if self.salary_from and self.salary_to and self.salary_from > self.salary_to:
             raise ValidationError('Зарплата "от" не может быть больше зарплаты "до".')
 
+    def save(self, *args, **kwargs):
+        from parserapp.services.currency import salary_range_rub
+
+        self.salary_min_rub, self.salary_max_rub = salary_range_rub(self.salary_from, self.salary_to, self.currency)
+        self.content_hash = content_hash(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'salary_min_rub', 'salary_max_rub', 'content_hash'}
+        super().save(*args, **kwargs)
+
+
+class VacancyDetail(models.Model):
+    """Полные данные вакансии из /vacancies/{id} (в выдаче поиска есть только сниппет)."""
+
+    vacancy = models.OneToOneField(
+        Vacancy, on_delete=models.CASCADE, primary_key=True, related_name='detail', verbose_name='Вакансия'
+    )
+    description = models.TextField(blank=True, default="", verbose_name='Полное описание')
+    key_skills = models.JSONField(default=list, blank=True, verbose_name='Ключевые навыки')
+    experience = models.CharField(max_length=100, blank=True, default="", verbose_name='Опыт работы')
+    employment = models.CharField(max_length=100, blank=True, default="", verbose_name='Тип занятости')
+    archived = models.BooleanField(default=False, verbose_name='В архиве или удалена')
+    # Валидаторы для условных запросов (If-None-Match / If-Modified-Since) — как их вернул HH.ru
+    etag = models.CharField(max_length=255, blank=True, default="", verbose_name='ETag')
+    last_modified = models.CharField(max_length=64, blank=True, default="", verbose_name='Last-Modified')
+    fetched_at = models.DateTimeField(db_index=True, verbose_name='Дата последней проверки')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+
+    class Meta:
+        verbose_name = 'Описание вакансии'
+        verbose_name_plural = 'Описания вакансий'
+
+    def __str__(self):
+        return f"Описание: {self.vacancy_id}"
+
+
+class ExchangeRate(models.Model):
+    """Курс валюты из справочника HH.ru (/dictionaries): сколько единиц валюты дают за 1 рубль."""
+
+    code = models.CharField(max_length=10, unique=True, verbose_name='Код валюты')
+    name = models.CharField(max_length=100, blank=True, default='', verbose_name='Название')
+    rate = models.FloatField(verbose_name='Курс к рублю')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата обновления")
+
+    class Meta:
+        verbose_name = 'Курс валюты'
+        verbose_name_plural = 'Курсы валют'
+        ordering = ['code']
+
+    def __str__(self):
+        return f"{self.code}: {self.rate}"
+
+
+class SearchSync(models.Model):
+    """Отслеживаемый поисковый запрос и отметка (watermark), до которой вакансии уже загружены."""
+
+    query = models.CharField(max_length=255, unique=True, verbose_name='Поисковый запрос')
+    params = models.JSONField(default=dict, blank=True, verbose_name='Доп. параметры запроса к HH.ru')
+    watermark = models.DateTimeField(null=True, blank=True, verbose_name='Последняя дата публикации')
+    last_synced_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата последней синхронизации')
+    last_fetched = models.PositiveIntegerField(default=0, verbose_name='Загружено за последнюю синхронизацию')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:
+        verbose_name = 'Синхронизация поиска'
+        verbose_name_plural = 'Синхронизации поиска'
+        ordering = ['query']
+
+    def __str__(self):
+        return self.query
+
+
+class ScheduledJob(models.Model):
+    """
+    Периодическое задание для воркера (python manage.py run_worker): очередь хранится в базе, брокер не нужен.
+    Воркер захватывает задание арендой (locked_by/locked_until) и продлевает её, пока задание выполняется;
+    если воркер упал, аренда истекает и задание подхватывает другой.
+    """
+
+    KIND_CHOICES = [
+        ('sync', 'Синхронизация запроса'),
+        ('crawl', 'Полный обход выдачи'),
+        ('details', 'Полные описания'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='sync', verbose_name='Тип задания')
+    # sync/crawl — поисковый запрос к HH.ru; details — подстрока названия сохранённых вакансий (пусто — все)
+    query = models.CharField(max_length=255, blank=True, default='', verbose_name='Поисковый запрос')
+    params = models.JSONField(default=dict, blank=True, verbose_name='Параметры задания')
+    interval = models.PositiveIntegerField(default=3600, verbose_name='Период запуска, с')
+    enabled = models.BooleanField(default=True, verbose_name='Включено')
+    next_run_at = models.DateTimeField(default=timezone.now, verbose_name='Следующий запуск')
+    locked_by = models.CharField(max_length=100, blank=True, default='', verbose_name='Воркер')
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name='Аренда до')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='Последний heartbeat')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Неудачных запусков подряд')
+    last_started_at = models.DateTimeField(null=True, blank=True, verbose_name='Последний запуск')
+    last_finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Последнее завершение')
+    last_result = models.JSONField(default=dict, blank=True, verbose_name='Результат последнего запуска')
+    last_error = models.TextField(blank=True, default='', verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+
+    class Meta:
+        verbose_name = 'Задание по расписанию'
+        verbose_name_plural = 'Задания по расписанию'
+        ordering = ['next_run_at']
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'query'], name='scheduled_job_kind_query_uniq'),
+        ]
+        indexes = [
+            # Выбор готовых к запуску заданий: enabled = true AND next_run_at <= now
+            models.Index(fields=['enabled', 'next_run_at'], name='scheduled_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.query}" if self.query else self.kind
@@ -1,3 +1,7 @@
+from dataclasses import dataclass, fields
+from typing import Optional
+
+
 def _parse_work_mode(item):
     """
     Парсит режим работы из ответа API HH.ru.
@@ -20,22 +24,71 @@ def _parse_work_mode(item):
     return None
 
 
+@dataclass(slots=True)
+class VacancyRecord:
+    """
+    Вакансия из выдачи HH.ru: компактная запись вместо dict на 12 ключей.
+
+    Поддерживает доступ как к dict (get, [], keys), поэтому фильтры, сортировка и запись в БД
+    работают с ней без изменений; fastjson кодирует её напрямую.
+    """
+
+    title: str = ""
+    company_name: str = ""
+    description: str = ""
+    salary_from: Optional[int] = None
+    salary_to: Optional[int] = None
+    currency: Optional[str] = None
+    work_mode: Optional[str] = None
+    location: str = ""
+    url: str = ""
+    external_id: str = ""
+    source: str = "HH.ru"
+    posted_at: Optional[str] = None
+
+    # Ключами считаются только поля: getattr по имени метода ("get", "keys") вернул бы сам метод
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _FIELD_NAMES else default
+
+    def __getitem__(self, key):
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in _FIELD_NAMES:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def keys(self):
+        return VACANCY_FIELDS
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in VACANCY_FIELDS}
+
+
+VACANCY_FIELDS = tuple(field.name for field in fields(VacancyRecord))
+_FIELD_NAMES = frozenset(VACANCY_FIELDS)
+
+
 def vacancy_from_hh(item):
     salary = item.get("salary") or {}
     employer = item.get("employer") or {}
     area = item.get("area") or {}
     snippet = item.get("snippet") or {}
 
-    return {
-        "title": item.get("name", ""),
-        "company_name": employer.get("name", ""),
-        "description": snippet.get("responsibility", ""),
-        "salary_from": salary.get("from"),
-        "salary_to": salary.get("to"),
-        "currency": salary.get("currency"),
-        "work_mode": _parse_work_mode(item),
-        "location": area.get("name", ""),
-        "url": item.get("alternate_url", ""),
-        "external_id": item.get("id", ""),
-        "source": "HH.ru",
-    }
\ No newline at end of file
+    # Позиционно, в порядке полей VacancyRecord: заметно быстрее, чем по именам
+    return VacancyRecord(
+        item.get("name", ""),
+        employer.get("name", ""),
+        snippet.get("responsibility", ""),
+        salary.get("from"),
+        salary.get("to"),
+        salary.get("currency"),
+        _parse_work_mode(item),
+        area.get("name", ""),
+        item.get("alternate_url", ""),
+        item.get("id", ""),
+        "HH.ru",
+        item.get("published_at"),
+    )
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import caches
+
+from parserapp.services.hh_parser import HHUnavailable, get_default_parser
+from parserapp.services.singleflight import SingleFlight
+
+
+# Значения по умолчанию; переопределяются через settings.HH_CACHE
+DEFAULT_CACHE_SETTINGS = {
+    "ALIAS": "hh",        # алиас из settings.CACHES
+    "TTL": 60,            # сколько секунд запись считается свежей
+    "STALE_TTL": 300,     # сколько ещё секунд можно отдавать устаревшую запись, обновляя её в фоне
+    "STALE_IF_ERROR": 3600,  # сколько ещё секунд отдавать запись, если HH.ru недоступен
+    "REFRESH_WORKERS": 2, # потоков для фонового обновления
+}
+
+
+def get_cache_settings():
+    from django.conf import settings
+
+    config = dict(DEFAULT_CACHE_SETTINGS)
+    config.update(getattr(settings, "HH_CACHE", {}) or {})
+    return config
+
+
+class CacheStats:
+    """Потокобезопасные счётчики попаданий в кэш поиска."""
+
+    FIELDS = ("hits", "stale_hits", "stale_if_error", "misses", "refreshes", "refresh_errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, field):
+        with self._lock:
+            self._counters[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            data = dict(self._counters)
+        served = data["hits"] + data["stale_hits"] + data["stale_if_error"]
+        lookups = served + data["misses"]
+        data["hit_ratio"] = served / lookups if lookups else 0.0
+        return data
+
+    def reset(self):
+        with self._lock:
+            self._counters = {field: 0 for field in self.FIELDS}
+
+
+cache_stats = CacheStats()
+
+
+def make_cache_key(query, page, per_page, extra_params=None):
+    payload = json.dumps(
+        [query, page, per_page, extra_params or {}],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return "hh:vacancies:" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class CachedHHParser:
+    """
+    Кэш поверх HHParser.get_vacancies на Django cache framework.
+
+    Запись живёт TTL + STALE_TTL секунд. Первые TTL секунд она свежая и отдаётся как есть;
+    после этого — отдаётся сразу, а обновление уходит в фоновый поток (stale-while-revalidate).
+    Ещё STALE_IF_ERROR секунд запись хранится про запас: её отдают, только если HH.ru не ответил
+    (в том числе когда circuit breaker разомкнут).
+    Ограничение размера и LRU-вытеснение обеспечивает бэкенд (LocMemCache: MAX_ENTRIES/CULL_FREQUENCY).
+    Ошибки HH.ru (fetch_page вернул None) не кэшируются; если и запасной записи нет — HHUnavailable.
+    Одновременные промахи по одному ключу объединяются (SingleFlight): в HH.ru уходит один запрос,
+    остальные вызовы ждут его и получают тот же разобранный результат.
+    """
+
+    def __init__(self, parser=None, cache_alias=None, ttl=None, stale_ttl=None, stale_if_error=None, stats=None):
+        config = get_cache_settings()
+        self.parser = parser or get_default_parser()
+        self.cache = caches[cache_alias or config["ALIAS"]]
+        self.ttl = config["TTL"] if ttl is None else ttl
+        self.stale_ttl = config["STALE_TTL"] if stale_ttl is None else stale_ttl
+        self.stale_if_error = config["STALE_IF_ERROR"] if stale_if_error is None else stale_if_error
+        self.stats = stats or cache_stats
+        self.flight = SingleFlight()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=config["REFRESH_WORKERS"],
+            thread_name_prefix="hh-cache-refresh",
+        )
+
+    def __getattr__(self, name):
+        # fetch_page, parse_response и прочее — напрямую из обёрнутого парсера
+        return getattr(self.parser, name)
+
+    def get_vacancies(self, query, page=0, per_page=20, **extra_params):
+        key = make_cache_key(query, page, per_page, extra_params)
+        entry = self.cache.get(key)
+        now = time.time()
+        if entry is not None:
+            if entry["fresh_until"] > now:
+                self.stats.incr("hits")
+                return entry["value"]
+            if entry["fresh_until"] + self.stale_ttl > now:
+                self.stats.incr("stale_hits")
+                self._schedule_refresh(key, query, page, per_page, extra_params)
+                return entry["value"]
+
+        vacancies = self.flight.do(key, self._fetch_and_store, key, query, page, per_page, extra_params)
+        if vacancies is None and entry is not None:
+            self.stats.incr("stale_if_error")
+            return entry["value"]
+        self.stats.incr("misses")
+        if vacancies is None:
+            raise HHUnavailable("HH.ru не ответил, в кэше ответа нет")
+        return vacancies
+
+    def _fetch_and_store(self, key, query, page, per_page, extra_params):
+        data = self.parser.fetch_page(query, page=page, per_page=per_page, **extra_params)
+        if data is None:
+            return None
+        vacancies = self.parser.parse_response(data)
+        entry = {"value": vacancies, "fresh_until": time.time() + self.ttl}
+        self.cache.set(key, entry, timeout=self.ttl + self.stale_ttl + self.stale_if_error)
+        return vacancies
+
+    def _schedule_refresh(self, key, query, page, per_page, extra_params):
+        # cache.add атомарен: фоновое обновление одного ключа запускается только одно
+        lock_key = key + ":refresh"
+        if not self.cache.add(lock_key, 1, timeout=max(self.ttl, 30)):
+            return
+        self._refresher.submit(self._refresh, key, lock_key, query, page, per_page, extra_params)
+
+    def _refresh(self, key, lock_key, query, page, per_page, extra_params):
+        try:
+            if self._fetch_and_store(key, query, page, per_page, extra_params) is None:
+                self.stats.incr("refresh_errors")
+            else:
+                self.stats.incr("refreshes")
+        finally:
+            self.cache.delete(lock_key)
+
+
+_cached_parser = None
+_cached_parser_lock = threading.Lock()
+
+
+def get_cached_parser():
+    """Общий экземпляр CachedHHParser для view."""
+    global _cached_parser
+    if _cached_parser is None:
+        with _cached_parser_lock:
+            if _cached_parser is None:
+                _cached_parser = CachedHHParser()
+    return _cached_parser
@@ -0,0 +1,98 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from parserapp.services.hh_parser import get_default_parser
+
+
+# HH.ru отдаёт не больше 2000 вакансий на один поисковый запрос: страница допустима, если (page + 1) * per_page <= 2000
+HH_MAX_DEPTH = 2000
+HH_MAX_PER_PAGE = 100
+DEFAULT_MAX_WORKERS = 4
+
+logger = logging.getLogger(__name__)
+
+
+def get_crawl_workers():
+    from django.conf import settings
+
+    return getattr(settings, "HH_CRAWL_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+
+
+def count_pages(first_page, per_page, max_pages=None):
+    """Сколько страниц реально можно забрать: по ответу HH, лимиту глубины и max_pages."""
+    pages = first_page.get("pages") or 0
+    depth_limit = HH_MAX_DEPTH // per_page
+    total = min(pages, depth_limit)
+    if max_pages is not None:
+        total = min(total, max_pages)
+    return total
+
+
+def page_range(first_page, per_page, start_page=0, max_pages=None):
+    """Номера страниц обхода начиная со start_page (она уже загружена в first_page): не дальше count_pages."""
+    end = count_pages(first_page, per_page, None if max_pages is None else start_page + max_pages)
+    return range(start_page, max(end, start_page + 1))
+
+
+def crawl_pages(query, per_page=HH_MAX_PER_PAGE, max_workers=None, max_pages=None, parser=None,
+                first_page=None, start_page=0, **extra_params):
+    """
+    Обходит всю выдачу HH.ru по запросу, начиная со страницы start_page.
+    Первая страница запрашивается синхронно (из неё берём pages/found),
+    остальные — параллельно, не более max_workers запросов одновременно.
+    Уже загруженную первую страницу (сырой JSON страницы start_page) можно передать в first_page.
+    Генерирует пары (номер страницы, список вакансий) в порядке готовности страниц.
+    """
+    parser = parser or get_default_parser()
+    max_workers = max_workers or get_crawl_workers()
+    per_page = min(per_page, HH_MAX_PER_PAGE)
+
+    if first_page is None:
+        first_page = parser.fetch_page(query, page=start_page, per_page=per_page, **extra_params)
+    if first_page is None:
+        return
+    pages = page_range(first_page, per_page, start_page, max_pages)
+    logger.info("HH crawl", extra={"query": query, "found": first_page.get("found", 0), "pages": len(pages)})
+    yield start_page, parser.parse_response(first_page)
+
+    if len(pages) <= 1:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hh-crawl")
+    try:
+        futures = {
+            executor.submit(parser.fetch_page, query, page=page, per_page=per_page, **extra_params): page
+            for page in pages[1:]
+        }
+        for future in as_completed(futures):
+            data = future.result()
+            if data is None:
+                # Ошибка уже залогирована в fetch_page; пропускаем страницу, обход продолжаем
+                continue
+            yield futures[future], parser.parse_response(data)
+    finally:
+        # Если потребитель прервал обход, не ждём оставшиеся страницы
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def crawl_vacancies(query, **kwargs):
+    """Как crawl_pages, но отдаёт вакансии по одной."""
+    for _, vacancies in crawl_pages(query, **kwargs):
+        yield from vacancies
+
+
+def crawl_pages_in_order(query, **kwargs):
+    """
+    Как crawl_pages, но страницы отдаются по порядку номеров (start_page, start_page + 1, ...).
+    Страницы, пришедшие раньше своей очереди, ждут в буфере; загрузка при этом идёт параллельно.
+    """
+    buffered = {}
+    next_page = kwargs.get("start_page", 0)
+    for page, vacancies in crawl_pages(query, **kwargs):
+        buffered[page] = vacancies
+        while next_page in buffered:
+            yield next_page, buffered.pop(next_page)
+            next_page += 1
+    # Страницы после не загрузившейся (её номер так и не пришёл)
+    for page in sorted(buffered):
+        yield page, buffered[page]
@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+from django.apps import apps
+
+
+BASE_CURRENCY = "RUR"
+DICTIONARIES_URL = "https://api.hh.ru/dictionaries"
+# Фикстура с курсами: используется, пока таблица ExchangeRate пуста (python manage.py loaddata exchange_rates)
+FIXTURE_PATH = Path(__file__).resolve().parent.parent / "fixtures" / "exchange_rates.json"
+# Сколько секунд держать курсы в памяти процесса, прежде чем перечитать таблицу
+RATES_TTL = 300
+
+_rates = None
+_rates_loaded_at = 0.0
+_rates_lock = threading.Lock()
+
+
+def fixture_rates(path=FIXTURE_PATH):
+    with open(path, encoding="utf-8") as f:
+        return {entry["fields"]["code"]: entry["fields"]["rate"] for entry in json.load(f)}
+
+
+def get_rates():
+    """Курсы {код: единиц валюты за 1 рубль} из ExchangeRate (или из фикстуры, если таблица пуста)."""
+    global _rates, _rates_loaded_at
+    if _rates is not None and time.monotonic() - _rates_loaded_at < RATES_TTL:
+        return _rates
+    with _rates_lock:
+        if _rates is None or time.monotonic() - _rates_loaded_at >= RATES_TTL:
+            rates = {}
+            # Без django.setup() (быстрый CLI, parserapp/cli.py) базы нет — только фикстура;
+            # django.db импортируется здесь же, чтобы CLI не платил за его загрузку
+            if apps.ready:
+                from django.db import DatabaseError
+
+                from parserapp.models import ExchangeRate
+
+                try:
+                    rates = dict(ExchangeRate.objects.values_list("code", "rate"))
+                except DatabaseError:
+                    # Таблицы ещё нет (миграции не применены)
+                    pass
+            _rates = rates or fixture_rates()
+            _rates_loaded_at = time.monotonic()
+    return _rates
+
+
+def invalidate_rates():
+    global _rates
+    with _rates_lock:
+        _rates = None
+
+
+def to_rub(amount, currency):
+    """Сумма в рублях или None, если суммы или валюты нет либо курс валюты неизвестен."""
+    if amount is None or not currency:
+        return None
+    rate = get_rates().get(currency.upper())
+    if not rate:
+        return None
+    return round(float(amount) / rate, 2)
+
+
+def salary_range_rub(salary_from, salary_to, currency):
+    """(нижняя, верхняя) граница вилки в рублях; если указана одна граница — она и нижняя, и верхняя."""
+    low = salary_from if salary_from is not None else salary_to
+    high = salary_to if salary_to is not None else salary_from
+    return to_rub(low, currency), to_rub(high, currency)
+
+
+def fetch_hh_rates(session=None):
+    """Курсы из справочника HH.ru: {код: (курс, название)}."""
+    from parserapp.services import fastjson
+    from parserapp.services.http_client import get_session, get_timeout
+
+    response = (session or get_session()).get(DICTIONARIES_URL, timeout=get_timeout())
+    response.raise_for_status()
+    return {
+        item["code"]: (item["rate"], item.get("name", ""))
+        for item in fastjson.loads(response.content).get("currency", [])
+        if item.get("rate")
+    }
+
+
+def save_rates(rates):
+    """Сохраняет {код: (курс, название)} в ExchangeRate одним upsert."""
+    from parserapp.models import ExchangeRate
+
+    ExchangeRate.objects.bulk_create(
+        [ExchangeRate(code=code, rate=rate, name=name) for code, (rate, name) in rates.items()],
+        update_conflicts=True,
+        unique_fields=["code"],
+        update_fields=["rate", "name", "updated_at"],
+    )
+    invalidate_rates()
+
+
+def recompute_salaries(rates=None):
+    """
+    Пересчитывает salary_min_rub/salary_max_rub у всех вакансий по текущим курсам.
+    Один UPDATE на валюту, без загрузки строк в Python. Возвращает число обновлённых строк.
+    """
+    from django.db import transaction
+    from django.db.models import FloatField
+    from django.db.models.functions import Coalesce, Round
+
+    from parserapp.models import Vacancy
+
+    rates = rates or get_rates()
+    low = Coalesce("salary_from", "salary_to", output_field=FloatField())
+    high = Coalesce("salary_to", "salary_from", output_field=FloatField())
+    updated = 0
+    with transaction.atomic():
+        for code, rate in rates.items():
+            updated += Vacancy.objects.filter(currency=code).update(
+                salary_min_rub=Round(low / rate, 2),
+                salary_max_rub=Round(high / rate, 2),
+            )
+        # Валюта без курса (или не указана) — в рублях зарплату не выразить
+        updated += (
+            Vacancy.objects.exclude(currency__in=list(rates))
+            .exclude(salary_min_rub=None, salary_max_rub=None)
+            .update(salary_min_rub=None, salary_max_rub=None)
+        )
+    return updated
@@ -0,0 +1,190 @@
+"""
+Единственный поток записи в базу.
+
+SQLite допускает одного писателя: параллельные транзакции из потоков обхода, воркеров заданий и запросов API
+ждут друг друга (busy_timeout) или падают с «database is locked». Вместо этого производители отправляют
+пачки в очередь, а поток записи коммитит их группами — несколько пачек в одной транзакции, то есть один fsync
+на группу. Чтение идёт как обычно из своих соединений и в режиме WAL не блокируется записью.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.db import close_old_connections, connections, transaction
+
+
+# Значения по умолчанию; переопределяются через settings.HH_DB_WRITER
+DEFAULT_WRITER_SETTINGS = {
+    "ENABLED": True,
+    "MAX_GROUP": 32,      # пачек в одной транзакции
+    "MAX_DELAY": 0.02,    # сколько секунд ждать следующих пачек, прежде чем коммитить группу
+    "QUEUE_SIZE": 64,     # пачек в очереди; при переполнении производители ждут (backpressure)
+}
+
+
+def get_writer_settings():
+    from django.conf import settings
+
+    config = dict(DEFAULT_WRITER_SETTINGS)
+    config.update(getattr(settings, "HH_DB_WRITER", {}) or {})
+    return config
+
+
+class WriterStats:
+    """Потокобезопасные счётчики потока записи."""
+
+    FIELDS = ("submitted", "inline", "committed", "transactions", "errors")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, field, amount=1):
+        with self._lock:
+            self._counters[field] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters = {field: 0 for field in self.FIELDS}
+
+
+writer_stats = WriterStats()
+
+
+class DatabaseWriter:
+    """
+    Очередь записи с групповыми коммитами.
+
+    submit(fn, *args) ставит fn в очередь и возвращает Future; fn выполняется в потоке записи внутри общей
+    транзакции группы (каждая fn — в своей точке сохранения, так что ошибка одной пачки не откатывает остальные).
+    Future получает результат только после COMMIT группы.
+    """
+
+    def __init__(self, max_group=None, max_delay=None, queue_size=None, using="default", stats=None):
+        config = get_writer_settings()
+        self.max_group = max_group or config["MAX_GROUP"]
+        self.max_delay = config["MAX_DELAY"] if max_delay is None else max_delay
+        self.using = using
+        self.stats = stats or writer_stats
+        self._queue = queue.Queue(maxsize=queue_size or config["QUEUE_SIZE"])
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, fn, *args, **kwargs):
+        if self._must_run_inline():
+            # Вызывающий уже в транзакции (или это сам поток записи): запись должна попасть в неё же
+            self.stats.incr("inline")
+            future = Future()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._ensure_started()
+        future = Future()
+        self._queue.put((fn, args, kwargs, future))
+        self.stats.incr("submitted")
+        return future
+
+    def write(self, fn, *args, **kwargs):
+        """submit и ожидание результата."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def close(self, timeout=None):
+        """Дописывает очередь и останавливает поток."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _must_run_inline(self):
+        return threading.current_thread() is self._thread or connections[self.using].in_atomic_block
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    return
+                group = [item]
+                stop = self._collect(group)
+                self._commit(group)
+                if stop:
+                    return
+        finally:
+            connections[self.using].close()
+
+    def _collect(self, group):
+        """Добирает в группу пачки, пришедшие за MAX_DELAY. True — в очереди встретился сигнал остановки."""
+        deadline = time.monotonic() + self.max_delay
+        while len(group) < self.max_group:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return False
+            if item is None:
+                return True
+            group.append(item)
+        return False
+
+    def _commit(self, group):
+        close_old_connections()
+        done = []
+        try:
+            with transaction.atomic(using=self.using):
+                for fn, args, kwargs, future in group:
+                    try:
+                        with transaction.atomic(using=self.using):
+                            done.append((future, fn(*args, **kwargs)))
+                    except Exception as e:
+                        self.stats.incr("errors")
+                        future.set_exception(e)
+        except Exception as e:
+            # Не удался сам COMMIT: ни одна пачка группы не записана
+            self.stats.incr("errors", len(done))
+            for future, _ in done:
+                future.set_exception(e)
+            return
+        self.stats.incr("transactions")
+        self.stats.incr("committed", len(done))
+        for future, result in done:
+            future.set_result(result)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Общий поток записи процесса или None, если он выключен (HH_DB_WRITER['ENABLED'] = False)."""
+    global _writer
+    if not get_writer_settings()["ENABLED"]:
+        return None
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = DatabaseWriter()
+    return _writer
+
+
+def write(fn, *args, **kwargs):
+    """Выполняет запись через поток записи (если включён) или сразу в текущем потоке."""
+    writer = get_writer()
+    if writer is None:
+        return fn(*args, **kwargs)
+    return writer.write(fn, *args, **kwargs)
@@ -0,0 +1,188 @@
+import html
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from parserapp.models import Vacancy, VacancyDetail
+from parserapp.services import db_writer
+from parserapp.services.hh_parser import get_default_parser
+
+
+# Значения по умолчанию; переопределяются через settings.HH_DETAILS
+DEFAULT_DETAIL_SETTINGS = {
+    "TTL": 24 * 3600,   # сколько секунд сохранённое описание считается свежим и не перепроверяется
+    "WORKERS": 8,       # одновременных запросов /vacancies/{id}
+    "BATCH_SIZE": 200,  # вакансий на одну пачку (одна запись в БД на пачку)
+}
+
+# Поля VacancyDetail, которые перезаписываются при новом теле ответа
+CONTENT_FIELDS = ("description", "key_skills", "experience", "employment", "archived")
+DETAIL_FIELDS = (*CONTENT_FIELDS, "etag", "last_modified", "fetched_at")
+# Ответы, означающие, что вакансии больше нет
+GONE_STATUSES = {404, 410}
+
+
+def get_detail_settings():
+    from django.conf import settings
+
+    config = dict(DEFAULT_DETAIL_SETTINGS)
+    config.update(getattr(settings, "HH_DETAILS", {}) or {})
+    return config
+
+
+@dataclass
+class DetailReport:
+    fetched: int = 0       # новое или изменившееся описание записано
+    not_modified: int = 0  # 304: описание не менялось, обновлена только дата проверки
+    fresh: int = 0         # проверялось недавно (TTL), запрос не отправлялся
+    missing: int = 0       # 404/410: вакансия удалена
+    failed: int = 0        # сбой HH.ru или отказ (403, 400, 429), повторится при следующем запуске
+
+    def __add__(self, other):
+        return DetailReport(
+            fetched=self.fetched + other.fetched,
+            not_modified=self.not_modified + other.not_modified,
+            fresh=self.fresh + other.fresh,
+            missing=self.missing + other.missing,
+            failed=self.failed + other.failed,
+        )
+
+    def as_dict(self):
+        return {
+            "fetched": self.fetched,
+            "not_modified": self.not_modified,
+            "fresh": self.fresh,
+            "missing": self.missing,
+            "failed": self.failed,
+        }
+
+
+def detail_from_hh(data):
+    """Поля VacancyDetail из ответа /vacancies/{id}. Описание у HH.ru в HTML — храним текстом."""
+    return {
+        "description": html.unescape(strip_tags(data.get("description") or "")).strip(),
+        "key_skills": [skill["name"] for skill in data.get("key_skills") or [] if skill.get("name")],
+        "experience": (data.get("experience") or {}).get("name", ""),
+        "employment": (data.get("employment") or {}).get("name", ""),
+        "archived": bool(data.get("archived")),
+    }
+
+
+def stale_queryset(queryset=None, ttl=None, now=None):
+    """Вакансии без описания или с описанием, проверенным раньше TTL секунд назад."""
+    queryset = queryset if queryset is not None else Vacancy.objects.all()
+    cutoff = (now or timezone.now()) - timedelta(seconds=get_detail_settings()["TTL"] if ttl is None else ttl)
+    return queryset.filter(Q(detail__isnull=True) | Q(detail__fetched_at__lt=cutoff))
+
+
+def _fetch(parser, candidate):
+    pk, external_id, etag, last_modified = candidate
+    return candidate, parser.fetch_detail(external_id, etag=etag or None, last_modified=last_modified or None)
+
+
+def _store(results, now):
+    """Записывает результаты пачки: новые тела — одним upsert, 304 — одним UPDATE даты проверки."""
+    report = DetailReport()
+    to_write = []
+    not_modified = []
+    for (pk, *_), result in results:
+        if result is None:
+            report.failed += 1
+            continue
+        status, data, headers = result
+        if status == 304:
+            report.not_modified += 1
+            not_modified.append(pk)
+        elif data is not None:
+            report.fetched += 1
+            to_write.append(VacancyDetail(
+                vacancy_id=pk,
+                etag=headers.get("ETag", ""),
+                last_modified=headers.get("Last-Modified", ""),
+                fetched_at=now,
+                **detail_from_hh(data),
+            ))
+        elif status in GONE_STATUSES:
+            # Вакансию удалили: запоминаем, чтобы не запрашивать её снова до истечения TTL
+            report.missing += 1
+            to_write.append(VacancyDetail(vacancy_id=pk, archived=True, fetched_at=now))
+        else:
+            # 403 (блокировка User-Agent, капча), 400 и т.п. — о вакансии ничего не известно, сохранённое не трогаем
+            report.failed += 1
+
+    if to_write:
+        VacancyDetail.objects.bulk_create(
+            to_write,
+            update_conflicts=True,
+            unique_fields=["vacancy"],
+            update_fields=[*DETAIL_FIELDS, "updated_at"],
+        )
+    if not_modified:
+        VacancyDetail.objects.filter(vacancy_id__in=not_modified).update(fetched_at=now)
+    return report
+
+
+def fetch_details(queryset=None, ttl=None, max_workers=None, batch_size=None, force=False, limit=None,
+                  parser=None, on_batch=None):
+    """
+    Загружает полные описания для вакансий из queryset (по умолчанию — все), у которых их нет или они устарели.
+
+    Запросы идут параллельно (max_workers потоков, плюс общий ограничитель скорости HH.ru) пачками по batch_size;
+    для уже сохранённых описаний запрос условный (ETag / Last-Modified), 304 не перезаписывает строку.
+    force=True — перепроверить и свежие описания. on_batch(report) вызывается после каждой пачки.
+    Возвращает DetailReport.
+    """
+    config = get_detail_settings()
+    parser = parser or get_default_parser()
+    max_workers = max_workers or config["WORKERS"]
+    batch_size = batch_size or config["BATCH_SIZE"]
+    queryset = queryset if queryset is not None else Vacancy.objects.all()
+
+    report = DetailReport()
+    candidates = queryset if force else stale_queryset(queryset, ttl)
+    if not force:
+        report.fresh = queryset.count() - candidates.count()
+    candidates = candidates.order_by("pk").values_list("pk", "external_id", "detail__etag", "detail__last_modified")
+
+    remaining = limit
+    last_pk = 0
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hh-details") as executor:
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            # Keyset по pk: вакансии, которые не удалось загрузить, остаются «устаревшими» и не зацикливают обход
+            batch = list(candidates.filter(pk__gt=last_pk)[:size])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            if remaining is not None:
+                remaining -= len(batch)
+
+            results = list(executor.map(lambda candidate: _fetch(parser, candidate), batch))
+            report += db_writer.write(_store, results, timezone.now())
+            if on_batch:
+                on_batch(report)
+    return report
+
+
+def get_vacancy_detail(external_id, parser=None):
+    """
+    Описание одной вакансии для показа: из базы, если оно свежее, иначе с HH.ru (условным запросом,
+    если описание уже сохранено). Если вакансия есть в базе, результат сохраняется. Возвращает dict или None.
+    """
+    stored = VacancyDetail.objects.filter(vacancy__external_id=external_id).first()
+    cutoff = timezone.now() - timedelta(seconds=get_detail_settings()["TTL"])
+    if stored is None or stored.fetched_at < cutoff:
+        vacancy_pk = Vacancy.objects.filter(external_id=external_id).values_list("pk", flat=True).first()
+        if vacancy_pk is None:
+            # Вакансии нет в базе — просто показываем, не сохраняя
+            result = (parser or get_default_parser()).fetch_detail(external_id)
+            return detail_from_hh(result[1]) if result is not None and result[1] is not None else None
+        fetch_details(Vacancy.objects.filter(pk=vacancy_pk), force=True, parser=parser)
+        stored = VacancyDetail.objects.filter(vacancy_id=vacancy_pk).first()
+    if stored is None:
+        return None
+    return {field: getattr(stored, field) for field in CONTENT_FIELDS}
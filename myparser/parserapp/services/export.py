@@ -0,0 +1,153 @@
+import bz2
+import csv
+import gzip
+import json
+import lzma
+import sys
+
+from parserapp.models import Vacancy
+from parserapp.services import fulltext
+from parserapp.services.local_search import filter_queryset
+
+
+EXPORT_FIELDS = (
+    "external_id",
+    "title",
+    "company_name",
+    "location",
+    "salary_from",
+    "salary_to",
+    "currency",
+    "work_mode",
+    "url",
+    "source",
+    "posted_at",
+    "description",
+)
+DEFAULT_CHUNK_SIZE = 2000
+
+FORMATS = ("csv", "jsonl", "parquet")
+# Сжатие текстовых форматов — потоковое, поверх файла
+TEXT_COMPRESSION = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+PARQUET_COMPRESSION = ("snappy", "gzip", "zstd", "brotli", "lz4")
+
+
+def export_queryset(filters=None, text=None):
+    queryset = filter_queryset(Vacancy.objects.all(), filters or {})
+    if text:
+        queryset = fulltext.filter_queryset(queryset, text)
+    return queryset.order_by("pk")
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Кортежи значений EXPORT_FIELDS без создания экземпляров модели; курсор читается кусками по chunk_size."""
+    return queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def _open_text(path, compression):
+    if path == "-":
+        if compression:
+            raise ValueError("Сжатие при выводе в stdout не поддерживается")
+        return sys.stdout, False
+    if compression:
+        return TEXT_COMPRESSION[compression](path, "wt", encoding="utf-8", newline=""), True
+    return open(path, "w", encoding="utf-8", newline=""), True
+
+
+def write_csv(rows, path, compression=None):
+    stream, should_close = _open_text(path, compression)
+    count = 0
+    try:
+        writer = csv.writer(stream)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    finally:
+        if should_close:
+            stream.close()
+    return count
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    # Decimal зарплат — числом, чтобы аналитике не пришлось парсить строки
+    return float(value)
+
+
+def write_jsonl(rows, path, compression=None):
+    stream, should_close = _open_text(path, compression)
+    count = 0
+    try:
+        for row in rows:
+            record = {field: _json_value(value) for field, value in zip(EXPORT_FIELDS, row)}
+            stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += 1
+    finally:
+        if should_close:
+            stream.close()
+    return count
+
+
+def write_parquet(rows, path, compression="snappy", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Пишет Parquet по одной row group на chunk_size строк — в памяти только текущая группа."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Для экспорта в Parquet установите pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        ("external_id", pa.string()),
+        ("title", pa.string()),
+        ("company_name", pa.string()),
+        ("location", pa.string()),
+        ("salary_from", pa.float64()),
+        ("salary_to", pa.float64()),
+        ("currency", pa.string()),
+        ("work_mode", pa.string()),
+        ("url", pa.string()),
+        ("source", pa.string()),
+        ("posted_at", pa.timestamp("us", tz="UTC")),
+        ("description", pa.string()),
+    ])
+    salary_columns = {EXPORT_FIELDS.index("salary_from"), EXPORT_FIELDS.index("salary_to")}
+
+    count = 0
+    with pq.ParquetWriter(path, schema, compression=compression or "none") as writer:
+        columns = [[] for _ in EXPORT_FIELDS]
+
+        def flush():
+            arrays = [pa.array(column, type=schema.field(i).type) for i, column in enumerate(columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            for column in columns:
+                column.clear()
+
+        for row in rows:
+            for i, value in enumerate(row):
+                columns[i].append(float(value) if i in salary_columns and value is not None else value)
+            count += 1
+            if len(columns[0]) >= chunk_size:
+                flush()
+        if columns[0] or count == 0:
+            flush()
+    return count
+
+
+def export_vacancies(path, fmt, compression=None, filters=None, text=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Выгружает вакансии из БД в файл. Возвращает число выгруженных строк."""
+    rows = iter_rows(export_queryset(filters, text), chunk_size=chunk_size)
+    if fmt == "csv":
+        return write_csv(rows, path, compression)
+    if fmt == "jsonl":
+        return write_jsonl(rows, path, compression)
+    if fmt == "parquet":
+        return write_parquet(rows, path, compression or "snappy", chunk_size=chunk_size)
+    raise ValueError(f"Неизвестный формат: {fmt}")
@@ -0,0 +1,92 @@
+"""
+Быстрый JSON: orjson или msgspec, если установлены, иначе стандартный json.
+
+loads принимает bytes (тело ответа HH.ru как есть, без промежуточного str),
+dumps возвращает bytes. Типы, которые бэкенд не кодирует сам (Decimal, даты в формате Django,
+VacancyRecord для stdlib), кодируются так же, как DjangoJSONEncoder, — ответы API не меняются.
+"""
+import dataclasses
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+_django_encoder = None
+
+
+def _default(obj):
+    global _django_encoder
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return obj.as_dict()
+    if _django_encoder is None:
+        # Импорт по требованию: django.core.serializers тянет ORM, а CLI (parserapp/cli.py) обходится без него
+        from django.core.serializers.json import DjangoJSONEncoder
+
+        _django_encoder = DjangoJSONEncoder()
+    return _django_encoder.default(obj)
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+    # Даты отдаём в _default, чтобы формат совпадал с DjangoJSONEncoder
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+elif msgspec is not None:
+    BACKEND = "msgspec"
+    _decoder = msgspec.json.Decoder()
+    _encoder = msgspec.json.Encoder(enc_hook=_default)
+
+    def loads(data):
+        try:
+            return _decoder.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e))
+
+    def dumps(obj):
+        return _encoder.encode(obj)
+
+else:
+    BACKEND = "json"
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj):
+        return json.dumps(obj, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def _make_response_class():
+    from django.http import HttpResponse
+
+    class FastJsonResponse(HttpResponse):
+        """JsonResponse на fastjson.dumps."""
+
+        def __init__(self, data, **kwargs):
+            kwargs.setdefault("content_type", "application/json")
+            super().__init__(content=dumps(data), **kwargs)
+
+    FastJsonResponse.__module__ = __name__
+    return FastJsonResponse
+
+
+def __getattr__(name):
+    # django.http импортирует ORM (через django.core.serializers); класс ответа создаётся при первом обращении,
+    # чтобы HHParser и CLI без HTTP-ответов не платили за этот импорт
+    if name == "FastJsonResponse":
+        globals()[name] = _make_response_class()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
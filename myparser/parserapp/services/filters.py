@@ -0,0 +1,195 @@
+"""
+Общие фильтры и сортировка вакансий для команды search_vacancies и API.
+
+Фильтр — dict с ключами work_mode, location, salary_min, currency (как собирает _ask_filters).
+salary_min задаётся в валюте фильтра currency (по умолчанию в рублях); зарплаты сравниваются
+и сортируются в рублях по курсам ExchangeRate, поэтому вакансии в USD/EUR и RUR сопоставимы.
+Всё, что HH.ru умеет фильтровать сам, переводится в параметры запроса (build_hh_params),
+локально проверяется только остаток — за один проход по странице (apply_filters).
+"""
+
+from parserapp.services.currency import BASE_CURRENCY, salary_range_rub, to_rub
+
+WORK_MODES = ('office', 'remote', 'hybrid')
+
+SORT_OPTIONS = {
+    '1': 'По зарплате (от большей к меньшей)',
+    '2': 'По зарплате (от меньшей к большей)',
+    '3': 'По названию компании (А-Я)',
+    '4': 'По названию вакансии (А-Я)',
+    '5': 'Без сортировки',
+}
+DEFAULT_SORT = '5'
+
+# Сортировки, которые HH.ru выполняет сам (параметр order_by)
+HH_ORDER_BY = {
+    '1': 'salary_desc',
+    '2': 'salary_asc',
+}
+
+# id регионов HH.ru (справочник /areas) для крупных городов; остальные города фильтруются локально.
+# Дополнить можно через settings.HH_AREA_IDS = {'город': id}.
+AREA_IDS = {
+    'москва': 1,
+    'санкт-петербург': 2,
+    'екатеринбург': 3,
+    'новосибирск': 4,
+    'волгоград': 24,
+    'воронеж': 26,
+    'краснодар': 53,
+    'красноярск': 54,
+    'нижний новгород': 66,
+    'омск': 68,
+    'пермь': 72,
+    'ростов-на-дону': 76,
+    'самара': 78,
+    'казань': 88,
+    'уфа': 99,
+    'челябинск': 104,
+}
+
+
+def get_area_id(location):
+    from django.conf import settings
+
+    areas = {**AREA_IDS, **{k.lower(): v for k, v in getattr(settings, 'HH_AREA_IDS', {}).items()}}
+    return areas.get(location.strip().lower())
+
+
+def parse_filters(data):
+    """
+    Собирает фильтры и сортировку из dict-подобного источника (request.GET, JSON-тело, аргументы CLI).
+    Невалидные значения игнорируются, как и в интерактивном вводе команды.
+    Возвращает (filters, sort_option).
+    """
+    filters = {}
+
+    work_mode = (data.get('work_mode') or '').strip().lower()
+    if work_mode in WORK_MODES:
+        filters['work_mode'] = work_mode
+
+    location = (data.get('location') or '').strip()
+    if location:
+        filters['location'] = location
+
+    salary_min = data.get('salary_min')
+    if salary_min not in (None, ''):
+        try:
+            filters['salary_min'] = float(salary_min)
+        except (TypeError, ValueError):
+            pass
+
+    currency = (data.get('currency') or '').strip().upper()
+    if currency:
+        filters['currency'] = currency
+
+    sort_option = str(data.get('sort') or DEFAULT_SORT)
+    if sort_option not in SORT_OPTIONS:
+        sort_option = DEFAULT_SORT
+    return filters, sort_option
+
+
+def build_hh_params(filters, sort_option=DEFAULT_SORT):
+    """
+    Переводит фильтры в параметры запроса к /vacancies.
+    Возвращает (params для HH.ru, фильтры, которые нужно проверить локально).
+
+    - work_mode=remote → schedule=remote (именно по schedule.id мы и определяем remote);
+      office/hybrid у HH.ru одним значением не выражаются — проверяются локально.
+    - location из известного списка городов → area; иначе — локально.
+    - salary_min/currency → only_with_salary=true. Сами значения проверяются локально:
+      параметр HH.ru salary ищет вилки, «включающие» сумму, а не «не меньше» её,
+      а currency без salary HH.ru игнорирует.
+    - сортировка по зарплате → order_by.
+    """
+    params = {}
+    local = {}
+
+    if filters.get('work_mode') == 'remote':
+        params['schedule'] = 'remote'
+    elif 'work_mode' in filters:
+        local['work_mode'] = filters['work_mode']
+
+    if 'location' in filters:
+        area_id = get_area_id(filters['location'])
+        if area_id is not None:
+            params['area'] = area_id
+        else:
+            local['location'] = filters['location']
+
+    if 'salary_min' in filters or 'currency' in filters:
+        params['only_with_salary'] = 'true'
+        for key in ('salary_min', 'currency'):
+            if key in filters:
+                local[key] = filters[key]
+
+    if sort_option in HH_ORDER_BY:
+        params['order_by'] = HH_ORDER_BY[sort_option]
+
+    return params, local
+
+
+def _make_predicate(filters):
+    work_mode = filters.get('work_mode')
+    location = filters['location'].lower() if 'location' in filters else None
+    salary_min = filters.get('salary_min')
+    currency = filters.get('currency')
+
+    def predicate(vacancy):
+        if work_mode is not None and vacancy.get('work_mode') != work_mode:
+            return False
+        if location is not None and location not in (vacancy.get('location') or '').lower():
+            return False
+        if salary_min is not None and not check_salary(vacancy, salary_min, currency):
+            return False
+        if currency is not None and (vacancy.get('currency') or '').upper() != currency:
+            return False
+        return True
+
+    return predicate
+
+
+def apply_filters(vacancies, filters):
+    """Применяет фильтры к списку вакансий за один проход"""
+    if not filters:
+        return list(vacancies)
+    predicate = _make_predicate(filters)
+    return [v for v in vacancies if predicate(v)]
+
+
+def check_salary(vacancy, min_salary, currency=None):
+    """Проверяет, что верхняя граница вилки не меньше min_salary (в валюте currency, по умолчанию в рублях)"""
+    min_salary_rub = to_rub(min_salary, currency or BASE_CURRENCY)
+    salary_max_rub = _salary_range_rub(vacancy)[1]
+    if min_salary_rub is None or salary_max_rub is None:
+        return False
+    return salary_max_rub >= min_salary_rub
+
+
+def _salary_range_rub(vacancy):
+    return salary_range_rub(vacancy.get('salary_from'), vacancy.get('salary_to'), vacancy.get('currency'))
+
+
+def get_max_salary(vacancy):
+    """Возвращает максимальную зарплату в рублях для сортировки"""
+    salary_max_rub = _salary_range_rub(vacancy)[1]
+    return salary_max_rub if salary_max_rub is not None else 0
+
+
+def get_min_salary(vacancy):
+    """Возвращает минимальную зарплату в рублях для сортировки"""
+    salary_min_rub = _salary_range_rub(vacancy)[0]
+    return salary_min_rub if salary_min_rub is not None else float('inf')
+
+
+def sort_vacancies(vacancies, sort_option):
+    """Сортирует вакансии по выбранному критерию"""
+    if sort_option == '1':
+        return sorted(vacancies, key=get_max_salary, reverse=True)
+    if sort_option == '2':
+        return sorted(vacancies, key=get_min_salary)
+    if sort_option == '3':
+        return sorted(vacancies, key=lambda v: (v.get('company_name') or '').lower())
+    if sort_option == '4':
+        return sorted(vacancies, key=lambda v: (v.get('title') or '').lower())
+    return list(vacancies)
@@ -0,0 +1,113 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+# Таблица и веса колонок (title, company_name, location, description) для bm25 — см. миграцию 0005_vacancy_fts
+FTS_TABLE = "parserapp_vacancy_fts"
+COLUMN_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+# Для баз без FTS5 (не SQLite) — обычный поиск по подстроке
+FALLBACK_FIELDS = ("title", "company_name", "location", "description")
+
+# Окончания русских существительных и прилагательных (после замены «ё» на «е»), от длинных к коротким.
+# Индекс хранит слова целиком, а запрос ищет по префиксу, поэтому достаточно отрезать окончание у слова
+# запроса: «разработчиками» → «разработчик»* найдёт и «разработчик», и «разработчика».
+RU_ENDINGS = tuple(sorted((
+    "иями", "ями", "ами", "ыми", "ими", "его", "ого", "ему", "ому", "иях", "ях", "ах", "ям", "ам", "ов", "ев",
+    "ей", "ой", "ий", "ый", "ая", "яя", "ое", "ее", "ые", "ие", "ых", "их", "ым", "им", "ом", "ем", "ую", "юю",
+    "ия", "ию", "ь", "а", "я", "о", "е", "ы", "и", "у", "ю", "й",
+), key=len, reverse=True))
+MIN_STEM = 4  # короче основу не режем: «данных» → «данн», но «базы» остаётся «базы»
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_CYRILLIC_RE = re.compile(r"^[а-яе]+$")
+_RANK_SQL = f"bm25({FTS_TABLE}, {', '.join(str(weight) for weight in COLUMN_WEIGHTS)})"
+
+# Проверка FTS-таблицы — по базе (имя файла): у тестов своя база, созданная миграциями заново
+_available = {}
+
+
+def is_available():
+    """Есть ли в текущей базе FTS-таблица вакансий (SQLite после миграции 0005)."""
+    if connection.vendor != "sqlite":
+        return False
+    name = connection.settings_dict["NAME"]
+    if name not in _available:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _available[name] = cursor.fetchone() is not None
+    return _available[name]
+
+
+def normalize(text):
+    # То же приведение, что в представлении-источнике индекса: «ё» и «е» — одна буква
+    return text.replace("ё", "е").replace("Ё", "Е")
+
+
+def stem(token):
+    """Отрезает окончание у русского слова (RU_ENDINGS), оставляя не меньше MIN_STEM букв; остальные слова — как есть."""
+    lowered = token.lower()
+    if not _CYRILLIC_RE.match(lowered):
+        return token
+    for ending in RU_ENDINGS:
+        if lowered.endswith(ending) and len(lowered) - len(ending) >= MIN_STEM:
+            return lowered[:-len(ending)]
+    return lowered
+
+
+def build_match_query(text):
+    """
+    Превращает пользовательский ввод в запрос FTS5: все слова обязательны, каждое ищется по префиксу
+    («разраб» найдёт «разработчик»), у русских слов сначала отрезается окончание (stem), поэтому находятся
+    и другие формы слова. Слова берутся в кавычки, чтобы синтаксис FTS5 не ломал запрос.
+    """
+    tokens = _TOKEN_RE.findall(normalize(text))
+    return " ".join(f'"{stem(token)}"*' for token in tokens)
+
+
+def search_ranked(text, limit=100):
+    """Возвращает [(id вакансии, ранг)] по релевантности (меньше ранг — выше)."""
+    match = build_match_query(text)
+    if not match:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, {_RANK_SQL} AS rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rank LIMIT %s",
+            [match, limit],
+        )
+        return cursor.fetchall()
+
+
+def filter_queryset(queryset, text):
+    """Оставляет в queryset вакансии, подходящие под полнотекстовый запрос."""
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    if not is_available():
+        condition = Q()
+        for token in map(stem, _TOKEN_RE.findall(text)):
+            token_q = Q()
+            for field in FALLBACK_FIELDS:
+                token_q |= Q(**{f"{field}__icontains": token})
+            condition &= token_q
+        return queryset.filter(condition)
+    return queryset.filter(
+        id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,))
+    )
+
+
+def rank_expression(text):
+    """
+    Выражение ранга bm25 для annotate(): подзапрос к FTS по rowid текущей строки.
+    Без FTS возвращает константу — порядок тогда определяется только id.
+    """
+    match = build_match_query(text)
+    if not match or not is_available():
+        return RawSQL("0", (), output_field=FloatField())
+    return RawSQL(
+        f"SELECT {_RANK_SQL} FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = parserapp_vacancy.id",
+        (match,),
+        output_field=FloatField(),
+    )
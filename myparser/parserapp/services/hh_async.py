@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import weakref
+
+import httpx
+
+from parserapp.serializers import vacancy_from_hh
+from parserapp.services import fastjson
+from parserapp.services.cache import make_cache_key
+from parserapp.services.hh_parser import HHParser
+from parserapp.services.http_client import get_pool_settings
+from parserapp.services.metrics import observe_stage, stage
+from parserapp.services.resilience import (
+    RETRYABLE_STATUSES,
+    backoff_delay,
+    get_breaker,
+    get_limiter,
+    get_resilience_settings,
+    parse_retry_after,
+)
+from parserapp.services.singleflight import AsyncSingleFlight
+from parserapp.utilis.logger import log_payload
+
+
+logger = logging.getLogger(__name__)
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Возвращает httpx.AsyncClient текущего event loop.
+    Клиент нельзя разделять между loop'ами, поэтому держим по одному на loop;
+    внутри loop'а все корутины используют общий пул keep-alive соединений.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        config = get_pool_settings()
+        client = httpx.AsyncClient(
+            headers=HHParser.HEADERS,
+            timeout=config["TIMEOUT"],
+            limits=httpx.Limits(
+                max_connections=config["ASYNC_MAX_CONNECTIONS"],
+                max_keepalive_connections=config["POOL_MAXSIZE"],
+                keepalive_expiry=config["KEEP_ALIVE_IDLE"],
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    loop = asyncio.get_running_loop()
+    client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+class AsyncHHParser:
+    """Асинхронный аналог HHParser с тем же контрактом get_vacancies/fetch_page/parse_response."""
+
+    BASE_URL = HHParser.BASE_URL
+
+    def __init__(self, client=None, flight=None):
+        self._client = client
+        # Если задан AsyncSingleFlight, одинаковые одновременные get_vacancies делят один запрос к HH.ru
+        self.flight = flight
+
+    @property
+    def client(self):
+        return self._client or get_async_client()
+
+    async def get_vacancies(self, query, page=0, per_page=20, **extra_params):
+        if self.flight is not None:
+            key = make_cache_key(query, page, per_page, extra_params)
+            return await self.flight.do(key, self._get_vacancies, query, page, per_page, extra_params)
+        return await self._get_vacancies(query, page, per_page, extra_params)
+
+    async def _get_vacancies(self, query, page, per_page, extra_params):
+        data = await self.fetch_page(query, page=page, per_page=per_page, **extra_params)
+        if data is None:
+            return []
+        return self.parse_response(data)
+
+    async def fetch_page(self, query, page=0, per_page=20, **extra_params):
+        """Асинхронный HHParser.fetch_page: тот же ограничитель скорости, повторы и circuit breaker."""
+        params = {
+            "text": query,
+            "page": page,
+            "per_page": per_page,
+            **extra_params,
+        }
+        breaker = get_breaker()
+        permit = breaker.allow()
+        if not permit:
+            logger.warning("HH.ru недоступен (circuit breaker разомкнут), запрос пропущен",
+                           extra={"query": query, "page": page})
+            return None
+        try:
+            return await self._fetch_with_retries(query, page, per_page, params, breaker)
+        finally:
+            breaker.release(permit)
+
+    async def _fetch_with_retries(self, query, page, per_page, params, breaker):
+        config = get_resilience_settings()
+        limiter = get_limiter()
+        for attempt in range(config["RETRIES"] + 1):
+            retry_after = None
+            await limiter.acquire_async()
+            try:
+                response = await self.client.get(self.BASE_URL, params=params)
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    limiter.on_throttle(retry_after)
+                response.raise_for_status()
+                observe_stage("hh_request", response.elapsed.total_seconds())
+                log_payload(logger, response.content, query=query, page=page)
+                with stage("json_decode"):
+                    data = fastjson.loads(response.content)
+                logger.info("HH async request ok", extra={
+                    "query": query,
+                    "page": page,
+                    "per_page": per_page,
+                    "status": response.status_code,
+                    "latency_ms": round(response.elapsed.total_seconds() * 1000, 1),
+                    "items": len(data.get("items", [])),
+                })
+                limiter.on_success()
+                breaker.record_success()
+                return data
+            except httpx.TimeoutException:
+                logger.warning("Запрос к HH.ru превысил время ожидания",
+                               extra={"query": query, "page": page, "attempt": attempt})
+            except httpx.HTTPStatusError as e:
+                logger.warning("Ошибка при запросе к HH.ru", extra={
+                    "query": query,
+                    "page": page,
+                    "status": e.response.status_code,
+                    "body": e.response.content[:500].decode("utf-8", errors="replace"),
+                    "attempt": attempt,
+                })
+                if e.response.status_code not in RETRYABLE_STATUSES:
+                    breaker.record_success()
+                    return None
+            except (httpx.HTTPError, ValueError) as e:
+                logger.warning("Ошибка при запросе к HH.ru",
+                               extra={"query": query, "page": page, "error": str(e), "attempt": attempt})
+            finally:
+                limiter.release()
+
+            if attempt < config["RETRIES"]:
+                await asyncio.sleep(max(retry_after or 0, backoff_delay(attempt, config["BACKOFF_BASE"], config["BACKOFF_CAP"])))
+
+        breaker.record_failure()
+        return None
+
+    def parse_response(self, data):
+        with stage("map"):
+            return [vacancy_from_hh(item) for item in data.get("items", [])]
+
+
+_default_async_parser = AsyncHHParser(flight=AsyncSingleFlight())
+
+
+def get_default_async_parser():
+    """Общий экземпляр AsyncHHParser для async view."""
+    return _default_async_parser
@@ -1,11 +1,33 @@
+import logging
 import os
-import requests
+import threading
+import time
 from requests.exceptions import RequestException, Timeout
 from parserapp.serializers import vacancy_from_hh
+from parserapp.services import fastjson
+from parserapp.services.http_client import get_session, get_timeout
+from parserapp.services.metrics import observe_stage, stage
+from parserapp.services.resilience import (
+    RETRYABLE_STATUSES,
+    backoff_delay,
+    get_breaker,
+    get_limiter,
+    get_resilience_settings,
+    parse_retry_after,
+)
+from parserapp.utilis.logger import log_payload
+
+
+logger = logging.getLogger(__name__)
+
+
+class HHUnavailable(RuntimeError):
+    """HH.ru не ответил (сбой сети, 5xx/429 после повторов, некорректный JSON, разомкнут circuit breaker)."""
 
 
 class HHParser:
-    BASE_URL = "https://api.hh.ru/vacancies"
+    # Адрес API можно подменить через HH_API_URL (например, на parserapp.benchmarks.fake_hh)
+    BASE_URL = os.getenv("HH_API_URL", "https://api.hh.ru/vacancies")
 
     # HH может блокировать User-Agent. Разрешаем переопределять его через переменную окружения HH_USER_AGENT.
     HEADERS = {
@@ -17,35 +39,157 @@ class HHParser:
         "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
     }
 
-    def get_vacancies(self, query, page=0, per_page=20):
+    def __init__(self, session=None):
+        # По умолчанию используем общий пул соединений процесса (keep-alive к api.hh.ru)
+        self._session = session
+
+    @property
+    def session(self):
+        return self._session or get_session()
+
+    def get_vacancies(self, query, page=0, per_page=20, **extra_params):
+        """Вакансии одной страницы. Сбой — HHUnavailable, чтобы он не выглядел как пустая выдача."""
+        data = self.fetch_page(query, page=page, per_page=per_page, **extra_params)
+        if data is None:
+            raise HHUnavailable("HH.ru не ответил")
+        return self.parse_response(data)
+
+    def fetch_page(self, query, page=0, per_page=20, **extra_params):
+        """
+        Запрашивает одну страницу /vacancies и возвращает сырой JSON (dict).
+        При ошибке сети/HTTP возвращает None, чтобы вызывающий код мог отличить сбой от пустой выдачи.
+        """
         params = {
             "text": query,
             "page": page,
             "per_page": per_page,
+            **extra_params,
         }
+        result = self.request(self.BASE_URL, params=params, context={"query": query, "page": page})
+        if result is None or result[1] is None:
+            return None
+        response, data = result
+        logger.info("HH request ok", extra={
+            "query": query,
+            "page": page,
+            "per_page": per_page,
+            "status": response.status_code,
+            "latency_ms": round(response.elapsed.total_seconds() * 1000, 1),
+            "items": len(data.get("items", [])),
+        })
+        return data
+
+    def fetch_detail(self, external_id, etag=None, last_modified=None):
+        """
+        Запрашивает /vacancies/{id}. С etag/last_modified запрос условный: если вакансия не менялась,
+        HH.ru отвечает 304 без тела. Возвращает (status, data или None, response.headers) или None при сбое.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        result = self.request(f"{self.BASE_URL}/{external_id}", headers=headers, context={"id": external_id})
+        if result is None:
+            return None
+        response, data = result
+        return response.status_code, data, response.headers
+
+    def request(self, url, params=None, headers=None, context=None):
+        """
+        GET к HH.ru. Возвращает (response, JSON-тело или None) или None при сбое.
+        Для 304 и 4xx (кроме 429) тела нет: повтор не поможет, это ответ, а не сбой.
+
+        Запросы проходят через общий ограничитель скорости (подстраивается под 429 и Retry-After),
+        429/5xx/таймауты повторяются с экспоненциальной задержкой и джиттером,
+        а пока HH.ru нездоров (circuit breaker разомкнут) — сразу возвращается None.
+        context — поля для записей лога (query, page, id).
+        """
+        context = context or {}
+        breaker = get_breaker()
+        permit = breaker.allow()
+        if not permit:
+            logger.warning("HH.ru недоступен (circuit breaker разомкнут), запрос пропущен", extra=context)
+            return None
         try:
-            response = requests.get(
-                self.BASE_URL,
-                params=params,
-                headers=self.HEADERS,
-                timeout=10
-            )
-            print(f"HH response status={response.status_code}, body={response.text}")
-            response.raise_for_status()
-            data = response.json()
-            items = data.get("items", [])
-            print(f"HH request ok: query={query} page={page} per_page={per_page} items={len(items)}")
-            if items:
-                print(f"HH first item sample: {items[0]}")
-            return self.parse_response(data)
-        except Timeout:
-            print(f"Запрос к HH.ru превысил время ожидания: query={query}")
-            return []
-        except RequestException as e:
-            if getattr(e, "response", None) is not None:
-                print(f"HH error {e.response.status_code}: {e.response.text}")
-            print(f"Ошибка при запросе к HH.ru: {e}")
-            return []
+            return self._request_with_retries(url, params, headers, context, breaker)
+        finally:
+            breaker.release(permit)
+
+    def _request_with_retries(self, url, params, headers, context, breaker):
+        config = get_resilience_settings()
+        limiter = get_limiter()
+        for attempt in range(config["RETRIES"] + 1):
+            retry_after = None
+            limiter.acquire()
+            try:
+                response = self.session.get(
+                    url,
+                    params=params,
+                    headers={**self.HEADERS, **headers} if headers else self.HEADERS,
+                    timeout=get_timeout()
+                )
+                observe_stage("hh_request", response.elapsed.total_seconds())
+                logger.debug("HH response", extra={
+                    **context,
+                    "status": response.status_code,
+                    "latency_ms": round(response.elapsed.total_seconds() * 1000, 1),
+                    "bytes": len(response.content),
+                    "attempt": attempt,
+                })
+                log_payload(logger, response.content, **context)
+                if response.status_code == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    limiter.on_throttle(retry_after)
+                response.raise_for_status()
+                # Тело разбирается один раз, из bytes (без response.text/response.json)
+                data = None
+                if response.status_code != 304:
+                    with stage("json_decode"):
+                        data = fastjson.loads(response.content)
+                limiter.on_success()
+                breaker.record_success()
+                return response, data
+            except Timeout:
+                logger.warning("Запрос к HH.ru превысил время ожидания", extra={**context, "attempt": attempt})
+            except RequestException as e:
+                status = e.response.status_code if getattr(e, "response", None) is not None else None
+                logger.warning("Ошибка при запросе к HH.ru", extra={
+                    **context,
+                    "status": status,
+                    "error": str(e),
+                    "body": e.response.content[:500].decode("utf-8", errors="replace") if status is not None else "",
+                    "attempt": attempt,
+                })
+                if status is not None and status not in RETRYABLE_STATUSES:
+                    # 4xx (кроме 429) — ошибка самого запроса, HH.ru при этом здоров; повтор не поможет
+                    breaker.record_success()
+                    return e.response, None
+            except ValueError as e:
+                logger.warning("HH.ru вернул некорректный JSON", extra={**context, "error": str(e), "attempt": attempt})
+            finally:
+                limiter.release()
+
+            if attempt < config["RETRIES"]:
+                time.sleep(max(retry_after or 0, backoff_delay(attempt, config["BACKOFF_BASE"], config["BACKOFF_CAP"])))
+
+        breaker.record_failure()
+        return None
 
     def parse_response(self, data):
-        return [vacancy_from_hh(item) for item in data.get("items", [])]
\ No newline at end of file
+        with stage("map"):
+            return [vacancy_from_hh(item) for item in data.get("items", [])]
+
+
+_default_parser = None
+_default_parser_lock = threading.Lock()
+
+
+def get_default_parser():
+    """Общий экземпляр HHParser для view и management-команд."""
+    global _default_parser
+    if _default_parser is None:
+        with _default_parser_lock:
+            if _default_parser is None:
+                _default_parser = HHParser()
+    return _default_parser
@@ -0,0 +1,155 @@
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Значения по умолчанию; переопределяются через settings.HH_HTTP_POOL
+DEFAULT_POOL_SETTINGS = {
+    "POOL_CONNECTIONS": 4,     # сколько пулов (хостов) держать в кэше
+    "POOL_MAXSIZE": 32,        # максимум соединений на один хост
+    "POOL_BLOCK": False,       # ждать свободное соединение вместо открытия лишнего
+    "KEEP_ALIVE": True,        # TCP keep-alive для простаивающих соединений
+    "KEEP_ALIVE_IDLE": 60,     # секунд простоя до первой keep-alive пробы
+    "TIMEOUT": 10,             # таймаут запроса к HH.ru, секунд
+    "ASYNC_MAX_CONNECTIONS": 200,  # одновременных соединений у async-клиента (на event loop)
+}
+
+
+class PoolStats:
+    """Потокобезопасные счётчики переиспользования соединений."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, reused):
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+pool_stats = PoolStats()
+
+
+class _CountingPoolMixin:
+    # Соединение, которое уже подключено при выдаче из пула, — это hit (нет нового TCP/TLS handshake).
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        pool_stats.record(getattr(conn, "is_connected", False))
+        return conn
+
+
+class CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter с подсчётом hit/miss пула и настройкой TCP keep-alive."""
+
+    def __init__(self, keep_alive=True, keep_alive_idle=60, **kwargs):
+        self.keep_alive = keep_alive
+        self.keep_alive_idle = keep_alive_idle
+        super().__init__(**kwargs)
+
+    def _socket_options(self):
+        from urllib3.connection import HTTPConnection
+
+        options = list(HTTPConnection.default_socket_options)
+        if self.keep_alive:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keep_alive_idle))
+        return options
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault("socket_options", self._socket_options())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+def get_pool_settings():
+    """Возвращает настройки пула: значения по умолчанию + settings.HH_HTTP_POOL."""
+    from django.conf import settings
+
+    config = dict(DEFAULT_POOL_SETTINGS)
+    config.update(getattr(settings, "HH_HTTP_POOL", {}) or {})
+    return config
+
+
+_adapter = None
+_adapter_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_adapter():
+    """Общий на процесс адаптер; именно он владеет пулом соединений."""
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                config = get_pool_settings()
+                _adapter = PooledHTTPAdapter(
+                    keep_alive=config["KEEP_ALIVE"],
+                    keep_alive_idle=config["KEEP_ALIVE_IDLE"],
+                    pool_connections=config["POOL_CONNECTIONS"],
+                    pool_maxsize=config["POOL_MAXSIZE"],
+                    pool_block=config["POOL_BLOCK"],
+                )
+    return _adapter
+
+
+def get_session():
+    """
+    Возвращает requests.Session текущего потока.
+    Сессии разные (cookies/headers не разделяются между потоками),
+    но все смонтированы на один адаптер, поэтому соединения переиспользуются процессом целиком.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        adapter = get_adapter()
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def get_timeout():
+    return get_pool_settings()["TIMEOUT"]
+
+
+def close_pool():
+    """Закрывает все соединения пула (например, при остановке процесса или в тестах)."""
+    global _adapter
+    with _adapter_lock:
+        if _adapter is not None:
+            _adapter.close()
+            _adapter = None
+    _local.__dict__.pop("session", None)
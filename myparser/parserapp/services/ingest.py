@@ -0,0 +1,158 @@
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from parserapp.fingerprint import HH_FIELDS, content_hash
+from parserapp.models import Vacancy
+from parserapp.services.currency import salary_range_rub
+from parserapp.services.db_writer import get_writer
+from parserapp.services.metrics import stage
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Поля, вычисляемые из HH_FIELDS (зарплата в рублях и отпечаток); записываются вместе с ними
+DERIVED_FIELDS = ("salary_min_rub", "salary_max_rub", "content_hash")
+# Поля без null=True: None из ответа HH.ru превращаем в пустую строку
+_NOT_NULL_TEXT_FIELDS = {"title", "company_name", "description", "location", "url", "source"}
+_DECIMAL_FIELDS = {"salary_from", "salary_to"}
+_DATETIME_FIELDS = {"posted_at"}
+
+
+@dataclass
+class IngestReport:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0  # отпечаток совпал — запись в БД пропущена
+    skipped: int = 0  # записи без external_id/url, которые нельзя сохранить
+
+    def __add__(self, other):
+        return IngestReport(
+            inserted=self.inserted + other.inserted,
+            updated=self.updated + other.updated,
+            unchanged=self.unchanged + other.unchanged,
+            skipped=self.skipped + other.skipped,
+        )
+
+    @property
+    def total(self):
+        return self.inserted + self.updated + self.unchanged + self.skipped
+
+    def as_dict(self):
+        return {
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+        }
+
+
+def _normalize(field, value):
+    if value is None:
+        return "" if field in _NOT_NULL_TEXT_FIELDS else None
+    if field in _DECIMAL_FIELDS:
+        return Decimal(str(value))
+    if field in _DATETIME_FIELDS and isinstance(value, str):
+        return parse_datetime(value)
+    return value
+
+
+def _row_from_vacancy(vacancy):
+    row = {field: _normalize(field, vacancy.get(field)) for field in HH_FIELDS}
+    row["content_hash"] = content_hash(row)
+    if row["posted_at"] is None:
+        # Нет даты публикации — остаётся значение по умолчанию модели
+        del row["posted_at"]
+    return row
+
+
+def _with_derived(row):
+    row = dict(row)
+    row["salary_min_rub"], row["salary_max_rub"] = salary_range_rub(row["salary_from"], row["salary_to"], row["currency"])
+    return row
+
+
+class VacancyIngestor:
+    """
+    Пакетная запись вакансий (dict из vacancy_from_hh) в Vacancy.
+
+    Вакансии копятся в буфере и сбрасываются пачками по batch_size. Каждая пачка — одна транзакция:
+    один SELECT отпечатков (content_hash) существующих строк по external_id и один
+    INSERT ... ON CONFLICT(external_id) DO UPDATE только для новых и изменившихся записей.
+    Если ничего не изменилось, пачка обходится одним SELECT по индексу.
+
+    Пачки пишет общий поток записи (parserapp/services/db_writer.py), если он включён: add не ждёт записи
+    и продолжает копить следующую пачку, flush дожидается всех отправленных.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, writer=None):
+        self.batch_size = batch_size
+        self.writer = writer if writer is not None else get_writer()
+        self.report = IngestReport()
+        self._buffer = {}
+        self._pending = []
+
+    def add(self, vacancies):
+        for vacancy in vacancies:
+            external_id = vacancy.get("external_id")
+            if not external_id or not vacancy.get("url"):
+                self.report.skipped += 1
+                continue
+            # Повтор внутри пачки: побеждает последняя версия
+            self._buffer[str(external_id)] = _row_from_vacancy(vacancy)
+            if len(self._buffer) >= self.batch_size:
+                self._submit()
+        return self
+
+    def flush(self):
+        self._submit()
+        pending, self._pending = self._pending, []
+        for future in pending:
+            self.report += future.result()
+        return self.report
+
+    def _submit(self):
+        if not self._buffer:
+            return
+        rows, self._buffer = self._buffer, {}
+        if self.writer:
+            self._pending.append(self.writer.submit(write_batch, rows))
+        else:
+            self.report += write_batch(rows)
+
+
+def write_batch(rows):
+    """
+    Записывает пачку {external_id: поля} одним bulk upsert. Возвращает IngestReport по пачке.
+    Строки, чей content_hash совпадает с сохранённым, не пишутся (и updated_at у них не меняется).
+    """
+    report = IngestReport()
+    with stage("ingest_write"), transaction.atomic():
+        existing = dict(Vacancy.objects.filter(external_id__in=list(rows)).values_list("external_id", "content_hash"))
+        to_write = []
+        for external_id, row in rows.items():
+            if external_id not in existing:
+                report.inserted += 1
+            elif existing[external_id] == row["content_hash"]:
+                report.unchanged += 1
+                continue
+            else:
+                report.updated += 1
+            to_write.append(Vacancy(external_id=external_id, **_with_derived(row)))
+
+        if to_write:
+            Vacancy.objects.bulk_create(
+                to_write,
+                update_conflicts=True,
+                unique_fields=["external_id"],
+                update_fields=[*HH_FIELDS, *DERIVED_FIELDS, "updated_at"],
+            )
+    return report
+
+
+def ingest_vacancies(vacancies, batch_size=DEFAULT_BATCH_SIZE):
+    """Записывает любой iterable вакансий (список, генератор обхода) в БД. Возвращает IngestReport."""
+    with stage("ingest"):
+        return VacancyIngestor(batch_size=batch_size).add(vacancies).flush()
@@ -0,0 +1,290 @@
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from parserapp.models import ScheduledJob, SearchSync
+from parserapp.services.resilience import backoff_delay
+
+
+# Значения по умолчанию; переопределяются через settings.HH_JOBS
+DEFAULT_JOB_SETTINGS = {
+    "WORKERS": 4,           # заданий, выполняемых одновременно в одном процессе воркера
+    "POLL_INTERVAL": 5.0,   # секунд между проверками очереди, когда готовых заданий нет
+    "LEASE": 300,           # на сколько секунд задание закрепляется за воркером
+    "HEARTBEAT": 60,        # как часто воркер продлевает аренду выполняемых заданий
+    "JITTER": 0.1,          # разброс времени следующего запуска, доля периода
+    "RETRY_BASE": 60,       # задержка повтора после ошибки (растёт экспоненциально, не больше периода)
+}
+# Сколько готовых заданий просматривать за одну попытку захвата
+CLAIM_CANDIDATES = 10
+
+logger = logging.getLogger(__name__)
+
+
+def get_job_settings():
+    from django.conf import settings
+
+    config = dict(DEFAULT_JOB_SETTINGS)
+    config.update(getattr(settings, "HH_JOBS", {}) or {})
+    return config
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _free_lease(now):
+    return Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+
+
+# Обработчики заданий по типу: принимают ScheduledJob, возвращают dict для last_result
+
+def _run_sync(job):
+    from parserapp.services.sync import sync_search
+
+    sync, _ = SearchSync.objects.get_or_create(query=job.query, defaults={"params": job.params or {}})
+    result = sync_search(sync)
+    return {"fetched": result.fetched, "windows": result.windows, "complete": result.complete,
+            **result.report.as_dict()}
+
+
+def _run_crawl(job):
+    from parserapp.services.crawler import crawl_vacancies
+    from parserapp.services.ingest import ingest_vacancies
+
+    params = dict(job.params or {})
+    max_pages = params.pop("max_pages", None)
+    report = ingest_vacancies(crawl_vacancies(job.query, max_pages=max_pages, **params))
+    return report.as_dict()
+
+
+def _run_details(job):
+    """Описания сохранённых вакансий; job.query здесь — подстрока названия вакансии (пусто — все вакансии)."""
+    from parserapp.models import Vacancy
+    from parserapp.services.details import fetch_details
+
+    params = job.params or {}
+    queryset = Vacancy.objects.all()
+    if job.query:
+        queryset = queryset.filter(title__icontains=job.query)
+    return fetch_details(queryset, limit=params.get("limit"), max_workers=params.get("workers")).as_dict()
+
+
+JOB_HANDLERS = {
+    "sync": _run_sync,
+    "crawl": _run_crawl,
+    "details": _run_details,
+}
+
+
+def add_job(kind, query="", interval=3600, params=None, run_now=False, now=None):
+    """
+    Создаёт (или обновляет) задание. Первый запуск — в случайный момент внутри первого периода,
+    чтобы задания, добавленные вместе, не ходили в HH.ru одновременно. Возвращает (job, created).
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Неизвестный тип задания: {kind}")
+    now = now or timezone.now()
+    next_run_at = now if run_now else now + timedelta(seconds=random.uniform(0, interval))
+    return ScheduledJob.objects.update_or_create(
+        kind=kind,
+        query=query,
+        defaults={"interval": interval, "params": params or {}, "enabled": True},
+        create_defaults={"interval": interval, "params": params or {}, "next_run_at": next_run_at},
+    )
+
+
+def claim_job(worker_id, lease=None, now=None):
+    """
+    Захватывает одно готовое задание: enabled, next_run_at наступил, аренда свободна или истекла.
+    Захват — условный UPDATE (проверка и запись одним запросом), поэтому два воркера не возьмут одно задание
+    без SELECT ... FOR UPDATE и на любой базе. Возвращает ScheduledJob или None.
+    """
+    now = now or timezone.now()
+    lease = get_job_settings()["LEASE"] if lease is None else lease
+    due = ScheduledJob.objects.filter(_free_lease(now), enabled=True, next_run_at__lte=now)
+    for pk in due.order_by("next_run_at").values_list("pk", flat=True)[:CLAIM_CANDIDATES]:
+        claimed = due.filter(pk=pk).update(
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=lease),
+            heartbeat_at=now,
+            last_started_at=now,
+        )
+        if claimed:
+            return ScheduledJob.objects.get(pk=pk)
+    return None
+
+
+def extend_leases(worker_id, job_ids, lease=None, now=None):
+    """Heartbeat: продлевает аренду заданий, которые воркер ещё выполняет. Возвращает число продлённых."""
+    if not job_ids:
+        return 0
+    now = now or timezone.now()
+    lease = get_job_settings()["LEASE"] if lease is None else lease
+    return ScheduledJob.objects.filter(pk__in=job_ids, locked_by=worker_id).update(
+        locked_until=now + timedelta(seconds=lease),
+        heartbeat_at=now,
+    )
+
+
+def next_run_time(job, now, jitter=None):
+    """
+    Следующий запуск по расписанию: next_run_at + interval (пропущенные периоды не навёрстываются)
+    со случайным сдвигом ±jitter·interval, чтобы запуски не собирались в пачки.
+    """
+    jitter = get_job_settings()["JITTER"] if jitter is None else jitter
+    interval = timedelta(seconds=job.interval)
+    scheduled = job.next_run_at + interval
+    if scheduled <= now:
+        scheduled += interval * ((now - scheduled) // interval + 1)
+    return max(now, scheduled + interval * random.uniform(-jitter, jitter))
+
+
+def complete_job(job, worker_id, result, now=None):
+    """Записывает результат и следующий запуск. False — аренду уже забрал другой воркер, запись пропущена."""
+    now = now or timezone.now()
+    return bool(ScheduledJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        next_run_at=next_run_time(job, now),
+        locked_by="",
+        locked_until=None,
+        attempts=0,
+        last_finished_at=now,
+        last_result=result or {},
+        last_error="",
+    ))
+
+
+def fail_job(job, worker_id, error, now=None):
+    """Записывает ошибку; повтор — через экспоненциально растущую задержку, но не позже обычного запуска."""
+    now = now or timezone.now()
+    retry_base = get_job_settings()["RETRY_BASE"]
+    attempts = job.attempts + 1
+    delay = retry_base + backoff_delay(attempts - 1, retry_base, job.interval)
+    return bool(ScheduledJob.objects.filter(pk=job.pk, locked_by=worker_id).update(
+        next_run_at=now + timedelta(seconds=min(delay, job.interval)),
+        locked_by="",
+        locked_until=None,
+        attempts=attempts,
+        last_finished_at=now,
+        last_error=error,
+    ))
+
+
+def run_job(job):
+    return JOB_HANDLERS[job.kind](job)
+
+
+class JobWorker:
+    """
+    Воркер очереди ScheduledJob: workers потоков забирают готовые задания и выполняют их параллельно,
+    отдельный поток продлевает аренду выполняемых заданий. Потоки, а не процессы: задания в основном ждут
+    HH.ru и базу, а ограничитель скорости HH.ru общий в пределах процесса.
+    Нагрузку между машинами делят несколькими процессами run_worker — задания распределяются через аренду.
+    События заданий пишутся в логгер модуля или, если передан log (например, stdout команды), — строками в log.
+    """
+
+    def __init__(self, workers=None, worker_id=None, poll_interval=None, lease=None, heartbeat=None, log=None):
+        config = get_job_settings()
+        self.workers = workers or config["WORKERS"]
+        self.worker_id = worker_id or default_worker_id()
+        self.poll_interval = config["POLL_INTERVAL"] if poll_interval is None else poll_interval
+        self.lease = lease or config["LEASE"]
+        self.heartbeat = heartbeat or config["HEARTBEAT"]
+        self.log = log
+        self.completed = 0
+        self.failed = 0
+        self._running = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._done = threading.Event()
+
+    def stop(self):
+        """Перестать брать новые задания; выполняемые доработают."""
+        self._stop.set()
+
+    def run(self, once=False):
+        """Запускает потоки и ждёт их завершения. once=True — выполнить готовые задания и выйти."""
+        self._stop.clear()
+        self._done.clear()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        heartbeat.start()
+        threads = [
+            threading.Thread(target=self._loop, args=(once,), name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                # join с таймаутом, чтобы главный поток получал KeyboardInterrupt
+                while thread.is_alive():
+                    thread.join(timeout=1.0)
+        finally:
+            self._stop.set()
+            self._done.set()
+            heartbeat.join()
+
+    def _loop(self, once):
+        try:
+            while not self._stop.is_set():
+                close_old_connections()
+                job = claim_job(self.worker_id, lease=self.lease)
+                if job is None:
+                    if once:
+                        break
+                    self._stop.wait(self.poll_interval)
+                    continue
+                self._execute(job)
+        finally:
+            connection.close()
+
+    def _execute(self, job):
+        with self._lock:
+            self._running.add(job.pk)
+        self._report(logging.INFO, "▶️", "Задание запущено", job)
+        try:
+            result = run_job(job)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            self._report(logging.ERROR, "❌", "Задание завершилось ошибкой", job, e)
+            fail_job(job, self.worker_id, f"{e}\n{traceback.format_exc()}")
+        else:
+            with self._lock:
+                self.completed += 1
+            if complete_job(job, self.worker_id, result):
+                self._report(logging.INFO, "✅", "Задание выполнено", job, result)
+            else:
+                self._report(logging.WARNING, "⚠️", "Аренда истекла, результат не записан", job)
+        finally:
+            with self._lock:
+                self._running.discard(job.pk)
+
+    def _report(self, level, icon, message, job, detail=None):
+        if self.log is not None:
+            text = f"{icon} [{self.worker_id}] {job}"
+            if detail is not None or level >= logging.WARNING:
+                text += f": {message if detail is None else detail}"
+            self.log(text)
+            return
+        fields = {"worker": self.worker_id, "job_id": job.pk, "kind": job.kind, "query": job.query}
+        if detail is not None:
+            fields["result" if level < logging.WARNING else "error"] = detail
+        logger.log(level, message, extra=fields)
+
+    def _heartbeat_loop(self):
+        try:
+            while not self._done.wait(self.heartbeat):
+                with self._lock:
+                    running = list(self._running)
+                extend_leases(self.worker_id, running, lease=self.lease)
+        finally:
+            connection.close()
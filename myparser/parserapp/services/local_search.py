@@ -0,0 +1,152 @@
+import base64
+import json
+import re
+
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from parserapp.models import MAX_SALARY_SORT_KEY, MIN_SALARY_SORT_KEY, Vacancy
+from parserapp.services import fulltext
+from parserapp.services.currency import BASE_CURRENCY, to_rub
+
+
+# Те же поля, что отдаёт vacancy_from_hh
+RESULT_FIELDS = (
+    "title",
+    "company_name",
+    "description",
+    "salary_from",
+    "salary_to",
+    "currency",
+    "work_mode",
+    "location",
+    "url",
+    "external_id",
+    "source",
+    "posted_at",
+)
+
+DEFAULT_SORT = "5"
+RELEVANCE_SORT = "0"  # по релевантности полнотекстового запроса (только вместе с text)
+MAX_PER_PAGE = 100
+
+# Нумерация совпадает с вариантами сортировки в команде search_vacancies.
+# Для каждого варианта в Vacancy.Meta.indexes есть индексы (выражение, id) и (work_mode, выражение, id): выдача
+# идёт в порядке индекса без сортировки во временном B-дереве — и без фильтров, и с фильтром work_mode;
+# остальные фильтры проверяются по строкам, которые индекс отдаёт по порядку. Исключение — salary_min
+# с сортировкой не по зарплате: диапазон по зарплате и порядок по другому ключу одним индексом не покрыть.
+SORT_KEYS = {
+    "1": (MAX_SALARY_SORT_KEY, True),   # по зарплате, от большей к меньшей
+    "2": (MIN_SALARY_SORT_KEY, False),  # по зарплате, от меньшей к большей
+    "3": (Lower("company_name"), False),
+    "4": (Lower("title"), False),
+    "5": (None, True),                  # без сортировки: новые записи первыми (по id)
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, pk):
+    raw = json.dumps([sort_value, pk], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor, sort_option):
+    try:
+        sort_value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        pk = int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Некорректный cursor")
+    if sort_option in ("0", "1", "2") and not isinstance(sort_value, (int, float)):
+        raise InvalidCursor("Некорректный cursor")
+    return sort_value, pk
+
+
+def filter_queryset(queryset, filters):
+    """Фильтры как в search_vacancies._apply_filters, но в виде условий SQL."""
+    if filters.get("work_mode"):
+        queryset = queryset.filter(work_mode=filters["work_mode"])
+    if filters.get("location"):
+        # Подстрока без учёта регистра, как в apply_filters. LIKE и lower() в SQLite не знают кириллицу,
+        # а REGEXP Django выполняет через re, где (?i) работает для любых букв
+        queryset = queryset.filter(location__iregex=re.escape(filters["location"]))
+    if filters.get("salary_min") is not None:
+        # Сумма — в валюте фильтра currency (по умолчанию в рублях), сравнивается с верхней границей вилки в рублях.
+        # Условие на выражении MAX_SALARY_SORT_KEY — диапазон по индексу vacancy_sort_max_salary_idx.
+        salary_min_rub = to_rub(filters["salary_min"], filters.get("currency") or BASE_CURRENCY)
+        if salary_min_rub is None:
+            return queryset.none()
+        queryset = queryset.alias(salary_max_key=MAX_SALARY_SORT_KEY).filter(salary_max_key__gte=salary_min_rub)
+        if salary_min_rub <= 0:
+            queryset = queryset.filter(salary_max_rub__isnull=False)
+    if filters.get("currency"):
+        queryset = queryset.filter(currency=filters["currency"].upper())
+    return queryset
+
+
+def search_local(filters=None, sort_option=None, cursor=None, limit=20, queryset=None, text=None):
+    """
+    Поиск по таблице Vacancy с keyset-пагинацией.
+    text — полнотекстовый запрос (FTS5); с ним по умолчанию сортируем по релевантности.
+    Возвращает (список вакансий, cursor следующей страницы или None).
+    Cursor хранит значение ключа сортировки и id последней строки, поэтому глубина страницы не влияет на стоимость запроса.
+    """
+    limit = max(1, min(limit, MAX_PER_PAGE))
+    # limit + 1 строка, чтобы понять, есть ли следующая страница, без COUNT(*)
+    rows = list(build_queryset(filters, sort_option, cursor, queryset, text)[:limit + 1])
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.get("sort_key"), last["pk"])
+
+    vacancies = [{field: row[field] for field in RESULT_FIELDS} for row in rows]
+    return vacancies, next_cursor
+
+
+def build_queryset(filters=None, sort_option=None, cursor=None, queryset=None, text=None):
+    """Запрос search_local без LIMIT: фильтры, условие cursor и ORDER BY по ключу сортировки (values с pk, sort_key)."""
+    queryset = filter_queryset(queryset if queryset is not None else Vacancy.objects.all(), filters or {})
+    if text:
+        queryset = fulltext.filter_queryset(queryset, text)
+
+    if text and sort_option in (None, RELEVANCE_SORT):
+        sort_option = RELEVANCE_SORT
+        expression, descending = fulltext.rank_expression(text), False
+    else:
+        if sort_option not in SORT_KEYS:
+            sort_option = DEFAULT_SORT
+        expression, descending = SORT_KEYS[sort_option]
+
+    if expression is not None:
+        queryset = queryset.annotate(sort_key=expression)
+
+    if cursor:
+        sort_value, last_pk = decode_cursor(cursor, sort_option)
+        if expression is None:
+            queryset = queryset.filter(pk__lt=last_pk)
+        # Избыточное sort_key <=/>= значения из cursor — граница диапазона по индексу: без неё SQLite
+        # проверяет условие с OR для каждой строки от начала индекса, и дальние страницы медленнее первых
+        elif descending:
+            queryset = queryset.filter(
+                Q(sort_key__lte=sort_value), Q(sort_key__lt=sort_value) | Q(sort_key=sort_value, pk__lt=last_pk),
+            )
+        else:
+            queryset = queryset.filter(
+                Q(sort_key__gte=sort_value), Q(sort_key__gt=sort_value) | Q(sort_key=sort_value, pk__gt=last_pk),
+            )
+
+    if expression is None:
+        ordering = ["-pk"]
+    elif descending:
+        ordering = ["-sort_key", "-pk"]
+    else:
+        ordering = ["sort_key", "pk"]
+
+    fields = ["pk", *RESULT_FIELDS]
+    if expression is not None:
+        fields.append("sort_key")
+    return queryset.order_by(*ordering).values(*fields)
@@ -0,0 +1,194 @@
+"""
+Метрики этапов обработки запроса в памяти процесса и их вывод в формате Prometheus (GET /metrics).
+
+    with stage("json_decode"):
+        data = fastjson.loads(response.content)
+
+Время этапа попадает в гистограмму hh_stage_seconds{stage="json_decode"} и, если этап выполняется внутри
+HTTP-запроса (RequestMetricsMiddleware), — в разбивку этого запроса для лога медленных запросов.
+"""
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+
+# Значения по умолчанию; переопределяются через settings.HH_METRICS
+DEFAULT_METRICS_SETTINGS = {
+    "SLOW_REQUEST_MS": 1000,   # запросы дольше этого пишутся в лог с разбивкой по этапам
+    "PROFILE": False,          # профилировать каждый запрос (только для отладки)
+    "PROFILE_HEADER": False,   # разрешить профилирование отдельного запроса заголовком X-Profile: 1
+    "PROFILE_DIR": "profiles", # куда сохранять .prof (открываются snakeviz или python -m pstats)
+}
+
+# Границы корзин гистограмм, секунды
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def get_metrics_settings():
+    from django.conf import settings
+
+    config = dict(DEFAULT_METRICS_SETTINGS)
+    config.update(getattr(settings, "HH_METRICS", {}) or {})
+    return config
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    pairs = [*zip(labelnames, labelvalues), *extra]
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Счётчик с метками."""
+
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram:
+    """Гистограмма с фиксированными корзинами и метками (как prometheus_client.Histogram)."""
+
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # метки -> [счётчики по корзинам (последняя — +Inf), сумма]
+        self._series = {}
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: (list(counts), total) for labels, (counts, total) in self._series.items()}
+        for labelvalues, (counts, total) in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = (("le", bound if bound == "+Inf" else repr(float(bound))),)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, *args, **kwargs):
+        return self.register(Counter(*args, **kwargs))
+
+    def histogram(self, *args, **kwargs):
+        return self.register(Histogram(*args, **kwargs))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram(
+    "hh_stage_seconds", "Время этапа обработки (запрос к HH.ru, разбор JSON, маппинг, кодирование ответа, запись в БД)",
+    ("stage",),
+)
+REQUEST_SECONDS = registry.histogram(
+    "http_request_seconds", "Время обработки HTTP-запроса", ("view", "method", "status"),
+)
+SLOW_REQUESTS = registry.counter(
+    "http_slow_requests_total", "Запросы дольше HH_METRICS['SLOW_REQUEST_MS']", ("view",),
+)
+
+# Разбивка текущего HTTP-запроса по этапам: {этап: секунды}; None вне запроса
+_trace = contextvars.ContextVar("metrics_trace", default=None)
+
+
+def observe_stage(name, seconds):
+    STAGE_SECONDS.observe(seconds, name)
+    trace = _trace.get()
+    if trace is not None:
+        trace[name] = trace.get(name, 0.0) + seconds
+
+
+@contextlib.contextmanager
+def stage(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(name, time.perf_counter() - started)
+
+
+def start_trace():
+    """Начинает разбивку по этапам для текущего запроса. Возвращает (token для end_trace, dict этапов)."""
+    trace = {}
+    return _trace.set(trace), trace
+
+
+def end_trace(token):
+    _trace.reset(token)
+
+
+@contextlib.contextmanager
+def use_trace(trace):
+    """Продолжает разбивку trace из start_trace — для тела потокового ответа, которое отдаётся уже после view."""
+    token = _trace.set(trace)
+    try:
+        yield
+    finally:
+        _trace.reset(token)
+
+
+def render_snapshot(prefix, snapshot):
+    """Счётчики из *_stats.snapshot() (dict чисел) в строки Prometheus-формата с типом gauge."""
+    lines = []
+    for key, value in snapshot.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        name = f"{prefix}_{key}"
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_format_value(value)}")
+    return lines
@@ -0,0 +1,115 @@
+"""
+Постраничный просмотр результатов поиска для интерактивной команды.
+
+    pager = SearchPager("python", filters, sort_option, screen_size=10)
+    screen = pager.next_screen()   # первый экран — после одного запроса на screen_size вакансий
+
+Страницы источников загружаются по требованию (search_sources, по странице за раз), а пока пользователь читает
+экран, фоновый поток заранее догружает страницы, пока в запасе не наберётся следующий экран. Фильтры применяются
+к каждой странице по мере загрузки, повторы отбрасываются по всем уже загруженным страницам. Сортировка, которую
+выполняет HH.ru (по зарплате), — по всей выдаче; локальная (по названию, по компании) — в пределах загруженного,
+но ещё не показанного.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from parserapp.services.filters import DEFAULT_SORT, sort_vacancies
+from parserapp.services.metrics import observe_stage
+from parserapp.services.sources import dedup_keys, get_sources, search_sources
+
+
+DEFAULT_SCREEN_SIZE = 10
+
+
+class SearchPager:
+    """
+    Ленивый итератор экранов. next_screen() отдаёт следующие screen_size вакансий (меньше — в конце выдачи,
+    пустой список — выдача закончилась). Не потокобезопасен: экраны запрашивает один поток.
+    """
+
+    def __init__(self, query, filters=None, sort_option=DEFAULT_SORT, screen_size=DEFAULT_SCREEN_SIZE, page=0,
+                 sources=None, prefetch=True):
+        self.query = query
+        self.filters = filters or {}
+        self.sort_option = sort_option
+        self.screen_size = screen_size
+        self.prefetch = prefetch
+        # Источники, у которых ещё есть страницы
+        self._active = get_sources() if sources is None else list(sources)
+        self._page = page
+        self._buffer = []  # загружено, но ещё не показано
+        self._seen = set()
+        self._future = None
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pager") if prefetch else None
+        self.shown = []
+        self.pages_loaded = 0
+        self.warnings = []
+
+    @property
+    def exhausted(self):
+        """Все страницы загружены и все вакансии показаны."""
+        return not self._active and not self._buffer
+
+    def next_screen(self):
+        started = time.perf_counter()
+        if self._future is not None:
+            # Догрузка в фоне уже идёт: дожидаемся её, а не запрашиваем те же страницы ещё раз
+            future, self._future = self._future, None
+            future.result()
+        self._fill(self.screen_size)
+        observe_stage("pager_wait", time.perf_counter() - started)
+
+        screen, self._buffer = self._buffer[:self.screen_size], self._buffer[self.screen_size:]
+        self.shown.extend(screen)
+        if self._executor is not None and self._active and len(self._buffer) < self.screen_size:
+            self._future = self._executor.submit(self._fill, self.screen_size)
+        return screen
+
+    def close(self):
+        # Фоновая догрузка заканчивает текущую страницу и дальше не идёт
+        self._closed = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _fill(self, target):
+        """Загружает страницы, пока в буфере меньше target вакансий и у источников есть страницы."""
+        while len(self._buffer) < target and self._active and not self._closed:
+            self._load_page()
+
+    def _load_page(self):
+        result = search_sources(
+            self.query, page=self._page, per_page=self.screen_size, filters=self.filters,
+            sort_option=self.sort_option, sources=self._active,
+        )
+        self._page += 1
+        self.pages_loaded += 1
+
+        fresh = []
+        for vacancy in result.vacancies:
+            keys = dedup_keys(vacancy)
+            if any(key in self._seen for key in keys):
+                continue
+            self._seen.update(keys)
+            fresh.append(vacancy)
+        # Буфер уже отсортирован, sorted по почти упорядоченному списку — почти линейный проход
+        self._buffer = sort_vacancies(self._buffer + fresh, self.sort_option)
+
+        statuses = {status.name: status for status in result.sources}
+        for adapter in list(self._active):
+            status = statuses[adapter.name]
+            if status.status == "ok" and not status.last:
+                continue
+            if status.status != "ok":
+                # Повтор той же страницы у источника, который не ответил, задержал бы весь просмотр
+                self.warnings.append(
+                    f'{adapter.name}: {"не ответил вовремя" if status.status == "timeout" else status.error}'
+                    f' (страница {self._page}), источник отключён до конца просмотра'
+                )
+            self._active.remove(adapter)
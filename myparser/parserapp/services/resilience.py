@@ -0,0 +1,245 @@
+import random
+import threading
+import time
+
+
+# Значения по умолчанию; переопределяются через settings.HH_RESILIENCE
+DEFAULT_RESILIENCE_SETTINGS = {
+    "RATE": 10.0,              # стартовая скорость, запросов в секунду
+    "MIN_RATE": 0.5,           # ниже этой скорости после 429 не опускаемся
+    "MAX_RATE": 20.0,          # выше этой скорости не разгоняемся
+    "BURST": 10,               # ёмкость ведра токенов
+    "RATE_INCREASE": 0.5,      # прибавка к скорости после каждого успешного ответа (AIMD)
+    "MAX_CONCURRENCY": 16,     # одновременных запросов к HH.ru на процесс
+    "MIN_CONCURRENCY": 1,
+    "RETRIES": 3,              # повторов для 429/5xx/таймаутов
+    "BACKOFF_BASE": 0.5,       # секунд, база экспоненциальной задержки
+    "BACKOFF_CAP": 10.0,       # максимум одной задержки
+    "FAILURE_THRESHOLD": 5,    # подряд неудачных запросов до размыкания предохранителя
+    "RESET_TIMEOUT": 30.0,     # секунд предохранитель разомкнут до пробного запроса
+}
+
+# Ответы, после которых имеет смысл повторить запрос
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def get_resilience_settings():
+    from django.conf import settings
+
+    config = dict(DEFAULT_RESILIENCE_SETTINGS)
+    config.update(getattr(settings, "HH_RESILIENCE", {}) or {})
+    return config
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket + ограничение одновременных запросов, общие для потоков и asyncio-задач.
+
+    Скорость и окно одновременных запросов подстраиваются по AIMD: после 429 делятся пополам
+    (и на время Retry-After запросы не выпускаются совсем), после успешных ответов растут понемногу.
+    Синхронный код ждёт через time.sleep, асинхронный — через asyncio.sleep; состояние общее, под threading.Lock.
+    """
+
+    def __init__(self, rate, burst, min_rate, max_rate, rate_increase, max_concurrency, min_concurrency=1):
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_increase = rate_increase
+        self.concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self.throttled = 0
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Берёт токен и слот. Возвращает 0, если получилось, иначе — сколько секунд подождать."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+            self._refill(now)
+            if self._in_flight >= self.concurrency:
+                return 0.01
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+            self._in_flight += 1
+            return 0
+
+    def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        import asyncio
+
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self):
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.rate_increase)
+            if self.rate >= self.max_rate / 2:
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def on_throttle(self, retry_after=None):
+        with self._lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            self._tokens = 0
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "rate": round(self.rate, 2),
+                "concurrency": self.concurrency,
+                "in_flight": self._in_flight,
+                "throttled": self.throttled,
+            }
+
+
+class CircuitBreaker:
+    """
+    Предохранитель: после FAILURE_THRESHOLD неудач подряд запросы к HH.ru не выполняются RESET_TIMEOUT секунд,
+    затем пропускается один пробный запрос (half-open): успех замыкает цепь, неудача размыкает снова.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    # allow() для пробного запроса: истинно, как True, но release() по нему освобождает место пробного
+    TRIAL = "trial"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self._lock = threading.Lock()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    def allow(self):
+        """
+        False — запрос не выполнять; иначе True или TRIAL (пробный запрос в half-open).
+        Результат передаётся в release() после запроса, в finally.
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return self.TRIAL
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def release(self, permit):
+        """
+        Завершение запроса, пропущенного allow(). Если пробный запрос прервался исключением, не вызвав
+        ни record_success, ни record_failure, освобождает место пробного — иначе half-open отклонял бы всё.
+        """
+        if permit != self.TRIAL:
+            return
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "rejected": self.rejected}
+
+
+def backoff_delay(attempt, base, cap):
+    """Экспоненциальная задержка с полным джиттером: случайное значение в [0, min(cap, base * 2^attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def parse_retry_after(value):
+    """Retry-After в секундах (формат HTTP-даты HH.ru не использует)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_limiter = None
+_breaker = None
+_lock = threading.Lock()
+
+
+def get_limiter():
+    """Общий на процесс ограничитель скорости запросов к HH.ru."""
+    global _limiter
+    if _limiter is None:
+        with _lock:
+            if _limiter is None:
+                config = get_resilience_settings()
+                _limiter = AdaptiveRateLimiter(
+                    rate=config["RATE"],
+                    burst=config["BURST"],
+                    min_rate=config["MIN_RATE"],
+                    max_rate=config["MAX_RATE"],
+                    rate_increase=config["RATE_INCREASE"],
+                    max_concurrency=config["MAX_CONCURRENCY"],
+                    min_concurrency=config["MIN_CONCURRENCY"],
+                )
+    return _limiter
+
+
+def get_breaker():
+    """Общий на процесс предохранитель для HH.ru."""
+    global _breaker
+    if _breaker is None:
+        with _lock:
+            if _breaker is None:
+                config = get_resilience_settings()
+                _breaker = CircuitBreaker(config["FAILURE_THRESHOLD"], config["RESET_TIMEOUT"])
+    return _breaker
+
+
+def reset_resilience():
+    """Сбрасывает общие ограничитель и предохранитель: следующие get_limiter/get_breaker перечитают настройки."""
+    global _limiter, _breaker
+    with _lock:
+        _limiter = None
+        _breaker = None
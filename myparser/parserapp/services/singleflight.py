@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import weakref
+
+
+class FlightStats:
+    """Потокобезопасные счётчики объединения одинаковых запросов."""
+
+    FIELDS = ("leaders", "coalesced")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, field):
+        with self._lock:
+            self._counters[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self):
+        with self._lock:
+            self._counters = {field: 0 for field in self.FIELDS}
+
+
+flight_stats = FlightStats()
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вызовов для потоков (WSGI).
+
+    Первый вызов с ключом (leader) выполняет fn, остальные с тем же ключом ждут его и получают
+    тот же результат или то же исключение. Результат не запоминается: следующий вызов после
+    завершения leader'а снова выполнит fn.
+    """
+
+    def __init__(self, stats=None):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.stats = stats or flight_stats
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self.stats.incr("coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self.stats.incr("leaders")
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    То же для asyncio: fn(*args, **kwargs) — корутина, она запускается задачей, остальные вызовы ждут её.
+    Задача защищена asyncio.shield: отмена одного ожидающего (например, клиент закрыл соединение)
+    не отменяет запрос для остальных. Задачи хранятся отдельно для каждого event loop.
+    """
+
+    def __init__(self, stats=None):
+        self._tasks = weakref.WeakKeyDictionary()
+        self.stats = stats or flight_stats
+
+    async def do(self, key, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+        task = tasks.get(key)
+        if task is None:
+            self.stats.incr("leaders")
+            task = tasks[key] = loop.create_task(fn(*args, **kwargs))
+
+            def forget(finished):
+                if tasks.get(key) is finished:
+                    del tasks[key]
+
+            task.add_done_callback(forget)
+        else:
+            self.stats.incr("coalesced")
+        return await asyncio.shield(task)
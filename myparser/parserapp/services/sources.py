@@ -0,0 +1,282 @@
+"""
+Источники вакансий (job boards) и параллельный поиск по всем сразу.
+
+Источник — объект с атрибутами name и timeout и методом search(query, page, per_page, filters, sort_option),
+который возвращает уже отфильтрованные вакансии (dict/VacancyRecord с полем source) — списком или SourcePage,
+если источник знает, что страница последняя. Первый источник — HH.ru
+(HHSource поверх HHParser с кэшем). Источники задаются в settings.HH_SOURCES или регистрируются register_source.
+
+search_sources опрашивает все включённые источники параллельно, каждый со своим таймаутом: общее время —
+время самого медленного из уложившихся в таймаут, а не сумма. Источник, не ответивший вовремя, пропускается
+(результат помечается partial), его запрос доделывается в фоне.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from django.utils.module_loading import import_string
+
+from parserapp.services.filters import DEFAULT_SORT, apply_filters, build_hh_params, sort_vacancies
+from parserapp.services.metrics import observe_stage, stage
+
+
+# Значения по умолчанию; переопределяются через settings.HH_SOURCES
+DEFAULT_SOURCES = {
+    "HH.ru": {
+        "ADAPTER": "parserapp.services.sources.HHSource",
+        "ENABLED": True,
+        "TIMEOUT": 10.0,  # секунд на ответ источника (с учётом повторов внутри него)
+        "OPTIONS": {},    # аргументы конструктора адаптера
+    },
+}
+# Потоков для запросов к источникам (общий пул процесса; запрос, вышедший за таймаут, занимает поток до конца)
+SOURCE_WORKERS = 16
+
+
+class SourceAdapter:
+    """
+    Базовый класс источника. Подкласс задаёт name и реализует search; timeout можно переопределить
+    в настройках источника. Фильтры (dict из parse_filters) источник применяет сам: что умеет — на своей
+    стороне, остальное — через apply_filters. Источник, который не смог ответить, бросает исключение
+    (пустой список — это пустая выдача): в результате он получает статус error.
+    """
+
+    name = ""
+    timeout = 10.0
+
+    def search(self, query, page=0, per_page=20, filters=None, sort_option=DEFAULT_SORT):
+        raise NotImplementedError
+
+
+class SourcePage(list):
+    """
+    Страница вакансий источника. last — дальше страниц нет; для обычного списка это определяется по пустой
+    странице, но после локальных фильтров пустой может оказаться и страница из середины выдачи.
+    """
+
+    def __init__(self, vacancies=(), last=False):
+        super().__init__(vacancies)
+        self.last = last
+
+
+class HHSource(SourceAdapter):
+    """
+    HH.ru: фильтры, которые HH.ru выполняет сам, уходят в параметры запроса, остальные применяются локально.
+    Если HH.ru не ответил и в кэше нет даже устаревшей страницы, парсер бросает HHUnavailable.
+    """
+
+    name = "HH.ru"
+
+    def __init__(self, parser=None):
+        self._parser = parser
+
+    @property
+    def parser(self):
+        if self._parser is None:
+            from parserapp.services.cache import get_cached_parser
+
+            self._parser = get_cached_parser()
+        return self._parser
+
+    def search(self, query, page=0, per_page=20, filters=None, sort_option=DEFAULT_SORT):
+        from parserapp.services.crawler import HH_MAX_DEPTH
+
+        hh_params, local_filters = build_hh_params(filters or {}, sort_option)
+        vacancies = self.parser.get_vacancies(query, page=page, per_page=per_page, **hh_params)
+        # Неполная страница — последняя; так же, если следующая уже за пределом глубины выдачи HH.ru (как в count_pages)
+        last = len(vacancies) < per_page or (page + 2) * per_page > HH_MAX_DEPTH
+        return SourcePage(apply_filters(vacancies, local_filters), last=last)
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+_configured = False
+_executor = None
+
+
+def get_sources_settings():
+    from django.conf import settings
+
+    config = {name: dict(options) for name, options in DEFAULT_SOURCES.items()}
+    for name, options in (getattr(settings, "HH_SOURCES", {}) or {}).items():
+        config.setdefault(name, {"ENABLED": True, "TIMEOUT": SourceAdapter.timeout, "OPTIONS": {}}).update(options)
+    return config
+
+
+def register_source(adapter, timeout=None):
+    """Регистрирует экземпляр источника (заменяет источник с тем же name)."""
+    if timeout is not None:
+        adapter.timeout = timeout
+    with _registry_lock:
+        _registry[adapter.name] = adapter
+    return adapter
+
+
+def unregister_source(name):
+    with _registry_lock:
+        return _registry.pop(name, None)
+
+
+def _configure():
+    global _configured
+    with _registry_lock:
+        if _configured:
+            return
+        for name, options in get_sources_settings().items():
+            if not options.get("ENABLED", True) or name in _registry:
+                continue
+            adapter = import_string(options["ADAPTER"])(**options.get("OPTIONS", {}))
+            adapter.name = name
+            adapter.timeout = options.get("TIMEOUT", adapter.timeout)
+            _registry[name] = adapter
+        _configured = True
+
+
+def get_sources():
+    """Включённые источники в порядке регистрации (он же — приоритет при дедупликации)."""
+    _configure()
+    with _registry_lock:
+        return list(_registry.values())
+
+
+def reset_sources():
+    """Сбрасывает реестр: при следующем get_sources источники снова создаются из настроек."""
+    global _configured
+    with _registry_lock:
+        _registry.clear()
+        _configured = False
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _registry_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SOURCE_WORKERS, thread_name_prefix="sources")
+    return _executor
+
+
+@dataclass
+class SourceResult:
+    name: str
+    status: str = "ok"  # ok | timeout | error
+    count: int = 0
+    latency_ms: float = 0.0
+    error: str = ""
+    last: bool = False  # у источника больше нет страниц
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "status": self.status,
+            "count": self.count,
+            "latency_ms": self.latency_ms,
+            "error": self.error,
+        }
+
+
+@dataclass
+class MultiSearchResult:
+    vacancies: list = field(default_factory=list)
+    sources: list = field(default_factory=list)
+
+    @property
+    def partial(self):
+        """Хотя бы один источник не ответил (таймаут или ошибка)."""
+        return any(source.status != "ok" for source in self.sources)
+
+
+def _timed_search(adapter, args):
+    started = time.perf_counter()
+    vacancies = adapter.search(*args)
+    last = getattr(vacancies, "last", not vacancies)
+    return list(vacancies or []), last, time.perf_counter() - started
+
+
+def iter_sources(query, page=0, per_page=20, filters=None, sort_option=DEFAULT_SORT, sources=None):
+    """
+    Запускает поиск во всех источниках параллельно и генерирует (SourceResult, vacancies) по мере готовности.
+    Источник, не уложившийся в свой timeout, отдаётся со статусом timeout и пустым списком.
+    """
+    sources = get_sources() if sources is None else list(sources)
+    args = (query, page, per_page, filters or {}, sort_option)
+    started = time.monotonic()
+    executor = _get_executor()
+    # Контекст вызывающего — в поток: этапы источника (hh_request, json_decode, map) попадают в разбивку запроса
+    pending = {
+        executor.submit(contextvars.copy_context().run, _timed_search, adapter, args): adapter for adapter in sources
+    }
+
+    while pending:
+        deadline = min(started + adapter.timeout for adapter in pending.values())
+        done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        for future in done:
+            adapter = pending.pop(future)
+            try:
+                vacancies, last, elapsed = future.result()
+            except Exception as e:
+                yield SourceResult(
+                    adapter.name, "error", latency_ms=round((time.monotonic() - started) * 1000, 1), error=str(e),
+                ), []
+                continue
+            observe_stage(f"source:{adapter.name}", elapsed)
+            yield SourceResult(adapter.name, "ok", len(vacancies), round(elapsed * 1000, 1), last=last), vacancies
+
+        now = time.monotonic()
+        for future, adapter in list(pending.items()):
+            if now >= started + adapter.timeout:
+                del pending[future]
+                future.cancel()
+                yield SourceResult(adapter.name, "timeout", latency_ms=round(adapter.timeout * 1000, 1)), []
+
+
+def _normalize_url(url):
+    parts = urlsplit(url.strip())
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/')}"
+
+
+def dedup_keys(vacancy):
+    """
+    Ключи, по которым вакансии считаются одной: ссылка (без query и завершающего /) и
+    название + компания + город без учёта регистра — одна вакансия на двух площадках.
+    """
+    keys = []
+    url = vacancy.get("url")
+    if url:
+        keys.append(("url", _normalize_url(url)))
+    title = (vacancy.get("title") or "").strip().casefold()
+    company = (vacancy.get("company_name") or "").strip().casefold()
+    if title and company:
+        keys.append(("content", title, company, (vacancy.get("location") or "").strip().casefold()))
+    return keys
+
+
+def merge_results(streams):
+    """Объединяет списки вакансий в порядке приоритета источников, пропуская повторы (dedup_keys)."""
+    seen = set()
+    merged = []
+    for vacancies in streams:
+        for vacancy in vacancies:
+            keys = dedup_keys(vacancy)
+            if any(key in seen for key in keys):
+                continue
+            seen.update(keys)
+            merged.append(vacancy)
+    return merged
+
+
+def search_sources(query, page=0, per_page=20, filters=None, sort_option=DEFAULT_SORT, sources=None):
+    """Поиск во всех источниках: объединённые без повторов и отсортированные вакансии и статусы источников."""
+    sources = get_sources() if sources is None else list(sources)
+    by_source = {}
+    statuses = {}
+    for status, vacancies in iter_sources(query, page, per_page, filters, sort_option, sources):
+        statuses[status.name] = status
+        by_source[status.name] = vacancies
+    order = [adapter.name for adapter in sources]
+    with stage("filter_sort"):
+        vacancies = sort_vacancies(merge_results(by_source[name] for name in order), sort_option)
+    return MultiSearchResult(vacancies=vacancies, sources=[statuses[name] for name in order])
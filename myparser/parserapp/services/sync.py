@@ -0,0 +1,126 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from parserapp.services.crawler import HH_MAX_DEPTH, HH_MAX_PER_PAGE, count_pages, crawl_pages
+from parserapp.services.hh_parser import get_default_parser
+from parserapp.services.ingest import IngestReport, VacancyIngestor
+
+
+DEFAULT_INITIAL_DAYS = 30
+# Окно короче этого не дробим, даже если в нём больше HH_MAX_DEPTH вакансий
+MIN_WINDOW = timedelta(minutes=1)
+
+logger = logging.getLogger(__name__)
+
+
+def get_initial_days():
+    from django.conf import settings
+
+    return getattr(settings, "HH_SYNC_INITIAL_DAYS", DEFAULT_INITIAL_DAYS)
+
+
+@dataclass
+class SyncResult:
+    query: str
+    fetched: int = 0
+    windows: int = 0
+    complete: bool = True
+    report: IngestReport = field(default_factory=IngestReport)
+
+
+def _format_date(value):
+    return value.isoformat(timespec="seconds")
+
+
+class _WindowSync:
+    """Загружает вакансии, опубликованные в [date_from, date_to], и передаёт их в ingestor."""
+
+    def __init__(self, sync, parser, ingestor, result):
+        self.sync = sync
+        self.parser = parser
+        self.ingestor = ingestor
+        self.result = result
+        self.max_posted_at = None
+
+    def run(self, date_from, date_to):
+        params = {
+            **(self.sync.params or {}),
+            "date_from": _format_date(date_from),
+            "date_to": _format_date(date_to),
+            "order_by": "publication_time",
+        }
+        first_page = self.parser.fetch_page(self.sync.query, page=0, per_page=HH_MAX_PER_PAGE, **params)
+        if first_page is None:
+            self.result.complete = False
+            return
+
+        found = first_page.get("found") or 0
+        if found > HH_MAX_DEPTH and date_to - date_from > MIN_WINDOW:
+            # HH не отдаст больше HH_MAX_DEPTH вакансий — делим окно пополам, пока каждое не уместится
+            middle = date_from + (date_to - date_from) / 2
+            self.run(date_from, middle)
+            self.run(middle, date_to)
+            return
+
+        self.result.windows += 1
+        if found > HH_MAX_DEPTH:
+            # Окно уже не дробится, а HH.ru отдаст только первые HH_MAX_DEPTH: остальные не загрузятся,
+            # поэтому watermark не двигаем
+            self.result.complete = False
+            logger.warning("Окно синхронизации не умещается в лимит выдачи HH.ru", extra={
+                "query": self.sync.query,
+                "date_from": params["date_from"],
+                "date_to": params["date_to"],
+                "found": found,
+            })
+        expected = min(found, HH_MAX_DEPTH)
+        fetched = 0
+        for _, vacancies in crawl_pages(
+            self.sync.query,
+            per_page=HH_MAX_PER_PAGE,
+            parser=self.parser,
+            first_page=first_page,
+            **params,
+        ):
+            fetched += len(vacancies)
+            self._track_watermark(vacancies)
+            self.ingestor.add(vacancies)
+        self.result.fetched += fetched
+        if fetched < expected and count_pages(first_page, HH_MAX_PER_PAGE) > 1:
+            # Часть страниц не загрузилась — не двигаем watermark, чтобы не потерять вакансии
+            self.result.complete = False
+
+    def _track_watermark(self, vacancies):
+        for vacancy in vacancies:
+            posted_at = vacancy.get("posted_at")
+            if isinstance(posted_at, str):
+                posted_at = parse_datetime(posted_at)
+            if posted_at and (self.max_posted_at is None or posted_at > self.max_posted_at):
+                self.max_posted_at = posted_at
+
+
+def sync_search(sync, parser=None, now=None):
+    """
+    Догружает вакансии по отслеживаемому запросу SearchSync, опубликованные после его watermark,
+    используя фильтр HH.ru date_from/date_to. Стоимость пропорциональна числу новых вакансий.
+    """
+    parser = parser or get_default_parser()
+    now = now or timezone.now()
+    date_from = sync.watermark or now - timedelta(days=get_initial_days())
+
+    result = SyncResult(query=sync.query)
+    ingestor = VacancyIngestor()
+    window = _WindowSync(sync, parser, ingestor, result)
+    window.run(date_from, now)
+    result.report = ingestor.flush()
+
+    if result.complete and window.max_posted_at is not None:
+        sync.watermark = max(window.max_posted_at, sync.watermark) if sync.watermark else window.max_posted_at
+    sync.last_synced_at = now
+    sync.last_fetched = result.fetched
+    sync.save(update_fields=["watermark", "last_synced_at", "last_fetched"])
+    return result
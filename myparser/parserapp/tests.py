@@ -1,3 +1,1508 @@
-from django.test import TestCase
+import asyncio
+import contextlib
+import csv
+import gzip
+import importlib
+import io
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from parserapp import cli
+from parserapp.middleware import RequestMetricsMiddleware
+from parserapp.models import ExchangeRate, ScheduledJob, SearchSync, Vacancy, VacancyDetail
+from parserapp.serializers import VACANCY_FIELDS, vacancy_from_hh
+
+from parserapp.benchmarks.fake_hh import FakeHHServer
+from parserapp.services.cache import CacheStats, CachedHHParser, make_cache_key
+from parserapp.services.crawler import count_pages
+from parserapp.services.currency import invalidate_rates, recompute_salaries, save_rates
+from parserapp.services.db_writer import DatabaseWriter, WriterStats
+from parserapp.services.details import _store
+from parserapp.services.jobs import claim_job, complete_job, extend_leases, fail_job
+from parserapp.services.metrics import end_trace, observe_stage, stage, start_trace
+from parserapp.services import fulltext
+from parserapp.services.filters import apply_filters, build_hh_params, parse_filters, sort_vacancies
+from parserapp.services.hh_parser import HHParser, HHUnavailable
+from parserapp.services.http_client import close_pool, get_session, pool_stats
+from parserapp.services.export import EXPORT_FIELDS, export_vacancies
+from parserapp.services.ingest import ingest_vacancies
+from parserapp.services.local_search import build_queryset, encode_cursor, search_local
+from parserapp.services.pager import SearchPager
+from parserapp.services.resilience import AdaptiveRateLimiter, CircuitBreaker, get_breaker, reset_resilience
+from parserapp.services.sync import sync_search
+from parserapp.services.singleflight import AsyncSingleFlight, FlightStats, SingleFlight
+from parserapp.services.sources import (
+    HHSource,
+    SourceAdapter,
+    SourcePage,
+    get_sources,
+    merge_results,
+    register_source,
+    reset_sources,
+    search_sources,
+    unregister_source,
+)
+from parserapp.utilis.logger import AsyncQueueHandler, JsonFormatter, KeyValueFormatter, SamplingFilter
+
+
+def make_vacancy(source, external_id, title="Python-разработчик", company="Рога и копыта", location="Москва",
+                 work_mode="remote", url=None):
+    return {
+        "title": title,
+        "company_name": company,
+        "location": location,
+        "work_mode": work_mode,
+        "external_id": external_id,
+        "url": url or f"https://{source.lower()}.example/vacancy/{external_id}",
+        "source": source,
+    }
+
+
+class FakeSource(SourceAdapter):
+    """Источник без сети: отдаёт заданные вакансии через delay секунд или бросает error."""
+
+    def __init__(self, name="Fake", vacancies=(), delay=0.0, error=None, timeout=1.0):
+        self.name = name
+        self.vacancies = list(vacancies)
+        self.delay = delay
+        self.error = error
+        self.timeout = timeout
+        self.calls = []
+
+    def search(self, query, page=0, per_page=20, filters=None, sort_option="5"):
+        self.calls.append((query, page, per_page, filters, sort_option))
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return [v for v in self.vacancies if not filters.get("work_mode") or v["work_mode"] == filters["work_mode"]]
+
+
+class StagedSource(FakeSource):
+    """Источник, который, как HHSource, отмечает этапы в метриках."""
+
+    def search(self, query, page=0, per_page=20, filters=None, sort_option="5"):
+        observe_stage("hh_request", 0.01)
+        observe_stage("json_decode", 0.002)
+        return super().search(query, page, per_page, filters, sort_option)
+
+
+class PagedSource(FakeSource):
+    """Выдача из заданных вакансий по per_page на страницу."""
+
+    def search(self, query, page=0, per_page=20, filters=None, sort_option="5"):
+        self.calls.append(page)
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        chunk = self.vacancies[page * per_page:(page + 1) * per_page]
+        return SourcePage(
+            [v for v in chunk if not filters.get("work_mode") or v["work_mode"] == filters["work_mode"]],
+            last=(page + 1) * per_page >= len(self.vacancies),
+        )
+
+
+class FailingParser:
+    """HHParser, у которого HH.ru не отвечает: fetch_page возвращает None, как после исчерпанных повторов."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def fetch_page(self, query, page=0, per_page=20, **params):
+        self.calls += 1
+        return None
+
+    def parse_response(self, data):
+        return [vacancy_from_hh(item) for item in data["items"]]
+
+
+def make_vacancies(source, count, **kwargs):
+    return [make_vacancy(source, str(i), company=f"Компания {i}", **kwargs) for i in range(count)]
+
+
+class VacancyRecordTests(SimpleTestCase):
+    def setUp(self):
+        self.record = vacancy_from_hh({
+            "id": "42", "name": "Python-разработчик", "alternate_url": "https://hh.ru/vacancy/42",
+            "employer": {"name": "Яндекс"}, "area": {"name": "Москва"}, "schedule": {"id": "remote"},
+            "salary": {"from": 200000, "to": None, "currency": "RUR"}, "snippet": {"responsibility": "Писать код"},
+            "published_at": "2026-10-01T10:00:00+0300",
+        })
+
+    def test_reads_like_dict(self):
+        self.assertEqual(dict(self.record), self.record.as_dict())
+        self.assertEqual(list(self.record.keys()), list(VACANCY_FIELDS))
+        self.assertEqual(self.record["title"], "Python-разработчик")
+        self.assertEqual(self.record.get("company_name"), "Яндекс")
+        self.assertEqual(
+            (self.record["salary_from"], self.record["salary_to"], self.record["work_mode"], self.record["source"]),
+            (200000, None, "remote", "HH.ru"),
+        )
+
+    def test_only_fields_are_keys(self):
+        for key in ("get", "keys", "as_dict", "__class__", "missing"):
+            self.assertEqual(self.record.get(key, "default"), "default")
+            with self.assertRaises(KeyError):
+                self.record[key]
+        with self.assertRaises(KeyError):
+            self.record["keys"] = "x"
+
+    def test_setitem_updates_field(self):
+        self.record["salary_from"] = 150000
+
+        self.assertEqual(self.record.salary_from, 150000)
+
+
+class SearchSourcesTests(SimpleTestCase):
+    def test_sources_are_queried_in_parallel(self):
+        first = FakeSource("A", [make_vacancy("A", "1", company="Альфа")], delay=0.3)
+        second = FakeSource("B", [make_vacancy("B", "2", company="Бета")], delay=0.3)
+
+        started = time.monotonic()
+        result = search_sources("python", sources=[first, second])
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual([v["external_id"] for v in result.vacancies], ["1", "2"])
+        self.assertEqual([s.status for s in result.sources], ["ok", "ok"])
+        self.assertFalse(result.partial)
+
+    def test_slow_source_is_skipped_after_its_timeout(self):
+        fast = FakeSource("Fast", [make_vacancy("Fast", "1")], timeout=1.0)
+        slow = FakeSource("Slow", [make_vacancy("Slow", "2", company="Другая")], delay=1.0, timeout=0.1)
+
+        started = time.monotonic()
+        result = search_sources("python", sources=[fast, slow])
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 0.5)
+        self.assertTrue(result.partial)
+        self.assertEqual([v["source"] for v in result.vacancies], ["Fast"])
+        self.assertEqual({s.name: s.status for s in result.sources}, {"Fast": "ok", "Slow": "timeout"})
+
+    def test_failing_source_does_not_break_search(self):
+        ok = FakeSource("Ok", [make_vacancy("Ok", "1")])
+        broken = FakeSource("Broken", error=RuntimeError("boom"))
+
+        result = search_sources("python", sources=[broken, ok])
+
+        self.assertEqual([v["source"] for v in result.vacancies], ["Ok"])
+        self.assertEqual(result.sources[0].status, "error")
+        self.assertEqual(result.sources[0].error, "boom")
+
+    def test_duplicates_are_merged_by_source_priority(self):
+        primary = FakeSource("Primary", [
+            make_vacancy("Primary", "1", url="https://jobs.example/vacancy/1"),
+            make_vacancy("Primary", "2", title="Go-разработчик"),
+        ])
+        secondary = FakeSource("Secondary", [
+            # та же ссылка, но с query и завершающим /
+            make_vacancy("Secondary", "x1", title="Другое название", url="https://JOBS.example/vacancy/1/?utm=1"),
+            # та же вакансия на другой площадке: название, компания и город совпадают
+            make_vacancy("Secondary", "x2", title="go-разработчик "),
+            make_vacancy("Secondary", "x3", title="Java-разработчик"),
+        ])
+
+        result = search_sources("python", sources=[primary, secondary])
+
+        self.assertEqual([v["external_id"] for v in result.vacancies], ["1", "2", "x3"])
+
+    def test_filters_are_passed_to_sources_and_sort_applies_to_merged_results(self):
+        first = FakeSource("A", [
+            make_vacancy("A", "1", company="Яндекс"),
+            make_vacancy("A", "2", company="Офис", work_mode="office"),
+        ])
+        second = FakeSource("B", [make_vacancy("B", "3", company="Авито")])
+
+        result = search_sources("python", page=2, per_page=50, filters={"work_mode": "remote"}, sort_option="3",
+                                sources=[first, second])
+
+        self.assertEqual([v["company_name"] for v in result.vacancies], ["Авито", "Яндекс"])
+        self.assertEqual(first.calls, [("python", 2, 50, {"work_mode": "remote"}, "3")])
+
+    def test_source_stages_reach_request_trace(self):
+        token, trace = start_trace()
+        try:
+            search_sources("python", sources=[StagedSource("A", [make_vacancy("A", "1")])])
+        finally:
+            end_trace(token)
+
+        self.assertEqual(trace["hh_request"], 0.01)
+        self.assertEqual(trace["json_decode"], 0.002)
+        self.assertIn("source:A", trace)
+        self.assertIn("filter_sort", trace)
+
+    def test_hh_failure_without_cached_page_is_reported(self):
+        source = HHSource(parser=CachedHHParser(parser=FailingParser(), cache_alias="default"))
+
+        result = search_sources("hh-down", sources=[source])
+
+        self.assertTrue(result.partial)
+        self.assertEqual(result.vacancies, [])
+        self.assertEqual((result.sources[0].name, result.sources[0].status), ("HH.ru", "error"))
+
+    def test_merge_results_keeps_vacancies_without_keys(self):
+        vacancy = {"title": "", "company_name": "", "url": ""}
+        self.assertEqual(len(merge_results([[vacancy], [dict(vacancy)]])), 2)
+
+
+@override_settings(HH_SOURCES={"HH.ru": {"ENABLED": False}})
+class SourceRegistryTests(SimpleTestCase):
+    def setUp(self):
+        reset_sources()
+        self.addCleanup(reset_sources)
+
+    def test_registered_sources_are_used_in_order(self):
+        register_source(FakeSource("A"))
+        register_source(FakeSource("B"), timeout=3.0)
+
+        self.assertEqual([s.name for s in get_sources()], ["A", "B"])
+        self.assertEqual(get_sources()[1].timeout, 3.0)
+
+        unregister_source("A")
+        self.assertEqual([s.name for s in get_sources()], ["B"])
+
+    @override_settings(HH_SOURCES={
+        "HH.ru": {"ENABLED": False},
+        "Fake": {"ADAPTER": "parserapp.tests.FakeSource", "TIMEOUT": 2.5, "OPTIONS": {"delay": 0.01}},
+    })
+    def test_sources_are_created_from_settings(self):
+        (source,) = get_sources()
+
+        self.assertIsInstance(source, FakeSource)
+        self.assertEqual((source.name, source.timeout, source.delay), ("Fake", 2.5, 0.01))
+
+    def test_search_view_merges_sources(self):
+        register_source(FakeSource("A", [make_vacancy("A", "1", company="Бета")]))
+        register_source(FakeSource("B", [make_vacancy("B", "2", company="Альфа")]))
+        register_source(FakeSource("Slow", [make_vacancy("Slow", "3")], delay=1.0, timeout=0.1))
+
+        response = self.client.get("/api/search/", {"search_phrase": "python", "sort": "3"})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([v["external_id"] for v in data["vacancies"]], ["2", "1"])
+        self.assertEqual([s["status"] for s in data["sources"]], ["ok", "ok", "timeout"])
+        self.assertTrue(data["partial"])
+
+
+@override_settings(HH_SOURCES={"HH.ru": {"ENABLED": False}})
+class CliTests(SimpleTestCase):
+    def setUp(self):
+        reset_sources()
+        self.addCleanup(reset_sources)
+        # main() настраивает корневой логгер (basicConfig) — возвращаем как было
+        root = logging.getLogger()
+        self.addCleanup(setattr, root, "handlers", list(root.handlers))
+        self.addCleanup(root.setLevel, root.level)
+
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            code = cli.main(list(argv))
+        return code, stdout.getvalue(), stderr.getvalue()
+
+    def test_hh_failure_exits_with_code_2_and_warns(self):
+        register_source(HHSource(parser=CachedHHParser(parser=FailingParser(), cache_alias="default")))
+
+        code, stdout, stderr = self.run_cli("--query", "cli-hh-down", "--format", "jsonl")
+
+        self.assertEqual(code, 2)
+        self.assertEqual(stdout, "")
+        self.assertIn("warning: HH.ru: HH.ru не ответил", stderr)
+
+    def test_results_are_written_as_jsonl(self):
+        register_source(FakeSource("A", [make_vacancy("A", "1"), make_vacancy("A", "2", company="Другая")]))
+
+        code, stdout, stderr = self.run_cli("--query", "python", "--format", "jsonl", "--sort", "3")
+
+        self.assertEqual(code, 0)
+        self.assertEqual(stderr, "")
+        lines = stdout.splitlines()
+        self.assertEqual([json.loads(line)["company_name"] for line in lines], ["Другая", "Рога и копыта"])
+
+
+class VersionedParser:
+    """HH.ru, у которого каждый ответ — новая версия выдачи; failing — HH.ru не отвечает, gate — ответ ждёт сигнала."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+        self.gate = None
+
+    def fetch_page(self, query, page=0, per_page=20, **params):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls += 1
+        if self.failing:
+            return None
+        return {"items": [{"id": "1", "name": f"Python v{self.calls}", "alternate_url": "https://hh.ru/vacancy/1"}]}
+
+    def parse_response(self, data):
+        return [vacancy_from_hh(item) for item in data["items"]]
+
+
+class CachedHHParserTests(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        self.parser = VersionedParser()
+
+    def make_cache(self, **kwargs):
+        cached = CachedHHParser(parser=self.parser, cache_alias="default", stats=CacheStats(), **kwargs)
+        self.addCleanup(cached._refresher.shutdown)
+        return cached
+
+    def titles(self, cached):
+        return [v["title"] for v in cached.get_vacancies("python")]
+
+    def wait_refreshes(self, cached, count):
+        deadline = time.monotonic() + 5
+        while cached.stats.snapshot()["refreshes"] < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # Блокировку обновления снимают после записи в кэш — ждём и её
+        while caches["default"].get(make_cache_key("python", 0, 20) + ":refresh") and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_fresh_entry_is_served_from_cache(self):
+        cached = self.make_cache(ttl=60)
+
+        self.assertEqual(self.titles(cached), ["Python v1"])
+        self.assertEqual(self.titles(cached), ["Python v1"])
+        self.assertEqual(self.parser.calls, 1)
+        stats = cached.stats.snapshot()
+        self.assertEqual((stats["misses"], stats["hits"], stats["hit_ratio"]), (1, 1, 0.5))
+
+    def test_stale_entry_is_served_and_refreshed_in_background(self):
+        cached = self.make_cache(ttl=0, stale_ttl=60)
+        self.titles(cached)
+
+        self.assertEqual(self.titles(cached), ["Python v1"])
+        self.wait_refreshes(cached, 1)
+
+        self.assertEqual(self.parser.calls, 2)
+        self.assertEqual(self.titles(cached), ["Python v2"])
+        stats = cached.stats.snapshot()
+        self.assertEqual((stats["stale_hits"], stats["refreshes"]), (2, 1))
+
+    def test_only_one_background_refresh_per_key(self):
+        cached = self.make_cache(ttl=0, stale_ttl=60)
+        self.titles(cached)
+        self.parser.gate = threading.Event()
+
+        for _ in range(3):
+            self.assertEqual(self.titles(cached), ["Python v1"])
+        self.parser.gate.set()
+        self.wait_refreshes(cached, 1)
+
+        self.assertEqual(self.parser.calls, 2)
+        self.assertEqual(cached.stats.snapshot()["stale_hits"], 3)
+
+    def test_error_falls_back_to_kept_entry(self):
+        cached = self.make_cache(ttl=0, stale_ttl=0, stale_if_error=60)
+        self.titles(cached)
+        self.parser.failing = True
+
+        self.assertEqual(self.titles(cached), ["Python v1"])
+        self.assertEqual(cached.stats.snapshot()["stale_if_error"], 1)
+
+    def test_miss_with_error_raises(self):
+        cached = self.make_cache(ttl=60)
+        self.parser.failing = True
+
+        with self.assertRaises(HHUnavailable):
+            cached.get_vacancies("python")
+        self.parser.failing = False
+        # Ошибка не кэшируется: следующий вызов снова идёт в HH.ru
+        self.assertEqual(self.titles(cached), ["Python v2"])
+
+
+# 1 USD = 100 ₽, 1 EUR = 110 ₽ (курс — единиц валюты за рубль, как в ExchangeRate)
+TEST_RATES = {"RUR": 1.0, "USD": 0.01, "EUR": 1 / 110}
+
+
+@mock.patch("parserapp.services.currency.get_rates", return_value=TEST_RATES)
+class FilterTests(SimpleTestCase):
+    def test_parse_filters(self, _):
+        cases = [
+            ({}, {}, "5"),
+            (
+                {"work_mode": " Remote ", "location": " Москва ", "salary_min": "1500", "currency": "usd", "sort": "1"},
+                {"work_mode": "remote", "location": "Москва", "salary_min": 1500.0, "currency": "USD"}, "1",
+            ),
+            ({"work_mode": "space", "salary_min": "много", "sort": "9"}, {}, "5"),
+            ({"salary_min": "", "location": "  ", "sort": 3}, {}, "3"),
+        ]
+        for data, filters, sort_option in cases:
+            with self.subTest(data=data):
+                self.assertEqual(parse_filters(data), (filters, sort_option))
+
+    @override_settings(HH_AREA_IDS={"Тверь": 14})
+    def test_build_hh_params_splits_filters_between_hh_and_local(self, _):
+        cases = [
+            ({"work_mode": "remote"}, "5", {"schedule": "remote"}, {}),
+            ({"work_mode": "office"}, "5", {}, {"work_mode": "office"}),
+            ({"location": " москва "}, "5", {"area": 1}, {}),
+            ({"location": "тверь"}, "5", {"area": 14}, {}),
+            ({"location": "Урюпинск"}, "5", {}, {"location": "Урюпинск"}),
+            ({"salary_min": 1500.0, "currency": "USD"}, "1",
+             {"only_with_salary": "true", "order_by": "salary_desc"}, {"salary_min": 1500.0, "currency": "USD"}),
+            ({"currency": "EUR"}, "2", {"only_with_salary": "true", "order_by": "salary_asc"}, {"currency": "EUR"}),
+            ({}, "3", {}, {}),
+        ]
+        for filters, sort_option, params, local in cases:
+            with self.subTest(filters=filters, sort=sort_option):
+                self.assertEqual(build_hh_params(filters, sort_option), (params, local))
+
+    def test_apply_filters_compares_salaries_in_rubles(self, _):
+        vacancies = [
+            make_vacancy("A", "usd", location="Москва") | {"salary_from": 1000, "salary_to": 2000, "currency": "USD"},
+            make_vacancy("A", "rur", location="г. Москва") | {"salary_from": 150000, "salary_to": None, "currency": "RUR"},
+            make_vacancy("A", "eur", location="Казань", work_mode="office")
+            | {"salary_from": None, "salary_to": 1000, "currency": "EUR"},
+            make_vacancy("A", "unknown", location="Пермь") | {"salary_from": 999999, "salary_to": None, "currency": "XXX"},
+            make_vacancy("A", "none", location="Пермь"),
+        ]
+        cases = [
+            ({"salary_min": 150000.0}, ["usd", "rur"]),
+            ({"salary_min": 160000.0}, ["usd"]),
+            # currency — ещё и фильтр по валюте вакансии; сумма в EUR сравнивается в рублях
+            ({"salary_min": 1000.0, "currency": "EUR"}, ["eur"]),
+            ({"salary_min": 1001.0, "currency": "EUR"}, []),
+            ({"salary_min": 100000.0, "currency": "RUR"}, ["rur"]),
+            ({"location": "москва"}, ["usd", "rur"]),
+            ({"work_mode": "office"}, ["eur"]),
+            ({}, ["usd", "rur", "eur", "unknown", "none"]),
+        ]
+        for filters, expected in cases:
+            with self.subTest(filters=filters):
+                self.assertEqual([v["external_id"] for v in apply_filters(vacancies, filters)], expected)
+
+        self.assertEqual([v["external_id"] for v in sort_vacancies(vacancies, "1")],
+                         ["usd", "rur", "eur", "unknown", "none"])
+        self.assertEqual([v["external_id"] for v in sort_vacancies(vacancies, "2")],
+                         ["usd", "eur", "rur", "unknown", "none"])
+
+
+class SearchPagerTests(SimpleTestCase):
+    def test_pages_are_fetched_on_demand(self):
+        source = PagedSource("A", make_vacancies("A", 25))
+
+        with SearchPager("python", screen_size=10, sources=[source], prefetch=False) as pager:
+            first = pager.next_screen()
+            self.assertEqual(source.calls, [0])
+            second = pager.next_screen()
+            third = pager.next_screen()
+
+            self.assertEqual([len(first), len(second), len(third)], [10, 10, 5])
+            self.assertEqual(source.calls, [0, 1, 2])
+            self.assertTrue(pager.exhausted)
+            self.assertEqual(pager.next_screen(), [])
+            self.assertEqual(len({v["external_id"] for v in pager.shown}), 25)
+
+    def test_next_page_is_prefetched_in_background(self):
+        source = PagedSource("A", make_vacancies("A", 30), delay=0.2)
+
+        with SearchPager("python", screen_size=10, sources=[source]) as pager:
+            pager.next_screen()
+            time.sleep(0.4)  # пользователь читает первый экран
+
+            started = time.monotonic()
+            screen = pager.next_screen()
+            self.assertLess(time.monotonic() - started, 0.1)
+            self.assertEqual([v["external_id"] for v in screen], [str(i) for i in range(10, 20)])
+
+    def test_filters_apply_per_page_and_duplicates_are_skipped(self):
+        vacancies = make_vacancies("A", 30, work_mode="office")
+        for i in range(0, 30, 3):
+            vacancies[i]["work_mode"] = "remote"
+        # повтор вакансии с первой страницы на второй
+        vacancies[12] = dict(vacancies[0], external_id="dup")
+        source = PagedSource("A", vacancies)
+
+        with SearchPager("python", filters={"work_mode": "remote"}, screen_size=5, sources=[source],
+                         prefetch=False) as pager:
+            screen = pager.next_screen()
+
+        self.assertEqual([v["external_id"] for v in screen], ["0", "3", "6", "9", "15"])
+        self.assertEqual(source.calls, [0, 1, 2, 3])
+
+    def test_sort_applies_to_loaded_pages(self):
+        vacancies = [make_vacancy("A", str(i), company=name) for i, name in enumerate("ДГВБА")]
+        source = PagedSource("A", vacancies)
+
+        with SearchPager("python", sort_option="3", screen_size=2, sources=[source], prefetch=False) as pager:
+            screens = [pager.next_screen() for _ in range(3)]
+
+        # каждая страница сортируется вместе с ещё не показанными вакансиями
+        self.assertEqual([[v["company_name"] for v in screen] for screen in screens], [["Г", "Д"], ["Б", "В"], ["А"]])
+
+    def test_failed_source_is_dropped_with_warning(self):
+        ok = PagedSource("Ok", make_vacancies("Ok", 20))
+        broken = PagedSource("Broken", error=RuntimeError("boom"))
+
+        with SearchPager("python", screen_size=10, sources=[ok, broken], prefetch=False) as pager:
+            pager.next_screen()
+            pager.next_screen()
+
+        self.assertEqual(len(broken.calls), 1)
+        self.assertEqual(ok.calls, [0, 1])
+        self.assertEqual(len(pager.warnings), 1)
+        self.assertIn("boom", pager.warnings[0])
+
+
+class CountPagesTests(SimpleTestCase):
+    def test_pages_stay_within_hh_depth_limit(self):
+        # HH.ru отдаёт страницу, только если (page + 1) * per_page <= 2000
+        self.assertEqual(count_pages({"pages": 67}, 30), 66)
+        self.assertEqual(count_pages({"pages": 20}, 100), 20)
+        self.assertEqual(count_pages({"pages": 5}, 100), 5)
+        self.assertEqual(count_pages({"pages": 67}, 30, max_pages=3), 3)
+
+    def test_hh_source_stops_at_last_page_within_depth_limit(self):
+        class FullPages:
+            def get_vacancies(self, query, page=0, per_page=20, **params):
+                return [{"title": "Python"}] * per_page
+
+        source = HHSource(parser=FullPages())
+        self.assertFalse(source.search("python", page=64, per_page=30).last)
+        self.assertTrue(source.search("python", page=65, per_page=30).last)
+        self.assertTrue(source.search("python", page=19, per_page=100).last)
+
+
+class WindowParser:
+    """Выдача HH.ru, в которой found больше лимита глубины: отдаются только первые 2000 вакансий."""
+
+    def __init__(self, found, posted_at):
+        self.found = found
+        self.posted_at = posted_at
+
+    def fetch_page(self, query, page=0, per_page=100, **params):
+        ids = range(page * per_page, (page + 1) * per_page)
+        items = [
+            {"id": str(i), "name": "Python", "alternate_url": f"https://hh.ru/vacancy/{i}",
+             "published_at": self.posted_at.isoformat()}
+            for i in ids
+        ]
+        return {"found": self.found, "pages": -(-self.found // per_page), "items": items}
+
+    def parse_response(self, data):
+        return [vacancy_from_hh(item) for item in data["items"]]
+
+
+class SyncSearchTests(TestCase):
+    def test_watermark_stays_when_minimal_window_exceeds_hh_depth(self):
+        now = timezone.now()
+        watermark = now - timedelta(seconds=30)
+        sync = SearchSync.objects.create(query="python", watermark=watermark)
+
+        with self.assertLogs("parserapp.services.sync", "WARNING"):
+            result = sync_search(sync, parser=WindowParser(5000, now - timedelta(seconds=1)), now=now)
+
+        self.assertFalse(result.complete)
+        self.assertEqual(result.fetched, 2000)
+        sync.refresh_from_db()
+        self.assertEqual(sync.watermark, watermark)
+
+
+class FlakyPages(WindowParser):
+    """Выдача на found вакансий, в которой страницы из failing HH.ru не отдаёт."""
+
+    def __init__(self, found, failing=()):
+        super().__init__(found, timezone.now())
+        self.failing = set(failing)
+
+    def fetch_page(self, query, page=0, per_page=100, **params):
+        if page in self.failing:
+            return None
+        return super().fetch_page(query, page, per_page, **params)
+
+
+class StreamSearchTests(SimpleTestCase):
+    def stream(self, parser, **params):
+        with mock.patch("parserapp.views.get_cached_parser", return_value=parser):
+            response = self.client.get("/api/search/", {"search_phrase": "python", "format": "ndjson", **params})
+            lines = b"".join(response.streaming_content).decode() if response.streaming else ""
+        return response, [json.loads(line) for line in lines.splitlines()]
+
+    def test_stream_starts_at_requested_page(self):
+        response, lines = self.stream(FlakyPages(100), page=2, per_page=10, pages=2)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([line["external_id"] for line in lines], [str(i) for i in range(20, 40)])
+
+    def test_missing_pages_are_reported_in_last_line(self):
+        response, lines = self.stream(FlakyPages(100, failing={3}), page=2, per_page=10, pages=3)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(lines), 21)
+        self.assertEqual(lines[10]["external_id"], "40")
+        self.assertEqual(lines[-1]["pages"], [3])
+        self.assertIn("error", lines[-1])
+
+    def test_unavailable_hh_fails_the_response(self):
+        response, _ = self.stream(FlakyPages(100, failing={0}))
+
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("error", response.json())
+
+    def test_invalid_pages_is_rejected(self):
+        for pages in ("x", "0", "-1"):
+            response = self.client.get("/api/search/", {"search_phrase": "python", "format": "ndjson", "pages": pages})
+
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("pages", response.json()["error"])
+
+    def test_invalid_page_and_per_page_are_rejected(self):
+        for params in ({"per_page": "0"}, {"per_page": "abc"}, {"page": "-1"}, {"page": "x"}):
+            for fmt in ("json", "ndjson"):
+                response = self.client.get("/api/search/", {"search_phrase": "python", "format": fmt, **params})
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(next(iter(params)), response.json()["error"])
+
+
+class RecordingAsyncParser:
+    def __init__(self, vacancies):
+        self.vacancies = vacancies
+        self.calls = []
+
+    async def get_vacancies(self, query, page=0, per_page=20, **params):
+        self.calls.append((query, page, per_page, params))
+        return self.vacancies
+
+
+def log_record(level=logging.INFO, msg="HH request ok", args=(), exc_info=None, **fields):
+    return logging.getLogger("parserapp.services.hh_parser").makeRecord(
+        "parserapp.services.hh_parser", level, __file__, 1, msg, args, exc_info, extra=fields,
+    )
+
+
+class LoggingTests(SimpleTestCase):
+    def test_key_value_formatter(self):
+        record = log_record(query="python", page=0, phrase="два слова", area="")
+        record.created = 1790000000.25
+
+        line = KeyValueFormatter().format(record)
+
+        self.assertEqual(
+            line,
+            '2026-09-21T14:13:20.250+00:00 INFO parserapp.services.hh_parser HH request ok '
+            'query=python page=0 phrase="два слова" area=""',
+        )
+
+    def test_json_formatter(self):
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = log_record(logging.ERROR, "HH request failed: %s", ("timeout",), exc_info=sys.exc_info(),
+                                query="python", latency=timedelta(seconds=1))
+
+        payload = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(
+            {key: payload[key] for key in ("level", "logger", "message", "query", "latency")},
+            {"level": "ERROR", "logger": "parserapp.services.hh_parser", "message": "HH request failed: timeout",
+             "query": "python", "latency": "0:00:01"},
+        )
+        self.assertIn("ValueError: boom", payload["exc"])
+
+    def test_sampling_filter_keeps_warnings(self):
+        sampling = SamplingFilter(rate=0.25, max_level="INFO")
+
+        with mock.patch("parserapp.utilis.logger.random.random", side_effect=[0.1, 0.9]):
+            self.assertTrue(sampling.filter(log_record()))
+            self.assertFalse(sampling.filter(log_record()))
+        self.assertFalse(SamplingFilter(rate=0).filter(log_record(logging.DEBUG)))
+        self.assertTrue(SamplingFilter(rate=0).filter(log_record(logging.WARNING)))
+        self.assertTrue(SamplingFilter(rate=1).filter(log_record()))
+
+    def test_queue_handler_writes_in_background(self):
+        stream = io.StringIO()
+        handler = AsyncQueueHandler(stream=stream)
+        handler.setFormatter(JsonFormatter())
+        args = {"page": 0}
+
+        handler.handle(log_record(msg="HH request ok: %(page)s", args=(args,), query="python"))
+        args["page"] = 1
+        handler.close()
+
+        payload = json.loads(stream.getvalue())
+        self.assertEqual((payload["message"], payload["query"]), ("HH request ok: 0", "python"))
+        self.assertEqual(handler.dropped, 0)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        close_pool()
+        pool_stats.reset()
+        self.addCleanup(pool_stats.reset)
+        self.addCleanup(close_pool)
+
+    def get(self, url, **params):
+        response = get_session().get(url, params={"per_page": 10, **params}, timeout=5)
+        response.raise_for_status()
+        return response
+
+    def test_keep_alive_connection_is_reused(self):
+        with FakeHHServer(found=100) as server:
+            for page in range(3):
+                self.get(server.url, page=page)
+
+            self.assertEqual(pool_stats.snapshot(), {"hits": 2, "misses": 1, "hit_ratio": 2 / 3})
+
+            # После закрытия пула соединение открывается заново
+            close_pool()
+            self.get(server.url)
+
+        self.assertEqual((pool_stats.hits, pool_stats.misses), (2, 2))
+
+    def test_sessions_of_threads_share_pool(self):
+        with FakeHHServer(found=100) as server:
+            self.get(server.url)
+            thread = threading.Thread(target=self.get, args=(server.url,))
+            thread.start()
+            thread.join(5)
+
+        self.assertEqual((pool_stats.hits, pool_stats.misses), (1, 1))
+
+
+class AsyncSearchViewTests(SimpleTestCase):
+    async def test_round_trip(self):
+        parser = RecordingAsyncParser(hh_vacancies(3)[::-1])
+
+        with mock.patch("parserapp.views.get_default_async_parser", return_value=parser):
+            response = await self.async_client.get("/api/search/async/", {
+                "search_phrase": "python", "page": 1, "per_page": 3, "work_mode": "remote", "sort": "4",
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(parser.calls, [("python", 1, 3, {"schedule": "remote"})])
+        vacancies = response.json()["vacancies"]
+        self.assertEqual([v["title"] for v in vacancies], ["Python 0", "Python 1", "Python 2"])
+        self.assertEqual(vacancies[0]["company_name"], "Компания 0")
+
+    async def test_invalid_request_is_rejected(self):
+        response = await self.async_client.get("/api/search/async/", {"search_phrase": "python", "per_page": 0})
+
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(HH_METRICS={"SLOW_REQUEST_MS": 0})
+class RequestMetricsTests(SimpleTestCase):
+    def slow_log(self, view):
+        with self.assertLogs("parserapp.middleware", "WARNING") as logs:
+            response = RequestMetricsMiddleware(view)(RequestFactory().get("/api/search/?query=python"))
+            if response.streaming:
+                b"".join(response.streaming_content)
+                response.close()
+        [record] = logs.records
+        return record
+
+    def test_slow_request_log_has_stage_breakdown(self):
+        def view(request):
+            with stage("hh_fetch"):
+                time.sleep(0.01)
+            return HttpResponse("ok")
+
+        record = self.slow_log(view)
+
+        self.assertEqual((record.view, record.status, record.path), ("unresolved", 200, "/api/search/?query=python"))
+        self.assertGreaterEqual(record.hh_fetch_ms, 10)
+        self.assertGreaterEqual(record.total_ms, record.hh_fetch_ms)
+
+    def test_streaming_time_includes_body(self):
+        def body():
+            for line in (b"a\n", b"b\n"):
+                with stage("encode"):
+                    time.sleep(0.02)
+                yield line
+
+        record = self.slow_log(lambda request: StreamingHttpResponse(body()))
+
+        # Оба этапа отработали уже после выхода из view, но попали и во время, и в разбивку
+        self.assertGreaterEqual(record.encode_ms, 40)
+        self.assertGreaterEqual(record.total_ms, 40)
+
+    def test_closed_stream_is_recorded(self):
+        response = RequestMetricsMiddleware(lambda request: StreamingHttpResponse(iter([b"a", b"b"])))(
+            RequestFactory().get("/api/search/stream/")
+        )
+
+        with self.assertLogs("parserapp.middleware", "WARNING") as logs:
+            next(iter(response))
+            response.close()
+
+        self.assertEqual(len(logs.records), 1)
+
+    def test_metrics_endpoint_renders_histograms(self):
+        with stage("json_decode"):
+            pass
+        self.slow_log(lambda request: HttpResponse("ok"))
+
+        with self.assertLogs("parserapp.middleware", "WARNING"):
+            response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('hh_stage_seconds_count{stage="json_decode"}', text)
+        self.assertIn('http_slow_requests_total{view="unresolved"}', text)
+        self.assertIn("# TYPE http_request_seconds histogram", text)
+        self.assertIn("hh_http_pool_", text)
+
+
+class AdaptiveRateLimiterTests(SimpleTestCase):
+    def make_limiter(self, **kwargs):
+        options = dict(rate=8.0, burst=4, min_rate=1.0, max_rate=8.0, rate_increase=1.0, max_concurrency=8)
+        options.update(kwargs)
+        return AdaptiveRateLimiter(**options)
+
+    def test_throttle_halves_rate_and_concurrency_then_recovers(self):
+        limiter = self.make_limiter()
+
+        limiter.on_throttle()
+        self.assertEqual((limiter.rate, limiter.concurrency), (4.0, 4))
+        limiter.on_throttle()
+        limiter.on_throttle()
+        limiter.on_throttle()
+        self.assertEqual((limiter.rate, limiter.concurrency), (1.0, 1))  # не ниже минимумов
+
+        for _ in range(3):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 4.0)
+        for _ in range(10):
+            limiter.on_success()
+        self.assertEqual(limiter.rate, 8.0)  # не выше максимума
+        self.assertGreater(limiter.concurrency, 1)
+
+    def test_throttle_empties_bucket(self):
+        limiter = self.make_limiter()
+
+        limiter.on_throttle()
+
+        self.assertGreater(limiter.try_acquire(), 0)
+
+    def test_retry_after_blocks_requests(self):
+        limiter = self.make_limiter()
+
+        limiter.on_throttle(retry_after=0.2)
+
+        self.assertAlmostEqual(limiter.try_acquire(), 0.2, delta=0.05)
+        started = time.monotonic()
+        limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+
+    def test_concurrency_limit(self):
+        limiter = self.make_limiter(max_concurrency=2)
+
+        self.assertEqual(limiter.try_acquire(), 0)
+        self.assertEqual(limiter.try_acquire(), 0)
+        self.assertGreater(limiter.try_acquire(), 0)
+        limiter.release()
+        self.assertEqual(limiter.try_acquire(), 0)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def open_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        breaker.record_failure()
+        return breaker
+
+    def test_opens_after_threshold_and_allows_single_trial(self):
+        breaker = self.open_breaker()
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.allow(), CircuitBreaker.TRIAL)
+        self.assertFalse(breaker.allow())  # пока пробный запрос не завершился
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.allow())
+
+    def test_failed_trial_opens_again(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allow())
+
+    def test_release_frees_trial_interrupted_without_record(self):
+        breaker = self.open_breaker()
+        time.sleep(0.06)
+        permit = breaker.allow()
+
+        breaker.release(permit)
+
+        self.assertEqual(breaker.allow(), CircuitBreaker.TRIAL)
+
+    @override_settings(HH_RESILIENCE={"FAILURE_THRESHOLD": 1, "RESET_TIMEOUT": 0.05, "RETRIES": 0})
+    def test_trial_request_raising_unexpected_error_releases_breaker(self):
+        reset_resilience()
+        self.addCleanup(reset_resilience)
+
+        class BrokenSession:
+            def get(self, *args, **kwargs):
+                raise RuntimeError("boom")
+
+        breaker = get_breaker()
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        with self.assertRaises(RuntimeError):
+            HHParser(session=BrokenSession()).request("https://hh.example/vacancies")
+
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertEqual(breaker.allow(), CircuitBreaker.TRIAL)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def run_concurrently(self, flight, fn, count=8):
+        results, errors = [], []
+        barrier = threading.Barrier(count)
+
+        def call():
+            barrier.wait()
+            try:
+                results.append(flight.do("key", fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_reach_upstream_once(self):
+        calls = []
+
+        def upstream():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        flight = SingleFlight(stats=FlightStats())
+        results, errors = self.run_concurrently(flight, upstream)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 8)
+        self.assertEqual(errors, [])
+        self.assertEqual(flight.stats.snapshot(), {"leaders": 1, "coalesced": 7})
+
+    def test_error_reaches_every_caller_and_is_not_cached(self):
+        calls = []
+
+        def failing():
+            calls.append(1)
+            time.sleep(0.2)
+            raise RuntimeError("boom")
+
+        flight = SingleFlight(stats=FlightStats())
+        results, errors = self.run_concurrently(flight, failing)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [])
+        self.assertEqual([str(e) for e in errors], ["boom"] * 8)
+        # следующий вызов снова идёт к источнику
+        self.assertEqual(flight.do("key", lambda: "fresh"), "fresh")
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def test_concurrent_calls_reach_upstream_once(self):
+        calls = []
+
+        async def upstream():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return "result"
+
+        async def main():
+            flight = AsyncSingleFlight(stats=FlightStats())
+            return await asyncio.gather(*(flight.do("key", upstream) for _ in range(8)))
+
+        self.assertEqual(asyncio.run(main()), ["result"] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_error_reaches_every_caller_and_is_not_cached(self):
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            raise RuntimeError("boom")
+
+        async def fresh():
+            return "fresh"
+
+        async def main():
+            flight = AsyncSingleFlight(stats=FlightStats())
+            results = await asyncio.gather(*(flight.do("key", failing) for _ in range(8)), return_exceptions=True)
+            return results, await flight.do("key", fresh)
+
+        results, after = asyncio.run(main())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([str(e) for e in results], ["boom"] * 8)
+        self.assertTrue(all(isinstance(e, RuntimeError) for e in results))
+        self.assertEqual(after, "fresh")
+
+
+class LocalSearchTests(TestCase):
+    ROWS = [
+        # title, company_name, location, work_mode, salary_from, salary_to, currency
+        ("Python", "Яндекс", "Москва", "remote", 200000, 300000, "RUR"),
+        ("Go", "Авито", "Москва", "office", None, None, None),
+        ("Java", "Яндекс", "Санкт-Петербург", "remote", 3000, 4000, "USD"),
+        ("Python", "Озон", "Казань", "hybrid", 200000, 300000, "RUR"),
+        ("QA", "авито", "москва", "remote", 100000, None, "RUR"),
+        ("DevOps", "Тинькофф", "Москва", "remote", None, 250000, "RUR"),
+        ("Data Scientist", "Озон", "Москва", "remote", None, None, None),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        for i, (title, company, location, work_mode, salary_from, salary_to, currency) in enumerate(cls.ROWS):
+            Vacancy.objects.create(
+                title=title, company_name=company, location=location, work_mode=work_mode,
+                salary_from=salary_from, salary_to=salary_to, currency=currency,
+                url=f"https://hh.ru/vacancy/{i}", external_id=str(i),
+            )
+
+    def test_filter_and_sort_combinations_use_index_order(self):
+        cursors = {"1": encode_cursor(250000.0, 3), "2": encode_cursor(100000.0, 3), "3": encode_cursor("озон", 3),
+                   "4": encode_cursor("java", 3), "5": encode_cursor(None, 3)}
+        combinations = [
+            {}, {"work_mode": "remote"}, {"work_mode": "remote", "currency": "RUR"},
+            {"work_mode": "remote", "location": "моск"}, {"location": "моск"}, {"currency": "RUR"},
+        ]
+        for filters in combinations:
+            for sort_option in "12345":
+                for cursor in (None, cursors[sort_option]):
+                    with self.subTest(filters=filters, sort=sort_option, cursor=bool(cursor)):
+                        plan = build_queryset(filters, sort_option, cursor).explain()
+
+                        self.assertNotIn("TEMP B-TREE", plan)
+                        if "work_mode" in filters:
+                            self.assertIn("USING INDEX vacancy_mode_", plan)
+
+        plan = build_queryset({"salary_min": 150000}, "1", cursors["1"]).explain()
+        self.assertIn("vacancy_sort_max_salary_idx", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_keyset_pages_match_single_page_for_every_sort(self):
+        for sort_option in "12345":
+            for filters in ({}, {"work_mode": "remote"}):
+                with self.subTest(sort=sort_option, filters=filters):
+                    expected, _ = search_local(filters, sort_option, limit=100)
+                    paged, cursor = search_local(filters, sort_option, limit=2)
+                    while cursor:
+                        page, cursor = search_local(filters, sort_option, cursor=cursor, limit=2)
+                        paged.extend(page)
+
+                    self.assertEqual([v["external_id"] for v in paged], [v["external_id"] for v in expected])
+                    self.assertEqual(len(expected), 5 if filters else len(self.ROWS))
+
+    def test_sort_orders(self):
+        def ids(sort_option):
+            return [v["external_id"] for v in search_local({}, sort_option, limit=100)[0]]
+
+        # Зарплаты в рублях: 4000 USD ≈ 364 тыс. ₽ — выше 300 тыс. ₽; равные вилки — новые первыми
+        self.assertEqual(ids("1")[:4], ["2", "3", "0", "5"])
+        self.assertEqual(ids("2")[:3], ["4", "0", "3"])
+        self.assertEqual(ids("5"), ["6", "5", "4", "3", "2", "1", "0"])
+
+    def test_location_is_case_insensitive_substring(self):
+        vacancies, _ = search_local({"location": "моск"}, "5", limit=100)
+
+        self.assertEqual([v["external_id"] for v in vacancies], ["6", "5", "4", "1", "0"])
+
+
+def hh_vacancies(count, salary_from=100000):
+    return [
+        vacancy_from_hh({
+            "id": str(i), "name": f"Python {i}", "alternate_url": f"https://hh.ru/vacancy/{i}",
+            "employer": {"name": f"Компания {i}"}, "area": {"name": "Москва"},
+            "salary": {"from": salary_from, "to": None, "currency": "RUR"},
+            "published_at": "2026-10-01T12:00:00+0300",
+        })
+        for i in range(count)
+    ]
+
+
+@override_settings(HH_DB_WRITER={"ENABLED": False})
+class IngestTests(TestCase):
+    def test_unchanged_vacancies_are_not_rewritten(self):
+        first = ingest_vacancies(hh_vacancies(50), batch_size=20)
+        updated_at = dict(Vacancy.objects.values_list("external_id", "updated_at"))
+
+        second = ingest_vacancies(hh_vacancies(50), batch_size=20)
+        changed = hh_vacancies(50)
+        changed[7]["title"] = "Python 7 (senior)"
+        third = ingest_vacancies(changed, batch_size=20)
+
+        self.assertEqual(first.as_dict(), {"inserted": 50, "updated": 0, "unchanged": 0, "skipped": 0})
+        self.assertEqual(second.as_dict(), {"inserted": 0, "updated": 0, "unchanged": 50, "skipped": 0})
+        self.assertEqual(third.as_dict(), {"inserted": 0, "updated": 1, "unchanged": 49, "skipped": 0})
+        self.assertEqual(Vacancy.objects.get(external_id="7").title, "Python 7 (senior)")
+        self.assertEqual(Vacancy.objects.get(external_id="8").updated_at, updated_at["8"])
+
+    def test_derived_fields_are_written_and_match_model_save(self):
+        ingest_vacancies(hh_vacancies(1, salary_from=200000))
+        vacancy = Vacancy.objects.get(external_id="0")
+        stored_hash = vacancy.content_hash
+
+        vacancy.save()
+
+        self.assertEqual((vacancy.salary_min_rub, vacancy.salary_max_rub), (200000.0, 200000.0))
+        self.assertEqual(vacancy.content_hash, stored_hash)
+        self.assertEqual(ingest_vacancies(hh_vacancies(1, salary_from=200000)).unchanged, 1)
+
+    def test_invalid_and_repeated_vacancies(self):
+        vacancies = hh_vacancies(2)
+        vacancies[1].external_id = ""
+        repeated = hh_vacancies(1)[0]
+        repeated.title = "Последняя версия"
+
+        report = ingest_vacancies([*vacancies, repeated])
+
+        self.assertEqual((report.inserted, report.skipped), (1, 1))
+        self.assertEqual(Vacancy.objects.get(external_id="0").title, "Последняя версия")
+
+
+@override_settings(HH_DB_WRITER={"ENABLED": False})
+class ExportTests(TestCase):
+    def setUp(self):
+        ingest_vacancies(hh_vacancies(5))
+        Vacancy.objects.filter(external_id="3").update(location="Казань", salary_from=None)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dir = Path(directory.name)
+
+    def test_csv(self):
+        path = self.dir / "vacancies.csv"
+
+        self.assertEqual(export_vacancies(str(path), "csv"), 5)
+
+        with open(path, encoding="utf-8", newline="") as stream:
+            rows = list(csv.DictReader(stream))
+        self.assertEqual(tuple(rows[0]), EXPORT_FIELDS)
+        self.assertEqual([row["external_id"] for row in rows], ["0", "1", "2", "3", "4"])
+        self.assertEqual((rows[0]["title"], rows[0]["company_name"], rows[0]["salary_from"]), ("Python 0", "Компания 0", "100000.00"))
+        self.assertEqual((rows[3]["location"], rows[3]["salary_from"]), ("Казань", ""))
+
+    def test_gzip_jsonl_with_filters(self):
+        path = self.dir / "vacancies.jsonl.gz"
+
+        self.assertEqual(export_vacancies(str(path), "jsonl", compression="gzip", filters={"location": "Москва"}), 4)
+
+        with gzip.open(path, "rt", encoding="utf-8") as stream:
+            records = [json.loads(line) for line in stream]
+        self.assertEqual([record["external_id"] for record in records], ["0", "1", "2", "4"])
+        self.assertEqual(list(records[0]), list(EXPORT_FIELDS))
+        self.assertEqual(records[0]["salary_from"], 100000)
+        self.assertTrue(records[0]["posted_at"].startswith("2026-10-01T09:00:00"))
+
+    @skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow не установлен")
+    def test_parquet_row_groups(self):
+        import pyarrow.parquet as pq
+
+        path = self.dir / "vacancies.parquet"
+
+        self.assertEqual(export_vacancies(str(path), "parquet", chunk_size=2), 5)
+
+        parquet = pq.ParquetFile(path)
+        self.assertEqual(parquet.metadata.num_row_groups, 3)
+        table = parquet.read()
+        self.assertEqual(table.column_names, list(EXPORT_FIELDS))
+        self.assertEqual(table.column("salary_from").to_pylist(), [100000.0, 100000.0, 100000.0, None, 100000.0])
+
+    @skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow не установлен")
+    def test_empty_parquet_has_schema(self):
+        import pyarrow.parquet as pq
+
+        path = self.dir / "empty.parquet"
+
+        self.assertEqual(export_vacancies(str(path), "parquet", filters={"location": "Сочи"}), 0)
+        self.assertEqual(pq.read_table(path).column_names, list(EXPORT_FIELDS))
+
+
+class FullTextTests(TestCase):
+    def found(self, text):
+        return sorted(Vacancy.objects.filter(pk__in=[pk for pk, _ in fulltext.search_ranked(text)])
+                      .values_list("external_id", flat=True))
+
+    def create(self, external_id, title, **fields):
+        return Vacancy.objects.create(
+            title=title, company_name=fields.pop("company_name", "Рога и копыта"), location="Москва",
+            url=f"https://hh.ru/vacancy/{external_id}", external_id=external_id, **fields,
+        )
+
+    def test_triggers_keep_index_in_sync(self):
+        self.assertTrue(fulltext.is_available())
+        vacancy = self.create("1", "Python-разработчик")
+        self.assertEqual(self.found("python"), ["1"])
+
+        vacancy.title = "Тестировщик"
+        vacancy.save()
+        self.assertEqual(self.found("python"), [])
+        self.assertEqual(self.found("тестировщик"), ["1"])
+
+        vacancy.delete()
+        self.assertEqual(self.found("тестировщик"), [])
+
+    @override_settings(HH_DB_WRITER={"ENABLED": False})
+    def test_bulk_upsert_updates_index(self):
+        ingest_vacancies(hh_vacancies(1))
+        changed = hh_vacancies(1)
+        changed[0].title = "Аналитик данных"
+        ingest_vacancies(changed)
+
+        self.assertEqual(self.found("python"), [])
+        self.assertEqual(self.found("аналитик"), ["0"])
+
+    def test_inflected_words_and_yo_match(self):
+        self.create("1", "Ведущий разработчик", company_name="Ёлочка")
+        self.create("2", "Аналитик данных")
+
+        self.assertEqual(self.found("разработчиками"), ["1"])
+        self.assertEqual(self.found("ведущего разраб"), ["1"])
+        self.assertEqual(self.found("ёлочки"), ["1"])
+        self.assertEqual(self.found("данными аналитика"), ["2"])
+
+    def test_stem_keeps_short_and_latin_words(self):
+        self.assertEqual(fulltext.stem("разработчиками"), "разработчик")
+        self.assertEqual(fulltext.stem("базы"), "базы")
+        self.assertEqual(fulltext.stem("Python"), "Python")
+        self.assertEqual(fulltext.build_match_query('C++ "senior"'), '"C"* "senior"*')
+
+
+class RecomputeSalariesTests(TestCase):
+    def setUp(self):
+        invalidate_rates()
+        self.addCleanup(invalidate_rates)
+
+    def create(self, external_id, salary_from, salary_to, currency):
+        return Vacancy.objects.create(
+            title="Python", company_name="Рога и копыта", location="Москва", salary_from=salary_from,
+            salary_to=salary_to, currency=currency, url=f"https://hh.ru/vacancy/{external_id}", external_id=external_id,
+        )
+
+    def salaries(self):
+        return dict(
+            (external_id, (low, high))
+            for external_id, low, high in Vacancy.objects.values_list("external_id", "salary_min_rub", "salary_max_rub")
+        )
+
+    def test_rate_change_recomputes_ruble_salaries(self):
+        self.create("usd", 1000, 2000, "USD")
+        self.create("usd-to", None, 3000, "USD")
+        self.create("rur", 150000, None, "RUR")
+        self.create("none", None, None, None)
+
+        ExchangeRate.objects.filter(code="USD").update(rate=0.02)
+        invalidate_rates()
+        recompute_salaries()
+
+        self.assertEqual(self.salaries(), {
+            "usd": (50000.0, 100000.0),
+            "usd-to": (150000.0, 150000.0),
+            "rur": (150000.0, 150000.0),
+            "none": (None, None),
+        })
+
+    def test_currency_without_rate_loses_ruble_salary(self):
+        self.create("kzt", 500000, None, "KZT")
+
+        save_rates({"RUR": (1.0, "Рубль"), "USD": (0.01, "Доллар")})
+        ExchangeRate.objects.filter(code="KZT").delete()
+        invalidate_rates()
+        recompute_salaries()
+
+        self.assertEqual(self.salaries()["kzt"], (None, None))
+
+    def test_migration_backfills_ruble_salaries(self):
+        from django.apps import apps
+
+        migration = importlib.import_module("parserapp.migrations.0006_vacancy_salary_rub")
+        self.create("usd", 1000, None, "USD")
+        Vacancy.objects.update(salary_min_rub=None, salary_max_rub=None)
+
+        migration.seed_rates_and_backfill(apps, None)
+
+        self.assertEqual(self.salaries()["usd"], (round(1000 / 0.010972, 2),) * 2)
+
+
+class StoreDetailsTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.vacancy = Vacancy.objects.create(
+            title="Python", company_name="Альфа", url="https://hh.ru/vacancy/1", external_id="1",
+        )
+        self.fetched_at = self.now - timedelta(days=2)
+        VacancyDetail.objects.create(
+            vacancy=self.vacancy, description="Полное описание", key_skills=["Django"], experience="1–3 года",
+            fetched_at=self.fetched_at,
+        )
+
+    def store(self, status):
+        return _store([((self.vacancy.pk, "1", "", ""), (status, None, {}))], self.now)
+
+    def test_refused_request_keeps_stored_detail(self):
+        for status in (400, 403, 429):
+            report = self.store(status)
+
+            self.assertEqual((report.failed, report.missing), (1, 0))
+            detail = VacancyDetail.objects.get(pk=self.vacancy.pk)
+            self.assertEqual((detail.description, detail.key_skills, detail.archived),
+                             ("Полное описание", ["Django"], False))
+            self.assertEqual(detail.fetched_at, self.fetched_at)
+
+    def test_deleted_vacancy_is_archived(self):
+        for status in (404, 410):
+            report = self.store(status)
+
+            self.assertEqual((report.failed, report.missing), (0, 1))
+            self.assertTrue(VacancyDetail.objects.get(pk=self.vacancy.pk).archived)
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.job = ScheduledJob.objects.create(kind="sync", query="python", interval=3600, next_run_at=self.now)
+
+    def test_claimed_job_is_not_claimed_again(self):
+        claimed = claim_job("a", lease=60, now=self.now)
+
+        self.assertEqual(claimed.pk, self.job.pk)
+        self.assertEqual(claimed.locked_by, "a")
+        self.assertIsNone(claim_job("b", lease=60, now=self.now + timedelta(seconds=30)))
+
+    def test_expired_lease_is_reclaimed_and_old_owner_cannot_complete(self):
+        first = claim_job("a", lease=60, now=self.now)
+
+        second = claim_job("b", lease=60, now=self.now + timedelta(seconds=61))
+
+        self.assertEqual((second.pk, second.locked_by), (self.job.pk, "b"))
+        self.assertFalse(complete_job(first, "a", {"fetched": 1}, now=self.now + timedelta(seconds=70)))
+        self.assertTrue(complete_job(second, "b", {"fetched": 2}, now=self.now + timedelta(seconds=70)))
+        job = ScheduledJob.objects.get(pk=self.job.pk)
+        self.assertEqual((job.locked_by, job.last_result), ("", {"fetched": 2}))
+        self.assertGreater(job.next_run_at, self.now + timedelta(seconds=70))
+
+    def test_heartbeat_keeps_lease(self):
+        claim_job("a", lease=60, now=self.now)
+
+        self.assertEqual(extend_leases("a", [self.job.pk], lease=60, now=self.now + timedelta(seconds=50)), 1)
+        self.assertEqual(extend_leases("b", [self.job.pk], lease=60, now=self.now + timedelta(seconds=50)), 0)
+        self.assertIsNone(claim_job("b", lease=60, now=self.now + timedelta(seconds=61)))
+        self.assertIsNotNone(claim_job("b", lease=60, now=self.now + timedelta(seconds=111)))
+
+    @override_settings(HH_JOBS={"RETRY_BASE": 60})
+    @mock.patch("parserapp.services.resilience.random.uniform", side_effect=lambda low, high: high)
+    def test_retry_delay_grows_up_to_interval(self, _):
+        delays = []
+        for attempt in range(8):
+            job = claim_job("a", lease=60, now=self.now)
+            self.assertTrue(fail_job(job, "a", "boom", now=self.now))
+            job.refresh_from_db()
+            delays.append((job.next_run_at - self.now).total_seconds())
+            self.assertEqual((job.attempts, job.locked_by, job.last_error), (attempt + 1, "", "boom"))
+            ScheduledJob.objects.filter(pk=job.pk).update(next_run_at=self.now)
+
+        self.assertEqual(delays, [120, 180, 300, 540, 1020, 1980, 3600, 3600])
+
+
+class ConcurrentClaimTests(TransactionTestCase):
+    def test_only_one_of_concurrent_claims_wins(self):
+        ScheduledJob.objects.create(kind="sync", query="python", next_run_at=timezone.now())
+        barrier = threading.Barrier(4)
+        winners = []
+
+        def claim(worker_id):
+            try:
+                barrier.wait(5)
+                job = claim_job(worker_id, lease=60)
+                if job is not None:
+                    winners.append(worker_id)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=claim, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(ScheduledJob.objects.get().locked_by, winners[0])
+
+
+def create_sync(query):
+    return SearchSync.objects.create(query=query).pk
+
+
+def fail(message):
+    SearchSync.objects.create(query="rolled back")
+    raise RuntimeError(message)
+
+
+class DatabaseWriterTests(TransactionTestCase):
+    def make_writer(self, **kwargs):
+        writer = DatabaseWriter(max_group=10, max_delay=0.2, stats=WriterStats(), **kwargs)
+        self.addCleanup(writer.close)
+        return writer
+
+    def test_submits_are_committed_in_one_transaction(self):
+        writer = self.make_writer()
+
+        futures = [writer.submit(create_sync, f"q{i}") for i in range(5)]
+
+        self.assertEqual(len({future.result(timeout=5) for future in futures}), 5)
+        self.assertEqual(SearchSync.objects.count(), 5)
+        stats = writer.stats.snapshot()
+        self.assertEqual((stats["transactions"], stats["committed"]), (1, 5))
+
+    def test_failing_batch_does_not_roll_back_others(self):
+        writer = self.make_writer()
+
+        first = writer.submit(create_sync, "first")
+        broken = writer.submit(fail, "boom")
+        last = writer.submit(create_sync, "last")
+
+        first.result(timeout=5)
+        last.result(timeout=5)
+        with self.assertRaisesMessage(RuntimeError, "boom"):
+            broken.result(timeout=5)
+        self.assertEqual(sorted(SearchSync.objects.values_list("query", flat=True)), ["first", "last"])
+        stats = writer.stats.snapshot()
+        self.assertEqual((stats["transactions"], stats["committed"], stats["errors"]), (1, 2, 1))
+
+    def test_submit_inside_atomic_runs_inline(self):
+        writer = self.make_writer()
+
+        with transaction.atomic():
+            future = writer.submit(create_sync, "inline")
+            self.assertTrue(future.done())
+            self.assertTrue(SearchSync.objects.filter(query="inline").exists())
+
+        self.assertIsNone(writer._thread)
+        self.assertEqual(writer.stats.snapshot()["inline"], 1)
@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import VacancySearchView
+from .views import VacancySearchView, AsyncVacancySearchView, LocalVacancySearchView, StatsView
 
 
 urlpatterns = [
     path('search/', VacancySearchView.as_view(), name='vacancy_search'),
+    path('search/async/', AsyncVacancySearchView.as_view(), name='vacancy_search_async'),
+    path('search/local/', LocalVacancySearchView.as_view(), name='vacancy_search_local'),
+    path('stats/', StatsView.as_view(), name='stats'),
 ]
\ No newline at end of file
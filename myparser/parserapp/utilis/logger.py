@@ -0,0 +1,160 @@
+"""
+Неблокирующее структурированное логирование.
+
+Потоки запросов только кладут запись в очередь (QueueHandler); форматирование и запись в stderr/файл
+делает отдельный поток (QueueListener). Если очередь переполнена, запись отбрасывается, а не блокирует запрос.
+
+Поля записи передаются через extra и выводятся как key=value (KeyValueFormatter) или JSON (JsonFormatter):
+    logger.info("HH request ok", extra={"query": query, "page": page, "status": 200, "latency_ms": 12.5})
+
+Подключается через settings.LOGGING (см. myparser/settings.py); настройки выборки — settings.HH_LOGGING.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+
+
+# Значения по умолчанию; переопределяются через settings.HH_LOGGING
+DEFAULT_LOGGING_SETTINGS = {
+    "PAYLOAD_SAMPLE_RATE": 0.0,  # доля запросов, для которых тело ответа HH.ru пишется в лог (уровень DEBUG)
+    "PAYLOAD_MAX_BYTES": 4096,   # сколько байт тела писать
+}
+
+# Атрибуты LogRecord, которые есть у любой записи; всё остальное пришло из extra
+_STANDARD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def get_logging_settings():
+    from django.conf import settings
+
+    config = dict(DEFAULT_LOGGING_SETTINGS)
+    config.update(getattr(settings, "HH_LOGGING", {}) or {})
+    return config
+
+
+def record_fields(record):
+    """Поля из extra в порядке добавления."""
+    return {key: value for key, value in record.__dict__.items() if key not in _STANDARD_ATTRS}
+
+
+def _timestamp(record):
+    return datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+
+
+class KeyValueFormatter(logging.Formatter):
+    """2026-01-01T10:00:00.000+00:00 INFO parserapp.services.hh_parser HH request ok query=python page=0 status=200"""
+
+    def format(self, record):
+        parts = [_timestamp(record), record.levelname, record.name, record.getMessage()]
+        for key, value in record_fields(record).items():
+            value = str(value)
+            parts.append(f"{key}={json.dumps(value, ensure_ascii=False) if ' ' in value or not value else value}")
+        line = " ".join(parts)
+        if record.exc_text or record.exc_info:
+            line += "\n" + (record.exc_text or self.formatException(record.exc_info))
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна JSON-строка на запись: ts, level, logger, message и поля из extra."""
+
+    def format(self, record):
+        payload = {
+            "ts": _timestamp(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            **record_fields(record),
+        }
+        if record.exc_text or record.exc_info:
+            payload["exc"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает только долю rate записей уровня max_level и ниже; более важные записи проходят всегда.
+    Например, rate=0.1, max_level="INFO" — каждая десятая запись об успешном запросе, все предупреждения и ошибки.
+    """
+
+    def __init__(self, rate=1.0, max_level="INFO"):
+        super().__init__()
+        self.rate = float(rate)
+        self.max_level = logging.getLevelName(max_level) if isinstance(max_level, str) else max_level
+
+    def filter(self, record):
+        return record.levelno > self.max_level or self.rate >= 1.0 or random.random() < self.rate
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler со своим QueueListener: в вызывающем потоке — только постановка в очередь,
+    форматирование и вывод — в фоновом потоке. Вывод — в stderr или в файл (filename).
+    Форматтер, заданный этому обработчику (formatter в LOGGING), применяется в фоновом потоке.
+    """
+
+    def __init__(self, filename=None, stream=None, queue_size=10000):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        if filename:
+            self.target = logging.handlers.WatchedFileHandler(filename, encoding="utf-8")
+        else:
+            self.target = logging.StreamHandler(stream or sys.stderr)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.close)
+
+    def setFormatter(self, fmt):
+        super().setFormatter(fmt)
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Подставляем аргументы сообщения сейчас (объекты могут измениться), а форматирование оставляем слушателю
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def close(self):
+        listener, self.listener = self.listener, None
+        if listener is not None:
+            # Дописывает всё, что осталось в очереди
+            listener.stop()
+            self.target.close()
+        super().close()
+
+
+def sample_payload():
+    """True для доли PAYLOAD_SAMPLE_RATE вызовов: тогда тело ответа стоит записать в лог."""
+    rate = get_logging_settings()["PAYLOAD_SAMPLE_RATE"]
+    return rate > 0 and random.random() < rate
+
+
+def log_payload(logger, content, **fields):
+    """Пишет начало тела ответа (DEBUG) для выборки запросов; для остальных не копирует и не декодирует тело."""
+    if not logger.isEnabledFor(logging.DEBUG) or not sample_payload():
+        return
+    limit = get_logging_settings()["PAYLOAD_MAX_BYTES"]
+    logger.debug("HH payload", extra={
+        **fields,
+        "bytes": len(content),
+        "payload": content[:limit].decode("utf-8", errors="replace"),
+    })
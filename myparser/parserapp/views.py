@@ -1,25 +1,214 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views import View
 import json
-from .services.hh_parser import HHParser
+from .services.cache import cache_stats, get_cached_parser
+from .services.crawler import HH_MAX_PER_PAGE, crawl_pages_in_order, page_range
+from .services.db_writer import writer_stats
+from .services.fastjson import FastJsonResponse, dumps
+from .services.filters import apply_filters, build_hh_params, parse_filters, sort_vacancies
+from .services.hh_async import get_default_async_parser
+from .services.http_client import pool_stats
+from .services.ingest import ingest_vacancies
+from .services.local_search import InvalidCursor, search_local
+from .services.metrics import registry, render_snapshot, stage
+from .services.resilience import get_breaker, get_limiter
+from .services.singleflight import flight_stats
+from .services.sources import search_sources
 
 
-class VacancySearchView(View):
-    def get(self, request):
-        #Получаем поисковую фразу из query-параметра или тела запроса
-        search_phrase = request.GET.get('search_phrase')
+def _parse_search_request(request):
+    """
+    Достаёт параметры поиска из query-параметров или тела запроса.
+    Возвращает (params, None) или (None, JsonResponse с ошибкой).
+    """
+    #Получаем поисковую фразу из query-параметра или тела запроса
+    search_phrase = request.GET.get('search_phrase')
+    try:
         page = int(request.GET.get('page', 0))
+    except ValueError:
+        page = -1
+    if page < 0:
+        return None, JsonResponse({'error': "page must be a non-negative integer"}, status=400)
+    try:
         per_page = int(request.GET.get('per_page', 20))
-        if not search_phrase:
+    except ValueError:
+        per_page = 0
+    if per_page < 1:
+        return None, JsonResponse({'error': "per_page must be a positive integer"}, status=400)
+    data = {}
+    if not search_phrase:
+        try:
+            data = json.loads(request.body)
+            search_phrase = data.get('search_phrase')
+        except Exception:
+            return None, JsonResponse({'error': "search_phrase is required"}, status=400)
+    if not search_phrase:
+        return None, JsonResponse({'error': "search_phrase is required"}, status=400)
+    # Фильтры и сортировка: из query-параметров, а если их нет — из JSON-тела
+    filters, sort_option = parse_filters({**data, **request.GET.dict()})
+    return {
+        'search_phrase': search_phrase,
+        'page': page,
+        'per_page': per_page,
+        'filters': filters,
+        'sort': sort_option,
+    }, None
+
+
+def _ndjson_lines(params, hh_params, local_filters, max_pages, first_page):
+    """
+    Генератор строк NDJSON: каждая страница HH.ru сразу после загрузки проходит через vacancy_from_hh
+    и фильтры и отдаётся клиенту, в памяти держится не больше нескольких страниц.
+    Если часть страниц HH.ru так и не отдал, последняя строка — {"error": ..., "pages": [их номера]}.
+    """
+    per_page = min(params['per_page'], HH_MAX_PER_PAGE)
+    expected = page_range(first_page, per_page, params['page'], max_pages)
+    loaded = set()
+    for page, vacancies in crawl_pages_in_order(
+        params['search_phrase'],
+        per_page=per_page,
+        max_pages=max_pages,
+        parser=get_cached_parser(),
+        first_page=first_page,
+        start_page=params['page'],
+        **hh_params,
+    ):
+        loaded.add(page)
+        for vacancy in apply_filters(vacancies, local_filters):
+            yield dumps(vacancy) + b'\n'
+    missing = [page for page in expected if page not in loaded]
+    if missing:
+        yield dumps({'error': "HH.ru did not return some pages", 'pages': missing}) + b'\n'
+
+
+class VacancySearchView(View):
+    def get(self, request):
+        params, error = _parse_search_request(request)
+        if error:
+            return error
+
+        hh_params, local_filters = build_hh_params(params['filters'], params['sort'])
+        if request.GET.get('format') == 'ndjson':
+            return self._stream(request, params, hh_params, local_filters)
+
+        # Все включённые источники (parserapp/services/sources.py) параллельно, каждый со своим таймаутом
+        result = search_sources(
+            params['search_phrase'],
+            page=params['page'],
+            per_page=params['per_page'],
+            filters=params['filters'],
+            sort_option=params['sort'],
+        )
+        if getattr(settings, 'HH_STORE_SEARCH_RESULTS', False):
+            ingest_vacancies(result.vacancies)
+        with stage('encode'):
+            return FastJsonResponse({
+                'vacancies': result.vacancies,
+                'sources': [source.as_dict() for source in result.sources],
+                'partial': result.partial,
+            })
+
+    def _stream(self, request, params, hh_params, local_filters):
+        # pages: сколько страниц выдачи отдать (по умолчанию одну), pages=all — всю выдачу.
+        # Сортировка в потоке — только та, что выполняет HH.ru (по зарплате), остальные требуют всей выдачи сразу.
+        pages = request.GET.get('pages', '1')
+        if pages == 'all':
+            max_pages = None
+        else:
             try:
-                data = json.loads(request.body)
-                search_phrase = data.get('search_phrase')
-            except Exception:
-                return JsonResponse({'error': "search_phrase is required"}, status=400)
-        if not search_phrase:
-            return JsonResponse({'error': "search_phrase is required"}, status=400)
+                max_pages = int(pages)
+            except ValueError:
+                max_pages = 0
+            if max_pages < 1:
+                return JsonResponse({'error': "pages must be 'all' or a positive integer"}, status=400)
+        # Первая страница — до начала потока: если HH.ru не ответил, клиент получает ошибку, а не пустой поток
+        first_page = get_cached_parser().fetch_page(
+            params['search_phrase'], page=params['page'], per_page=min(params['per_page'], HH_MAX_PER_PAGE),
+            **hh_params,
+        )
+        if first_page is None:
+            return JsonResponse({'error': "HH.ru is unavailable"}, status=502)
+        return StreamingHttpResponse(
+            _ndjson_lines(params, hh_params, local_filters, max_pages, first_page),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+
+
+class AsyncVacancySearchView(View):
+    """
+    Асинхронный вариант VacancySearchView для ASGI (myparser/asgi.py).
+    Ожидание ответа HH.ru не занимает воркер, поэтому один процесс держит сотни запросов одновременно.
+    """
 
+    async def get(self, request):
+        params, error = _parse_search_request(request)
+        if error:
+            return error
 
-        parser = HHParser()
-        vacancies = parser.get_vacancies(search_phrase, page=page, per_page=per_page)
-        return JsonResponse({'vacancies': vacancies}, safe=False)
+        hh_params, local_filters = build_hh_params(params['filters'], params['sort'])
+        parser = get_default_async_parser()
+        vacancies = await parser.get_vacancies(params['search_phrase'], page=params['page'], per_page=params['per_page'], **hh_params)
+        with stage('filter_sort'):
+            vacancies = sort_vacancies(apply_filters(vacancies, local_filters), params['sort'])
+        with stage('encode'):
+            return FastJsonResponse({'vacancies': vacancies})
+
+
+class LocalVacancySearchView(View):
+    """
+    Поиск по сохранённым вакансиям (таблица Vacancy), без обращения к HH.ru.
+    Фильтры и сортировка — как в команде search_vacancies, пагинация — по cursor из next_cursor.
+    Параметр q — полнотекстовый поиск по названию, компании, городу и описанию (с сортировкой по релевантности).
+    """
+
+    def get(self, request):
+        filters, _ = parse_filters(request.GET)
+
+        try:
+            per_page = int(request.GET.get('per_page', 20))
+        except ValueError:
+            return JsonResponse({'error': "per_page must be an integer"}, status=400)
+
+        try:
+            vacancies, next_cursor = search_local(
+                filters,
+                sort_option=request.GET.get('sort'),
+                cursor=request.GET.get('cursor'),
+                limit=per_page,
+                text=request.GET.get('q'),
+            )
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        return FastJsonResponse({'vacancies': vacancies, 'next_cursor': next_cursor})
+
+
+class StatsView(View):
+    def get(self, request):
+        # Счётчики переиспользования соединений к HH.ru, попаданий в кэш поиска, объединённых запросов
+        # и групповых коммитов, состояние ограничителя/предохранителя
+        return JsonResponse({
+            'http_pool': pool_stats.snapshot(),
+            'search_cache': cache_stats.snapshot(),
+            'rate_limiter': get_limiter().snapshot(),
+            'circuit_breaker': get_breaker().snapshot(),
+            'coalescing': flight_stats.snapshot(),
+            'db_writer': writer_stats.snapshot(),
+        })
+
+
+class MetricsView(View):
+    """Метрики в текстовом формате Prometheus: гистограммы этапов и запросов и счётчики из /api/stats/."""
+
+    def get(self, request):
+        lines = [registry.render().rstrip('\n')]
+        for prefix, snapshot in (
+            ('hh_http_pool', pool_stats.snapshot()),
+            ('hh_search_cache', cache_stats.snapshot()),
+            ('hh_rate_limiter', get_limiter().snapshot()),
+            ('hh_circuit_breaker', get_breaker().snapshot()),
+            ('hh_coalescing', flight_stats.snapshot()),
+            ('hh_db_writer', writer_stats.snapshot()),
+        ):
+            lines.extend(render_snapshot(prefix, snapshot))
+        return HttpResponse('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')